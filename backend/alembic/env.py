@@ -13,6 +13,9 @@ from app.core.database import Base, DATABASE_URL
 from app.models.user import User
 from app.models.order import Order, OrderStatus
 from app.models.order_item import OrderItem
+from app.models.idempotency_key import IdempotencyKey
+from app.models.archive import ArchivedOrder, ArchivedOrderItem
+from app.models.order_tombstone import OrderTombstone
 
 # this is the Alembic Config object, which provides
 # access to the values within the .ini file in use.
@@ -0,0 +1,32 @@
+"""Index live orders by owner and status for faceted lists
+
+Revision ID: 2b9d4e7a1c63
+Revises: 7f3c1a9e5b82
+Create Date: 2026-10-19 19:12:08.415237
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '2b9d4e7a1c63'
+down_revision = '7f3c1a9e5b82'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        'ix_orders_live_shipper_id_status_created_at', 'orders', ['shipper_id', 'status', 'created_at'],
+        unique=False, postgresql_where=sa.text('deleted_at IS NULL')
+    )
+    op.create_index(
+        'ix_orders_live_carrier_id_status_created_at', 'orders', ['carrier_id', 'status', 'created_at'],
+        unique=False, postgresql_where=sa.text('deleted_at IS NULL')
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_orders_live_carrier_id_status_created_at', table_name='orders')
+    op.drop_index('ix_orders_live_shipper_id_status_created_at', table_name='orders')
@@ -0,0 +1,24 @@
+"""Index orders.updated_at
+
+Revision ID: 5d0b7e3c9a14
+Revises: c3e81f5a7d20
+Create Date: 2026-10-19 16:41:08.512203
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5d0b7e3c9a14'
+down_revision = 'c3e81f5a7d20'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index(op.f('ix_orders_updated_at'), 'orders', ['updated_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_orders_updated_at'), table_name='orders')
@@ -0,0 +1,54 @@
+"""Soft delete orders and cascade item deletes
+
+Revision ID: 7f3c1a9e5b82
+Revises: e8a4f61b2c97
+Create Date: 2026-10-19 18:05:31.776420
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '7f3c1a9e5b82'
+down_revision = 'e8a4f61b2c97'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('orders', sa.Column('deleted_at', sa.DateTime(timezone=True), nullable=True))
+    op.create_index(
+        'ix_orders_live_shipper_id_created_at', 'orders', ['shipper_id', 'created_at'],
+        unique=False, postgresql_where=sa.text('deleted_at IS NULL')
+    )
+    op.create_index(
+        'ix_orders_live_carrier_id_created_at', 'orders', ['carrier_id', 'created_at'],
+        unique=False, postgresql_where=sa.text('deleted_at IS NULL')
+    )
+    op.create_index(
+        'ix_orders_live_available_created_at', 'orders', ['created_at'],
+        unique=False, postgresql_where=sa.text('is_assigned = false AND deleted_at IS NULL')
+    )
+    op.create_index(
+        'ix_orders_deleted_at', 'orders', ['deleted_at'],
+        unique=False, postgresql_where=sa.text('deleted_at IS NOT NULL')
+    )
+
+    # Purging an order removes its items in the same statement
+    op.drop_constraint('order_items_order_id_fkey', 'order_items', type_='foreignkey')
+    op.create_foreign_key(
+        'order_items_order_id_fkey', 'order_items', 'orders', ['order_id'], ['id'], ondelete='CASCADE'
+    )
+    op.create_index(op.f('ix_order_items_order_id'), 'order_items', ['order_id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_order_items_order_id'), table_name='order_items')
+    op.drop_constraint('order_items_order_id_fkey', 'order_items', type_='foreignkey')
+    op.create_foreign_key('order_items_order_id_fkey', 'order_items', 'orders', ['order_id'], ['id'])
+    op.drop_index('ix_orders_deleted_at', table_name='orders')
+    op.drop_index('ix_orders_live_available_created_at', table_name='orders')
+    op.drop_index('ix_orders_live_carrier_id_created_at', table_name='orders')
+    op.drop_index('ix_orders_live_shipper_id_created_at', table_name='orders')
+    op.drop_column('orders', 'deleted_at')
@@ -0,0 +1,45 @@
+"""Index the sortable order columns and tie-break list indexes by id
+
+Revision ID: 9e1f6c3b8d27
+Revises: 2b9d4e7a1c63
+Create Date: 2026-10-19 19:48:52.603114
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '9e1f6c3b8d27'
+down_revision = '2b9d4e7a1c63'
+branch_labels = None
+depends_on = None
+
+LIVE = 'deleted_at IS NULL'
+AVAILABLE = 'is_assigned = false AND deleted_at IS NULL'
+SORT_COLUMNS = ['delivery_deadline', 'pickup_date', 'weight', 'total_amount']
+
+
+def _recreate(name, columns, where):
+    op.drop_index(name, table_name='orders')
+    op.create_index(name, 'orders', columns, unique=False, postgresql_where=sa.text(where))
+
+
+def upgrade() -> None:
+    # Lists order by (created_at, id), so the id has to be in the index for deep pages
+    _recreate('ix_orders_live_shipper_id_created_at', ['shipper_id', 'created_at', 'id'], LIVE)
+    _recreate('ix_orders_live_carrier_id_created_at', ['carrier_id', 'created_at', 'id'], LIVE)
+    _recreate('ix_orders_live_available_created_at', ['created_at', 'id'], AVAILABLE)
+    for column in SORT_COLUMNS:
+        op.create_index(
+            f'ix_orders_live_available_{column}', 'orders', [column, 'id'],
+            unique=False, postgresql_where=sa.text(AVAILABLE)
+        )
+
+
+def downgrade() -> None:
+    for column in reversed(SORT_COLUMNS):
+        op.drop_index(f'ix_orders_live_available_{column}', table_name='orders')
+    _recreate('ix_orders_live_available_created_at', ['created_at'], AVAILABLE)
+    _recreate('ix_orders_live_carrier_id_created_at', ['carrier_id', 'created_at'], LIVE)
+    _recreate('ix_orders_live_shipper_id_created_at', ['shipper_id', 'created_at'], LIVE)
@@ -0,0 +1,83 @@
+"""Add order archive tables
+
+Revision ID: c3e81f5a7d20
+Revises: 4a7c2e9d1b36
+Create Date: 2026-10-19 11:02:17.334915
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = 'c3e81f5a7d20'
+down_revision = '4a7c2e9d1b36'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    order_status = postgresql.ENUM(
+        'PENDING', 'ACCEPTED', 'PICKED_UP', 'IN_TRANSIT', 'DELIVERED', 'CANCELLED',
+        name='orderstatus', create_type=False
+    )
+    op.create_table('orders_archive',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('order_number', sa.String(), nullable=False),
+    sa.Column('shipper_id', sa.Integer(), nullable=False),
+    sa.Column('carrier_id', sa.Integer(), nullable=True),
+    sa.Column('is_assigned', sa.Boolean(), nullable=True),
+    sa.Column('pickup_location', sa.String(), nullable=False),
+    sa.Column('delivery_location', sa.String(), nullable=False),
+    sa.Column('pickup_date', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('delivery_deadline', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('package_description', sa.String(), nullable=False),
+    sa.Column('weight', sa.Float(), nullable=False),
+    sa.Column('dimensions', sa.String(), nullable=True),
+    sa.Column('customer_name', sa.String(), nullable=False),
+    sa.Column('customer_email', sa.String(), nullable=False),
+    sa.Column('customer_phone', sa.String(), nullable=False),
+    sa.Column('tracking_number', sa.String(), nullable=True),
+    sa.Column('status', order_status, nullable=False),
+    sa.Column('notes', sa.String(), nullable=True),
+    sa.Column('total_amount', sa.Float(), nullable=False),
+    sa.Column('payment_status', sa.String(), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('archived_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_orders_archive_order_number'), 'orders_archive', ['order_number'], unique=False)
+    op.create_index(op.f('ix_orders_archive_shipper_id'), 'orders_archive', ['shipper_id'], unique=False)
+    op.create_index(op.f('ix_orders_archive_carrier_id'), 'orders_archive', ['carrier_id'], unique=False)
+    op.create_index(op.f('ix_orders_archive_tracking_number'), 'orders_archive', ['tracking_number'], unique=False)
+    op.create_table('order_items_archive',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('order_id', sa.Integer(), nullable=False),
+    sa.Column('product_name', sa.String(), nullable=False),
+    sa.Column('product_sku', sa.String(), nullable=False),
+    sa.Column('quantity', sa.Integer(), nullable=False),
+    sa.Column('unit_price', sa.Float(), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_order_items_archive_order_id'), 'order_items_archive', ['order_id'], unique=False)
+
+    # Lets the archival job find old terminal orders without scanning the table
+    op.execute("""
+    CREATE INDEX ix_orders_terminal_created_at ON orders (created_at)
+    WHERE status IN ('DELIVERED', 'CANCELLED');
+    """)
+
+
+def downgrade() -> None:
+    op.execute("DROP INDEX IF EXISTS ix_orders_terminal_created_at;")
+    op.drop_index(op.f('ix_order_items_archive_order_id'), table_name='order_items_archive')
+    op.drop_table('order_items_archive')
+    op.drop_index(op.f('ix_orders_archive_tracking_number'), table_name='orders_archive')
+    op.drop_index(op.f('ix_orders_archive_carrier_id'), table_name='orders_archive')
+    op.drop_index(op.f('ix_orders_archive_shipper_id'), table_name='orders_archive')
+    op.drop_index(op.f('ix_orders_archive_order_number'), table_name='orders_archive')
+    op.drop_table('orders_archive')
@@ -0,0 +1,66 @@
+"""Add the denormalized order read model
+
+Revision ID: d4a8f2c6e913
+Revises: 9e1f6c3b8d27
+Create Date: 2026-10-19 21:14:06.218530
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = 'd4a8f2c6e913'
+down_revision = '9e1f6c3b8d27'
+branch_labels = None
+depends_on = None
+
+SORT_COLUMNS = ['created_at', 'delivery_deadline', 'pickup_date', 'weight', 'total_amount']
+
+
+def upgrade() -> None:
+    order_status = postgresql.ENUM(
+        'PENDING', 'ACCEPTED', 'PICKED_UP', 'IN_TRANSIT', 'DELIVERED', 'CANCELLED',
+        name='orderstatus', create_type=False
+    )
+    op.create_table('order_read_model',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('shipper_id', sa.Integer(), nullable=False),
+    sa.Column('carrier_id', sa.Integer(), nullable=True),
+    sa.Column('is_assigned', sa.Boolean(), nullable=False),
+    sa.Column('status', order_status, nullable=False),
+    sa.Column('customer_email', sa.String(), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('pickup_date', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('delivery_deadline', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('weight', sa.Float(), nullable=False),
+    sa.Column('total_amount', sa.Float(), nullable=False),
+    sa.Column('item_count', sa.Integer(), nullable=False),
+    sa.Column('items', sa.JSON(), nullable=False),
+    sa.Column('payload', sa.Text(), nullable=False),
+    sa.Column('summary_payload', sa.Text(), nullable=False),
+    sa.ForeignKeyConstraint(['id'], ['orders.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_order_read_model_shipper_id_created_at', 'order_read_model', ['shipper_id', 'created_at', 'id'], unique=False)
+    op.create_index('ix_order_read_model_carrier_id_created_at', 'order_read_model', ['carrier_id', 'created_at', 'id'], unique=False)
+    op.create_index('ix_order_read_model_shipper_id_status_created_at', 'order_read_model', ['shipper_id', 'status', 'created_at'], unique=False)
+    op.create_index('ix_order_read_model_carrier_id_status_created_at', 'order_read_model', ['carrier_id', 'status', 'created_at'], unique=False)
+    for column in SORT_COLUMNS:
+        op.create_index(
+            f'ix_order_read_model_available_{column}', 'order_read_model', [column, 'id'],
+            unique=False, postgresql_where=sa.text('is_assigned = false')
+        )
+    # Rows are filled by rebuild_read_model.py, which serializes orders the way the API
+    # does; lists only read the table once READ_MODEL_ENABLED is set after that
+
+
+def downgrade() -> None:
+    for column in reversed(SORT_COLUMNS):
+        op.drop_index(f'ix_order_read_model_available_{column}', table_name='order_read_model')
+    op.drop_index('ix_order_read_model_carrier_id_status_created_at', table_name='order_read_model')
+    op.drop_index('ix_order_read_model_shipper_id_status_created_at', table_name='order_read_model')
+    op.drop_index('ix_order_read_model_carrier_id_created_at', table_name='order_read_model')
+    op.drop_index('ix_order_read_model_shipper_id_created_at', table_name='order_read_model')
+    op.drop_table('order_read_model')
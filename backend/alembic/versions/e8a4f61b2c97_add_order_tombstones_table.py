@@ -0,0 +1,39 @@
+"""Add order tombstones table
+
+Revision ID: e8a4f61b2c97
+Revises: 5d0b7e3c9a14
+Create Date: 2026-10-19 17:20:44.108362
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e8a4f61b2c97'
+down_revision = '5d0b7e3c9a14'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table('order_tombstones',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('order_id', sa.Integer(), nullable=False),
+    sa.Column('shipper_id', sa.Integer(), nullable=False),
+    sa.Column('carrier_id', sa.Integer(), nullable=True),
+    sa.Column('deleted_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_order_tombstones_id'), 'order_tombstones', ['id'], unique=False)
+    op.create_index(op.f('ix_order_tombstones_order_id'), 'order_tombstones', ['order_id'], unique=False)
+    op.create_index(op.f('ix_order_tombstones_shipper_id'), 'order_tombstones', ['shipper_id'], unique=False)
+    op.create_index('ix_order_tombstones_carrier_id_deleted_at', 'order_tombstones', ['carrier_id', 'deleted_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_order_tombstones_carrier_id_deleted_at', table_name='order_tombstones')
+    op.drop_index(op.f('ix_order_tombstones_shipper_id'), table_name='order_tombstones')
+    op.drop_index(op.f('ix_order_tombstones_order_id'), table_name='order_tombstones')
+    op.drop_index(op.f('ix_order_tombstones_id'), table_name='order_tombstones')
+    op.drop_table('order_tombstones')
@@ -0,0 +1,37 @@
+"""Add the day-partitioned order position history
+
+Revision ID: f2b7c9d41e6a
+Revises: d4a8f2c6e913
+Create Date: 2026-10-19 23:02:41.530914
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f2b7c9d41e6a'
+down_revision = 'd4a8f2c6e913'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table('order_positions',
+    sa.Column('order_id', sa.Integer(), nullable=False),
+    sa.Column('recorded_at', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('carrier_id', sa.Integer(), nullable=False),
+    sa.Column('latitude', sa.Float(), nullable=False),
+    sa.Column('longitude', sa.Float(), nullable=False),
+    sa.Column('speed_kmh', sa.Float(), nullable=True),
+    sa.Column('heading', sa.Float(), nullable=True),
+    sa.Column('received_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.PrimaryKeyConstraint('order_id', 'recorded_at'),
+    postgresql_partition_by='RANGE (recorded_at)'
+    )
+    # Daily partitions are created ahead of the writes; this catches anything outside them
+    op.execute('CREATE TABLE order_positions_default PARTITION OF order_positions DEFAULT')
+
+
+def downgrade() -> None:
+    op.drop_table('order_positions')
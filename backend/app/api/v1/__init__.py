@@ -1,10 +1,23 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, Depends
 
-from app.api.v1.endpoints import auth, orders
+from app.api.v1.endpoints import auth, batch, internal, orders
+from app.core.auth import get_current_active_superuser
+from app.core.rate_limit import user_rate_limit
 
 api_router = APIRouter()
 api_router.include_router(auth.router, prefix="/auth", tags=["Authentication"])
-api_router.include_router(orders.router, prefix="/orders", tags=["Orders"])
+api_router.include_router(
+    orders.router, prefix="/orders", tags=["Orders"], dependencies=[Depends(user_rate_limit)]
+)
+api_router.include_router(
+    batch.router, prefix="/batch", tags=["Batch"], dependencies=[Depends(user_rate_limit)]
+)
+
+# Operational stats, for superusers only
+api_router.include_router(
+    internal.router, prefix="/internal", tags=["Internal"],
+    dependencies=[Depends(get_current_active_superuser)]
+)
 
 # Create a proper router for the /me endpoint
 me_router = APIRouter()
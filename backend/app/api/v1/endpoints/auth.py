@@ -9,6 +9,7 @@ from fastapi.responses import JSONResponse
 from app.core.auth import authenticate_user, get_current_active_user
 from app.core.config import settings
 from app.core.database import get_db
+from app.core.rate_limit import auth_rate_limit
 from app.core.security import create_access_token
 from app.services import user as user_service
 from app.schemas.user import User, UserCreate, Token
@@ -26,7 +27,12 @@ def signup_options():
         status_code=200,
     )
 
-@router.post("/signup", response_model=User, status_code=status.HTTP_201_CREATED)
+@router.post(
+    "/signup",
+    response_model=User,
+    status_code=status.HTTP_201_CREATED,
+    dependencies=[Depends(auth_rate_limit)]
+)
 def signup(
     user_in: UserCreate,
     db: Session = Depends(get_db)
@@ -55,7 +61,7 @@ def signup(
     user = user_service.create(db, user_in)
     return User.model_validate(user)
 
-@router.post("/login", response_model=Token)
+@router.post("/login", response_model=Token, dependencies=[Depends(auth_rate_limit)])
 def login(
     response: Response,
     form_data: OAuth2PasswordRequestForm = Depends(),
@@ -0,0 +1,35 @@
+from typing import Any
+
+from fastapi import APIRouter, Depends, Request
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.orm import Session
+
+from app.core.auth import get_current_active_user, get_current_user, oauth2_scheme
+from app.core.batch import BatchDispatcher
+from app.core.database import get_read_db
+from app.schemas.batch import BatchRequest, BatchResponse
+
+router = APIRouter()
+
+def _resolve_user(db: Session, token: str):
+    return get_current_active_user(get_current_user(db=db, token=token))
+
+@router.post("", response_model=BatchResponse)
+async def run_batch(
+    batch: BatchRequest,
+    request: Request,
+    token: str = Depends(oauth2_scheme),
+    db: Session = Depends(get_read_db)
+) -> Any:
+    """
+    Run several GET requests against the API in one round trip, e.g.
+    `{"requests": [{"id": "me", "path": "/users/me"}, {"path": "/orders/available"}]}`.
+    The token is checked and the user loaded once, and every sub-request shares
+    one database session. Each sub-request gets its own status and body, in order;
+    a failing sub-request does not fail the batch.
+    """
+    # Authenticate once on the batch's own session
+    current_user = await run_in_threadpool(_resolve_user, db, token)
+
+    dispatcher = BatchDispatcher(request, db, current_user)
+    return BatchResponse(responses=await dispatcher.run(batch.requests))
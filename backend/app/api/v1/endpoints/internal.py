@@ -0,0 +1,12 @@
+from typing import Any
+
+from fastapi import APIRouter
+
+from app.core import singleflight
+
+router = APIRouter()
+
+@router.get("/coalescing")
+def coalescing_stats() -> Any:
+    """Calls, query executions and coalesced calls per read-coalescing group in this worker."""
+    return {name: stats._asdict() for name, stats in singleflight.all_stats().items()}
@@ -1,28 +1,226 @@
-from typing import Any, Optional, List
+from typing import Any, Callable, Optional, List
+from datetime import datetime
+from urllib.parse import urlencode
+import json
+import time
 
-from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
 from sqlalchemy.orm import Session
 from sqlalchemy import text
 from sqlalchemy.sql.expression import literal
 from sqlalchemy import update
 
 from app.core.auth import get_current_active_user
-from app.core.database import get_db
+from app.core import page_cache
+from app.core.config import settings
+from app.core.database import get_db, get_read_db, reads_replica
+from app.core.encoding import MSGPACK_RESPONSES, MsgPackResponse, accepts_msgpack
+from app.core.idempotency import idempotency_key
+from app.core.permissions import (
+    OWNER_FIELDS, RequireAccountType, require_order_access, require_tracking_access
+)
+from app.models.idempotency_key import IdempotencyKey
 from app.models.order import Order as OrderModel, OrderStatus
 from app.models.user import User
 from app.services import order as order_service
-from app.schemas.order import Order, OrderCreate, OrderUpdate, OrderStatusUpdate, OrderFilter, CarrierAssignment
-from app.schemas.pagination import PaginatedResult
+from app.services import idempotency as idempotency_service
+from app.services import order_state
+from app.services.order_state import ForbiddenTransition, InvalidTransition
+from app.services.sla import sla_monitor
+from app.services import sync as sync_service
+from app.services import telemetry
+from app.services.order import OrderAccess
+from app.schemas.order import (
+    Order, OrderCreate, OrderUpdate, OrderStatusUpdate, OrderFilter,
+    OrderSummary, ORDER_FIELDS, SUMMARY_FIELDS,
+    OrderStatusBatchUpdate, OrderStatusBatchResult, OrderStatusResult, AtRiskOrder,
+    OrderChanges, OrderPosition, PositionBatch, PositionBatchResult, PositionRejection, TrackedOrder
+)
+from app.schemas.pagination import FacetedResult, PaginatedResult
 
 router = APIRouter()
 
-# Helper function to check if user is a shipper
-def is_shipper(user: User) -> bool:
-    return user.account_type == "shipper"
+def requested_fields(
+    fields: Optional[str] = Query(
+        None,
+        description="Comma-separated order fields to return, or 'summary'. Add 'items' to include order items."
+    )
+) -> Optional[List[str]]:
+    """Parse a sparse fieldset. Returns None when the full order is wanted."""
+    if not fields:
+        return None
+    selected = ["id"]
+    for name in (part.strip() for part in fields.split(",")):
+        expanded = SUMMARY_FIELDS if name == "summary" else (name,)
+        for field in expanded:
+            if field not in ORDER_FIELDS and field != "items":
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail=f"Unknown field '{field}'. Valid fields are: summary, items, {', '.join(ORDER_FIELDS)}"
+                )
+            if field not in selected:
+                selected.append(field)
+    return selected
 
-# Helper function to check if user is a carrier
-def is_carrier(user: User) -> bool:
-    return user.account_type == "carrier"
+def requested_statuses(
+    statuses: Optional[List[str]] = Query(
+        None,
+        alias="status",
+        description="Filter by order status. Repeat the parameter or comma-separate values to match several."
+    )
+) -> Optional[List[OrderStatus]]:
+    """Parse a multi-status filter. Returns None when no status filter is given."""
+    if not statuses:
+        return None
+    selected = []
+    for name in (part.strip().upper() for value in statuses for part in value.split(",")):
+        if not name:
+            continue
+        try:
+            order_status = OrderStatus(name)
+        except ValueError:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Unknown status '{name}'. Valid statuses are: {', '.join(s.value for s in OrderStatus)}"
+            )
+        if order_status not in selected:
+            selected.append(order_status)
+    return selected or None
+
+def requested_sort(
+    sort: str = Query(
+        order_service.DEFAULT_SORT,
+        description=f"Sort by one of: {', '.join(order_service.SORT_COLUMNS)}. Prefix with '-' for descending order."
+    )
+) -> str:
+    """Validate a sort against the whitelist of indexed sort columns."""
+    try:
+        order_service.parse_sort(sort)
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown sort '{sort}'. Valid sorts are: {', '.join(order_service.SORT_COLUMNS)}, optionally prefixed with '-'"
+        )
+    return sort
+
+def column_fields(fields: Optional[List[str]]) -> Optional[List[str]]:
+    """The order columns to select for a fieldset."""
+    if fields is None:
+        return None
+    return [field for field in fields if field != "items"]
+
+def service_fields(fields: Optional[List[str]]) -> Optional[List[str]]:
+    """
+    What to pass to the order service as `fields`: the whole fieldset when lists
+    are rendered from the read model's payloads, else the columns to select.
+    """
+    if settings.READ_MODEL_ENABLED:
+        return fields
+    return column_fields(fields)
+
+def render_read_model_page(
+    orders_page: PaginatedResult,
+    fields: Optional[List[str]],
+    use_msgpack: bool
+) -> Response:
+    """
+    Serialize a page of read-model rows. Full orders and the summary projection
+    are spliced into the body from their pre-serialized payloads; other
+    fieldsets are cut from the full payload.
+    """
+    rows = orders_page.items
+    meta = orders_page.model_dump(exclude={"items"})
+    if fields is None or set(fields) == set(SUMMARY_FIELDS):
+        payloads = [row.payload if fields is None else row.summary_payload for row in rows]
+        if use_msgpack:
+            return MsgPackResponse({"items": [json.loads(payload) for payload in payloads], **meta})
+        body = '{"items":[' + ",".join(payloads) + "]," + json.dumps(meta, separators=(",", ":"))[1:]
+        return Response(body, media_type=JSONResponse.media_type)
+
+    items = []
+    for row in rows:
+        order = json.loads(row.payload)
+        items.append({name: order[name] for name in OrderSummary.model_fields if name in fields})
+    content = {"items": items, **meta}
+    if use_msgpack:
+        return MsgPackResponse(content)
+    return JSONResponse(content)
+
+def render_orders_page(
+    db: Session,
+    orders_page: PaginatedResult,
+    fields: Optional[List[str]],
+    use_msgpack: bool
+) -> Any:
+    """Attach items to a page of orders and serialize it, honouring a sparse fieldset."""
+    if settings.READ_MODEL_ENABLED:
+        return render_read_model_page(orders_page, fields, use_msgpack)
+    
+    if fields is None or "items" in fields:
+        order_ids = [order.id if fields is None else order["id"] for order in orders_page.items]
+        items_by_order = order_service.get_items_for_orders(db, order_ids)
+
+    if fields is None:
+        for order in orders_page.items:
+            order.items = items_by_order[order.id]
+        orders_page.items = [Order.model_validate(order) for order in orders_page.items]
+        if use_msgpack:
+            return MsgPackResponse(orders_page)
+        return orders_page
+
+    if "items" in fields:
+        for order in orders_page.items:
+            order["items"] = items_by_order[order["id"]]
+    orders_page.items = [
+        OrderSummary.model_validate(order, from_attributes=True) for order in orders_page.items
+    ]
+    content = jsonable_encoder(orders_page, exclude_unset=True)
+    if use_msgpack:
+        return MsgPackResponse(content)
+    return JSONResponse(content)
+
+def cached_orders_page(
+    request: Request,
+    db: Session,
+    scope: str,
+    owner_id: int,
+    use_msgpack: bool,
+    render: Callable[[], Any]
+) -> Response:
+    """
+    Serve an owner's list page from the page cache, or render it with `render`
+    and cache the encoded body.
+
+    Keys carry the owner's current generation, which every write to their orders
+    bumps, so a cached page is never served after a change. The generation is
+    read before the query: a page rendered concurrently with a write is stored
+    under the old generation and never served. Pages read from a lagging replica
+    right after a bump are not stored, so replica lag cannot pin a stale page.
+    """
+    media_type = MsgPackResponse.media_type if use_msgpack else JSONResponse.media_type
+    if not settings.PAGE_CACHE_ENABLED:
+        response = render()
+        return response if isinstance(response, Response) else JSONResponse(jsonable_encoder(response))
+    
+    store = page_cache.get_store()
+    owner = page_cache.owner_key(scope, owner_id)
+    generation, bumped_at = store.generation(owner)
+    query = urlencode(sorted(request.query_params.multi_items()))
+    key = f"{owner}:{generation}:{media_type}:{request.url.path}?{query}"
+    
+    body = store.get(key)
+    if body is not None:
+        return Response(body, media_type=media_type, headers={"X-Page-Cache": "hit"})
+    
+    response = render()
+    if not isinstance(response, Response):
+        response = JSONResponse(jsonable_encoder(response))
+    if not (reads_replica(db) and time.time() - bumped_at < settings.READ_YOUR_WRITES_SECONDS):
+        store.set(key, response.body, settings.PAGE_CACHE_TTL_SECONDS)
+    response.headers["X-Page-Cache"] = "miss"
+    return response
 
 # SHIPPER ENDPOINTS
 
@@ -30,92 +228,102 @@ def is_carrier(user: User) -> bool:
 def create_order(
     order_in: OrderCreate,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    current_user: User = Depends(RequireAccountType("shipper", detail="Only shippers can create orders")),
+    idempotency: Optional[IdempotencyKey] = Depends(idempotency_key)
 ) -> Any:
     """
     Create new order (Shipper only).
+    Send an Idempotency-Key header to make retries return the original order.
     """
-    # Check if user is a shipper
-    if not is_shipper(current_user):
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Only shippers can create orders"
-        )
-    
-    order = order_service.create(db=db, obj_in=order_in, shipper_id=current_user.id)
-    
-    # Get order items
-    order.items = order_service.get_items(db, order.id)
-    
-    return Order.model_validate(order)
+    result = None
 
-@router.get("/my-shipments", response_model=PaginatedResult[Order])
+    # Built before the commit, so the stored response commits with the order
+    def respond(order) -> None:
+        nonlocal result
+        order.items = order_service.get_items(db, order.id)
+        result = Order.model_validate(order)
+        if idempotency:
+            idempotency_service.save_response(
+                db, idempotency, status.HTTP_201_CREATED, jsonable_encoder(result)
+            )
+
+    order_service.create(db=db, obj_in=order_in, shipper_id=current_user.id, before_commit=respond)
+    return result
+
+@router.get("/my-shipments", response_model=FacetedResult[Order], responses=MSGPACK_RESPONSES)
 def list_shipper_orders(
-    status: Optional[str] = Query(None, description="Filter by order status"),
+    request: Request,
+    statuses: Optional[List[OrderStatus]] = Depends(requested_statuses),
     customer_email: Optional[str] = Query(None, description="Filter by customer email"),
     is_assigned: Optional[bool] = Query(None, description="Filter by assignment status"),
+    date_from: Optional[datetime] = Query(None, description="Only orders created at or after this time"),
+    date_to: Optional[datetime] = Query(None, description="Only orders created at or before this time"),
     page: int = Query(1, ge=1, description="Page number"),
     page_size: int = Query(10, ge=1, le=100, description="Items per page"),
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    sort: str = Depends(requested_sort),
+    fields: Optional[List[str]] = Depends(requested_fields),
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(
+        RequireAccountType("shipper", detail="Only shippers can access their shipments")
+    ),
+    use_msgpack: bool = Depends(accepts_msgpack)
 ) -> Any:
     """
     Retrieve all orders created by the current shipper.
+    `status_counts` holds the number of matching orders per status, ignoring the status filter.
+    Pass `sort=` (e.g. `sort=delivery_deadline` or `sort=-weight`) to change the order.
+    Pass `fields=` (e.g. `fields=summary`) for a sparse projection of each order.
+    Send `Accept: application/msgpack` for a MessagePack-encoded page.
     """
-    # Check if user is a shipper
-    if not is_shipper(current_user):
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Only shippers can access their shipments"
-        )
-    
     # Create filter parameters
     filter_params = OrderFilter(
-        status=status,
+        statuses=statuses,
         customer_email=customer_email,
+        date_from=date_from,
+        date_to=date_to,
         is_assigned=is_assigned
     )
     
     # Calculate skip value for pagination
     skip = (page - 1) * page_size
     
-    # Get orders
-    orders_page = order_service.get_multi(
-        db=db,
-        shipper_id=current_user.id,
-        filter_params=filter_params,
-        skip=skip,
-        limit=page_size
-    )
-    
-    # Load order items for each order
-    for order in orders_page.items:
-        order.items = order_service.get_items(db, order.id)
-    
-    # Convert SQLAlchemy models to Pydantic models
-    orders_page.items = [Order.model_validate(order) for order in orders_page.items]
+    def render():
+        # Get orders
+        orders_page = order_service.get_multi(
+            db=db,
+            shipper_id=current_user.id,
+            filter_params=filter_params,
+            skip=skip,
+            limit=page_size,
+            fields=service_fields(fields),
+            facets=True,
+            sort=sort,
+            from_read_model=settings.READ_MODEL_ENABLED
+        )
+        return render_orders_page(db, orders_page, fields, use_msgpack)
     
-    return orders_page
+    return cached_orders_page(request, db, page_cache.SHIPPER, current_user.id, use_msgpack, render)
 
 # CARRIER ENDPOINTS
 
-@router.get("/available", response_model=PaginatedResult[Order])
+@router.get("/available", response_model=PaginatedResult[Order], responses=MSGPACK_RESPONSES)
 def list_available_orders(
     page: int = Query(1, ge=1, description="Page number"),
     page_size: int = Query(10, ge=1, le=100, description="Items per page"),
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    sort: str = Depends(requested_sort),
+    fields: Optional[List[str]] = Depends(requested_fields),
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(
+        RequireAccountType("carrier", detail="Only carriers can view available orders")
+    ),
+    use_msgpack: bool = Depends(accepts_msgpack)
 ) -> Any:
     """
     Retrieve all unassigned orders (Carrier only).
+    Pass `sort=` (e.g. `sort=delivery_deadline` or `sort=-weight`) to change the order.
+    Pass `fields=` (e.g. `fields=summary`) for a sparse projection of each order.
+    Send `Accept: application/msgpack` for a MessagePack-encoded page.
     """
-    # Check if user is a carrier
-    if not is_carrier(current_user):
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Only carriers can view available orders"
-        )
-    
     # Calculate skip value for pagination
     skip = (page - 1) * page_size
     
@@ -123,79 +331,113 @@ def list_available_orders(
     orders_page = order_service.get_available_orders(
         db=db,
         skip=skip,
-        limit=page_size
+        limit=page_size,
+        fields=service_fields(fields),
+        sort=sort,
+        from_read_model=settings.READ_MODEL_ENABLED
     )
     
-    # Load order items for each order
-    for order in orders_page.items:
-        order.items = order_service.get_items(db, order.id)
-    
-    # Convert SQLAlchemy models to Pydantic models
-    orders_page.items = [Order.model_validate(order) for order in orders_page.items]
-    
-    return orders_page
+    return render_orders_page(db, orders_page, fields, use_msgpack)
 
-@router.get("/my-deliveries", response_model=PaginatedResult[Order])
+@router.get("/my-deliveries", response_model=FacetedResult[Order], responses=MSGPACK_RESPONSES)
 def list_carrier_orders(
-    status: Optional[str] = Query(None, description="Filter by order status"),
+    request: Request,
+    statuses: Optional[List[OrderStatus]] = Depends(requested_statuses),
+    date_from: Optional[datetime] = Query(None, description="Only orders created at or after this time"),
+    date_to: Optional[datetime] = Query(None, description="Only orders created at or before this time"),
     page: int = Query(1, ge=1, description="Page number"),
     page_size: int = Query(10, ge=1, le=100, description="Items per page"),
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    sort: str = Depends(requested_sort),
+    fields: Optional[List[str]] = Depends(requested_fields),
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(
+        RequireAccountType("carrier", detail="Only carriers can access their deliveries")
+    ),
+    use_msgpack: bool = Depends(accepts_msgpack)
 ) -> Any:
     """
     Retrieve all orders assigned to the current carrier.
+    `status_counts` holds the number of matching orders per status, ignoring the status filter.
+    Pass `sort=` (e.g. `sort=delivery_deadline` or `sort=-weight`) to change the order.
+    Pass `fields=` (e.g. `fields=summary`) for a sparse projection of each order.
+    Send `Accept: application/msgpack` for a MessagePack-encoded page.
     """
-    # Check if user is a carrier
-    if not is_carrier(current_user):
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Only carriers can access their deliveries"
-        )
-    
     # Create filter parameters
     filter_params = OrderFilter(
-        status=status,
+        statuses=statuses,
+        date_from=date_from,
+        date_to=date_to,
         is_assigned=True
     )
     
     # Calculate skip value for pagination
     skip = (page - 1) * page_size
     
-    # Get orders
-    orders_page = order_service.get_multi(
-        db=db,
-        carrier_id=current_user.id,
-        filter_params=filter_params,
-        skip=skip,
-        limit=page_size
-    )
-    
-    # Load order items for each order
-    for order in orders_page.items:
-        order.items = order_service.get_items(db, order.id)
+    def render():
+        # Get orders
+        orders_page = order_service.get_multi(
+            db=db,
+            carrier_id=current_user.id,
+            filter_params=filter_params,
+            skip=skip,
+            limit=page_size,
+            fields=service_fields(fields),
+            facets=True,
+            sort=sort,
+            from_read_model=settings.READ_MODEL_ENABLED
+        )
+        return render_orders_page(db, orders_page, fields, use_msgpack)
     
-    # Convert SQLAlchemy models to Pydantic models
-    orders_page.items = [Order.model_validate(order) for order in orders_page.items]
+    return cached_orders_page(request, db, page_cache.CARRIER, current_user.id, use_msgpack, render)
+
+@router.get("/my-deliveries/changes", response_model=OrderChanges)
+def list_carrier_order_changes(
+    since: Optional[datetime] = Query(
+        None, description="Watermark returned by the previous sync; omit for a full sync"
+    ),
+    limit: int = Query(500, ge=1, le=1000, description="Maximum orders per response"),
+    db: Session = Depends(get_read_db),
+    current_user: User = Depends(
+        RequireAccountType("carrier", detail="Only carriers can access their deliveries")
+    )
+) -> Any:
+    """
+    Orders assigned to the current carrier that were created, updated or deleted
+    since the `since` watermark, with their items. Pass the returned `watermark`
+    as `since` next time; when `has_more` is true, call again right away. A
+    watermark older than the retained deletions gets a 410; sync in full instead.
+    """
+    try:
+        changes = sync_service.get_carrier_changes(
+            db, carrier_id=current_user.id, since=since, limit=limit
+        )
+    except sync_service.WatermarkExpired as e:
+        raise HTTPException(
+            status_code=status.HTTP_410_GONE,
+            detail=f"{e}; sync again without `since`"
+        )
     
-    return orders_page
+    # Get order items
+    items_by_order = order_service.get_items_for_orders(db, [order.id for order in changes.orders])
+    for order in changes.orders:
+        order.items = items_by_order[order.id]
+    
+    return OrderChanges(
+        orders=[Order.model_validate(order) for order in changes.orders],
+        deleted=changes.deleted,
+        watermark=changes.watermark,
+        has_more=changes.has_more
+    )
 
 @router.post("/{order_id}/accept", response_model=Order)
 def accept_order(
     order_id: int,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    current_user: User = Depends(RequireAccountType("carrier", detail="Only carriers can accept orders"))
 ) -> Any:
     """
     Accept an order for delivery (Carrier only).
     """
-    # Check if user is a carrier
-    if not is_carrier(current_user):
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Only carriers can accept orders"
-        )
-    
     order = order_service.get_by_id(db=db, order_id=order_id)
     
     if not order:
@@ -212,14 +454,20 @@ def accept_order(
         )
     
     try:
-        # Update the order using the carrier assignment service function
-        carrier_assignment = CarrierAssignment(carrier_id=current_user.id)
-        order = order_service.assign_carrier(db=db, db_obj=order, carrier_assignment=carrier_assignment)
+        # Guarded update, so a concurrent accept (or the dispatch engine) can't take it twice
+        if not order_state.assign(db, {order.id: current_user.id}):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="This order is no longer available"
+            )
+        db.refresh(order)
         
         # Get order items
         order.items = order_service.get_items(db, order.id)
         
         return Order.model_validate(order)
+    except HTTPException:
+        raise
     except Exception as e:
         db.rollback()
         print(f"Error accepting order: {e}")
@@ -228,170 +476,177 @@ def accept_order(
             detail=f"Failed to accept order: {str(e)}"
         )
 
-# SHARED ENDPOINTS
-
-@router.get("/{order_id}", response_model=Order)
-def get_order(
-    order_id: int,
+@router.post("/positions:batch", response_model=PositionBatchResult, status_code=status.HTTP_202_ACCEPTED)
+def report_positions(
+    batch: PositionBatch,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    current_user: User = Depends(RequireAccountType("carrier", detail="Only carriers can report positions"))
 ) -> Any:
     """
-    Get order by ID (Shipper can access their own orders, Carrier can access assigned orders).
+    Report GPS fixes for picked-up and in-transit orders (Carrier only), up to 1000 per call.
+    Fixes for other orders are rejected per order instead of failing the batch.
+    The latest position is served by tracking at once; history is written in bulk shortly after.
     """
-    order = order_service.get_by_id(db=db, order_id=order_id)
-    
-    if not order:
+    try:
+        accepted, rejections = telemetry.ingest(db, current_user.id, batch.points)
+    except telemetry.BufferFull as e:
         raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail=f"Order with ID {order_id} not found"
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=str(e),
+            headers={"Retry-After": str(max(1, int(settings.TELEMETRY_FLUSH_SECONDS + 0.999)))}
         )
     
-    # Check permissions based on user role
-    if is_shipper(current_user):
-        # Shipper can only access their own orders
-        if order.shipper_id != current_user.id:
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail="Not enough permissions to access this order"
-            )
-    elif is_carrier(current_user):
-        # Carrier can only access orders assigned to them
-        if order.carrier_id != current_user.id:
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail="Not enough permissions to access this order"
+    return PositionBatchResult(
+        accepted=accepted,
+        rejected=[PositionRejection(order_id=order_id, error=error, detail=detail)
+                  for order_id, error, detail in rejections]
+    )
+
+@router.patch("/status:batch", response_model=OrderStatusBatchResult)
+def update_order_status_batch(
+    batch: OrderStatusBatchUpdate,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user),
+    idempotency: Optional[IdempotencyKey] = Depends(idempotency_key)
+) -> Any:
+    """
+    Move many orders to the same status in one transaction, e.g. a truckload going IN_TRANSIT.
+    Orders that can't be moved are reported per order instead of failing the batch.
+    Send an Idempotency-Key header to make retries return the original response.
+    """
+    batch_result = None
+
+    # Built before the commit, so the stored response commits with the updates
+    def respond(results) -> None:
+        nonlocal batch_result
+        updated = sum(1 for result in results if result.ok)
+        batch_result = OrderStatusBatchResult(
+            updated=updated,
+            failed=len(results) - updated,
+            results=[OrderStatusResult(**result._asdict()) for result in results]
+        )
+        if idempotency:
+            idempotency_service.save_response(
+                db, idempotency, status.HTTP_200_OK, jsonable_encoder(batch_result)
             )
+
+    try:
+        order_state.transition_many(
+            db, batch.order_ids, batch.status, current_user.account_type, current_user.id,
+            before_commit=respond
+        )
+    except ForbiddenTransition as e:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail=str(e))
+    return batch_result
+
+# SHARED ENDPOINTS
+
+@router.get("/at-risk", response_model=List[AtRiskOrder])
+def list_at_risk_orders(
+    current_user: User = Depends(
+        RequireAccountType("shipper", "carrier", detail="Invalid account type")
+    ),
+    db: Session = Depends(get_read_db)
+) -> Any:
+    """
+    Open orders of the current shipper or carrier that are close to or past their
+    delivery deadline, most urgent first. Served from the SLA monitor's memory in
+    the worker running it, and from the database everywhere else.
+    """
+    owner_field = OWNER_FIELDS[current_user.account_type]
+    if sla_monitor.loaded:
+        events = sla_monitor.at_risk(**{owner_field: current_user.id})
     else:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Invalid account type"
+        events = sla_monitor.query_at_risk(db, **{owner_field: current_user.id})
+    return [
+        AtRiskOrder(
+            order_id=event.order_id,
+            order_number=event.order_number,
+            status=event.status,
+            carrier_id=event.carrier_id,
+            delivery_deadline=event.delivery_deadline,
+            risk=event.kind
         )
+        for event in events
+    ]
+
+@router.get("/{order_id}", response_model=Order)
+def get_order(
+    access: OrderAccess = Depends(
+        require_order_access("Not enough permissions to access this order", include_archived=True)
+    ),
+    db: Session = Depends(get_db)
+) -> Any:
+    """
+    Get order by ID (Shipper can access their own orders, Carrier can access assigned orders).
+    Archived orders are found as well.
+    """
+    order = order_service.get_by_access(db, access)
     
     # Get order items
-    order.items = order_service.get_items(db, order.id)
+    order.items = order_service.get_items(db, order.id, archived=access.archived)
     
     return Order.model_validate(order)
 
-@router.get("/track/{tracking_number}", response_model=Order)
+@router.get("/track/{tracking_number}", response_model=TrackedOrder)
 def track_order(
-    tracking_number: str,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    access: OrderAccess = Depends(
+        require_tracking_access("Not enough permissions to track this order", include_archived=True)
+    ),
+    db: Session = Depends(get_read_db)
 ) -> Any:
     """
-    Track an order by tracking number.
+    Track an order by tracking number, including archived orders.
+    Orders on the move carry the carrier's latest reported position.
     """
-    order = order_service.get_by_tracking_number(db=db, tracking_number=tracking_number)
-    
-    if not order:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail=f"Order with tracking number {tracking_number} not found"
-        )
-    
-    # Check permissions based on user role
-    if is_shipper(current_user):
-        # Shipper can only track their own orders
-        if order.shipper_id != current_user.id:
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail="Not enough permissions to track this order"
-            )
-    elif is_carrier(current_user):
-        # Carrier can only track orders assigned to them
-        if order.carrier_id != current_user.id:
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail="Not enough permissions to track this order"
-            )
+    order = order_service.get_by_access(db, access)
     
     # Get order items
-    order.items = order_service.get_items(db, order.id)
-    
-    return Order.model_validate(order)
+    order.items = order_service.get_items(db, order.id, archived=access.archived)
+    
+    tracked = TrackedOrder.model_validate(order)
+    # Served from memory and the shared cache, never from the history table
+    fix = telemetry.latest_position(access.id)
+    if fix is not None:
+        tracked.position = OrderPosition(**fix.as_position())
+    return tracked
 
 @router.patch("/{order_id}/status", response_model=Order)
 def update_order_status(
-    order_id: int,
     status_update: OrderStatusUpdate,
+    access: OrderAccess = Depends(require_order_access("Not enough permissions to modify this order")),
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user)
+    current_user: User = Depends(get_current_active_user),
+    idempotency: Optional[IdempotencyKey] = Depends(idempotency_key)
 ) -> Any:
     """
     Update order status (Shipper can cancel, Carrier can update delivery status).
+    Send an Idempotency-Key header to make retries return the original response.
     """
-    print(f"Received status update request for order {order_id}")
-    print(f"Status update data: {status_update}")
-    print(f"Status value: {status_update.status}, Type: {type(status_update.status)}")
-    
-    order = order_service.get_by_id(db=db, order_id=order_id)
-    
-    if not order:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail=f"Order with ID {order_id} not found"
-        )
-    
-    # Apply role-based permissions for status updates
-    if is_shipper(current_user):
-        # Shipper can only update their own orders
-        if order.shipper_id != current_user.id:
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail="Not enough permissions to modify this order"
-            )
-        
-        # Shipper can only cancel orders that are not yet delivered
-        if status_update.status == OrderStatus.CANCELLED:
-            if order.status in [OrderStatus.DELIVERED]:
-                raise HTTPException(
-                    status_code=status.HTTP_400_BAD_REQUEST,
-                    detail="Cannot cancel an order that has been delivered"
-                )
-        else:
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail="Shippers can only cancel orders"
-            )
-            
-    elif is_carrier(current_user):
-        # Carrier can only update orders assigned to them
-        if order.carrier_id != current_user.id:
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail="Not enough permissions to modify this order"
-            )
-        
-        # Carrier cannot cancel orders
-        if status_update.status == OrderStatus.CANCELLED:
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail="Carriers cannot cancel orders"
-            )
-        
-        # Validate status transitions
-        valid_transitions = {
-            OrderStatus.ACCEPTED: [OrderStatus.PICKED_UP],
-            OrderStatus.PICKED_UP: [OrderStatus.IN_TRANSIT],
-            OrderStatus.IN_TRANSIT: [OrderStatus.DELIVERED]
-        }
-        
-        if order.status not in valid_transitions or status_update.status not in valid_transitions.get(order.status, []):
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail=f"Invalid status transition from {order.status} to {status_update.status}"
+    result = None
+
+    # Built before the commit, so the stored response commits with the new status
+    def respond(row) -> None:
+        nonlocal result
+        items = order_service.get_items(db, row.id)
+        result = Order.model_validate({**row._mapping, "items": items})
+        if idempotency:
+            idempotency_service.save_response(
+                db, idempotency, status.HTTP_200_OK, jsonable_encoder(result)
             )
-    else:
+
+    # Checked against the status in the database, not the cached one in `access`
+    try:
+        order = order_state.move(
+            db, access.id, current_user.account_type, status_update.status, before_commit=respond
+        )
+    except ForbiddenTransition as e:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail=str(e))
+    except InvalidTransition as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    if order is None:
         raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Invalid account type"
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Order with ID {access.id} not found"
         )
-    
-    # Update order status
-    order = order_service.update_status(db=db, db_obj=order, status_update=status_update)
-    
-    # Get order items
-    order.items = order_service.get_items(db, order.id)
-    
-    return Order.model_validate(order) 
\ No newline at end of file
+    return result 
\ No newline at end of file
@@ -1,16 +1,17 @@
 from typing import Optional
 from datetime import datetime, timedelta
+import json
 
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
-from jose import jwt, JWTError
-from sqlalchemy.orm import Session
+from jose import JWTError
+from sqlalchemy.orm import Session, make_transient_to_detached
 
+from app.core import database, shm_cache
 from app.core.config import settings
-from app.core.security import verify_password
-from app.core.database import get_db
+from app.core.security import verify_password, get_token_subject
+from app.core.database import get_read_db
 from app.models.user import User
-from app.schemas.user import TokenPayload
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl=f"{settings.API_V1_STR}/auth/login")
 
@@ -22,25 +23,76 @@ def authenticate_user(db: Session, username: str, password: str) -> Optional[Use
         return None
     return user
 
+# Columns kept in the shared cache; the password hash stays in the database
+_CACHED_USER_COLUMNS = ("id", "name", "email", "username", "account_type", "is_active", "is_superuser")
+_CACHED_USER_TIMESTAMPS = ("created_at", "updated_at")
+
+def _user_key(user_id: int) -> str:
+    return f"user:{user_id}"
+
+def forget_user(user_id: int) -> None:
+    """Drop a user from the shared cache after their row changes."""
+    cache = shm_cache.get_cache()
+    if cache is not None:
+        cache.invalidate(_user_key(user_id))
+
+def load_user(db: Session, user_id: int) -> Optional[User]:
+    """
+    Load a user by id through the shared cache. Cached users are attached to `db`
+    without a query; they carry no password hash and may be up to
+    USER_CACHE_TTL_SECONDS old.
+    """
+    cache = shm_cache.get_cache()
+    key = _user_key(user_id)
+    cached = cache.lookup(key) if cache is not None else None
+    if cached is not None:
+        values = json.loads(cached)
+        for column in _CACHED_USER_TIMESTAMPS:
+            if values[column] is not None:
+                values[column] = datetime.fromisoformat(values[column])
+        user = User(**values)
+        make_transient_to_detached(user)
+        return db.merge(user, load=False)
+
+    user = db.query(User).filter(User.id == user_id).first()
+    if user is not None and cache is not None:
+        value = {column: getattr(user, column) for column in _CACHED_USER_COLUMNS}
+        for column in _CACHED_USER_TIMESTAMPS:
+            timestamp = getattr(user, column)
+            value[column] = timestamp.isoformat() if timestamp is not None else None
+        cache.add(key, json.dumps(value).encode(), settings.USER_CACHE_TTL_SECONDS)
+    return user
+
 def get_current_user(
-    db: Session = Depends(get_db), token: str = Depends(oauth2_scheme)
+    db: Session = Depends(get_read_db), token: str = Depends(oauth2_scheme)
 ) -> User:
+    """
+    The user a bearer token belongs to, from the shared cache or else the read
+    session. The returned user is detached, and a connection taken to load it
+    is handed back, so a request never holds one for its user while waiting
+    for another for its own work.
+    """
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
     try:
-        payload = jwt.decode(
-            token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM]
-        )
-        token_data = TokenPayload(**payload)
-        if token_data.sub is None:
-            raise credentials_exception
-    except JWTError:
+        user_id = get_token_subject(token)
+    except (JWTError, ValueError):
         raise credentials_exception
 
-    user = db.query(User).filter(User.id == token_data.sub).first()
+    user = load_user(db, user_id)
+    if user is not None:
+        db.expunge(user)
+    db.rollback()
+    if user is None and database.reads_replica(db):
+        # A new account may not have reached the replica yet
+        primary = database.SessionLocal()
+        try:
+            user = load_user(primary, user_id)
+        finally:
+            primary.close()
     if user is None:
         raise credentials_exception
     if not user.is_active:
@@ -50,4 +102,9 @@ def get_current_user(
 def get_current_active_user(current_user: User = Depends(get_current_user)) -> User:
     if not current_user.is_active:
         raise HTTPException(status_code=400, detail="Inactive user")
-    return current_user 
\ No newline at end of file
+    return current_user
+
+def get_current_active_superuser(current_user: User = Depends(get_current_active_user)) -> User:
+    if not current_user.is_superuser:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not enough permissions")
+    return current_user
\ No newline at end of file
@@ -0,0 +1,158 @@
+from typing import Any, Dict, List, Optional, Tuple
+import asyncio
+import json
+from urllib.parse import urlsplit
+
+from fastapi import HTTPException, Request, status
+from fastapi.dependencies.models import Dependant
+from fastapi.dependencies.utils import solve_dependencies
+from fastapi.encoders import jsonable_encoder
+from fastapi.exceptions import RequestValidationError
+from fastapi.routing import APIRoute, run_endpoint_function, serialize_response
+from sqlalchemy.orm import Session
+from starlette.responses import Response
+from starlette.routing import Match
+
+from app.core.auth import get_current_active_user, get_current_user
+from app.core.config import settings
+from app.core.database import get_db, get_read_db
+from app.models.user import User
+from app.schemas.batch import SubRequest, SubResponse
+
+# Dependencies a batch resolves once and hands to every sub-request
+SHARED_DEPENDENCIES = (get_db, get_read_db, get_current_user, get_current_active_user)
+
+_SESSION_DEPENDENCIES = (get_db, get_read_db)
+_USER_DEPENDENCIES = (get_current_user, get_current_active_user)
+
+# Request headers that describe the batch body rather than the sub-requests
+_SKIPPED_HEADERS = {b"content-length", b"content-type", b"accept", b"idempotency-key"}
+
+def uses_session(dependant: Dependant) -> bool:
+    """
+    Whether resolving `dependant` touches the database session. The user
+    dependencies are not followed: a batch resolves them before dispatching.
+    """
+    for sub_dependant in dependant.dependencies:
+        if sub_dependant.call in _SESSION_DEPENDENCIES:
+            return True
+        if sub_dependant.call not in _USER_DEPENDENCIES and uses_session(sub_dependant):
+            return True
+    return False
+
+class BatchDispatcher:
+    """
+    Run read sub-requests through the app's own routes inside one request.
+
+    Every sub-request gets the batch's user and database session from a
+    pre-filled dependency cache, so the token is decoded, the user is loaded and
+    a connection is checked out once per batch rather than once per call.
+    Sub-requests run concurrently. Those whose routes use the session share
+    it, so they take turns on a lock; the rest (e.g. /users/me, which only
+    needs the already resolved user) run alongside them.
+    """
+
+    def __init__(self, request: Request, db: Session, user: User):
+        self.request = request
+        self.db = db
+        self.user = user
+        self._session_lock = asyncio.Lock()
+
+    def _dependency_cache(self) -> Dict[Tuple[Any, Tuple[str, ...]], Any]:
+        overrides = self.request.app.dependency_overrides
+        values = {get_db: self.db, get_read_db: self.db,
+                  get_current_user: self.user, get_current_active_user: self.user}
+        # Cache keys use the override when one is installed (e.g. in tests)
+        return {(overrides.get(call, call), ()): values[call] for call in SHARED_DEPENDENCIES}
+
+    def _scope(self, path: str, query: str) -> Dict[str, Any]:
+        parent = self.request.scope
+        headers = [(name, value) for name, value in parent["headers"] if name not in _SKIPPED_HEADERS]
+        headers.append((b"accept", b"application/json"))
+        return {
+            **parent,
+            "method": "GET",
+            "path": path,
+            "raw_path": path.encode(),
+            "query_string": query.encode(),
+            "headers": headers,
+        }
+
+    def _match(self, scope: Dict[str, Any]) -> Tuple[Optional[APIRoute], bool]:
+        """The route serving `scope`, and whether some route has the path but not the method."""
+        method_mismatch = False
+        for route in self.request.app.router.routes:
+            if not isinstance(route, APIRoute):
+                continue
+            match, child_scope = route.matches(scope)
+            if match == Match.FULL:
+                scope.update(child_scope)
+                scope["route"] = route
+                return route, False
+            method_mismatch = method_mismatch or match == Match.PARTIAL
+        return None, method_mismatch
+
+    async def _run(self, route: APIRoute, scope: Dict[str, Any]) -> Tuple[int, Any, Dict[str, str]]:
+        if uses_session(route.dependant):
+            async with self._session_lock:
+                return await self._call(route, Request(scope))
+        return await self._call(route, Request(scope))
+
+    async def _call(self, route: APIRoute, request: Request) -> Tuple[int, Any, Dict[str, str]]:
+        values, errors, _, sub_response, _ = await solve_dependencies(
+            request=request,
+            dependant=route.dependant,
+            dependency_overrides_provider=route.dependency_overrides_provider,
+            dependency_cache=self._dependency_cache(),
+        )
+        if errors:
+            raise RequestValidationError(errors)
+        is_coroutine = asyncio.iscoroutinefunction(route.dependant.call)
+        raw = await run_endpoint_function(dependant=route.dependant, values=values, is_coroutine=is_coroutine)
+
+        # Serialized under the same lock, since validating ORM objects can lazy-load
+        if isinstance(raw, Response):
+            body = json.loads(raw.body) if raw.body else None
+            return raw.status_code, body, {}
+        content = await serialize_response(
+            field=route.response_field,
+            response_content=raw,
+            include=route.response_model_include,
+            exclude=route.response_model_exclude,
+            by_alias=route.response_model_by_alias,
+            exclude_unset=route.response_model_exclude_unset,
+            exclude_defaults=route.response_model_exclude_defaults,
+            exclude_none=route.response_model_exclude_none,
+            is_coroutine=is_coroutine,
+        )
+        return sub_response.status_code or route.status_code or status.HTTP_200_OK, content, {}
+
+    async def run_one(self, sub_request: SubRequest) -> SubResponse:
+        parts = urlsplit(sub_request.path)
+        path = parts.path
+        if not path.startswith(settings.API_V1_STR + "/"):
+            path = settings.API_V1_STR + path
+        scope = self._scope(path, parts.query)
+
+        # Only GET routes match, so a nested batch gets a 405
+        route, method_mismatch = self._match(scope)
+        if route is None:
+            code = status.HTTP_405_METHOD_NOT_ALLOWED if method_mismatch else status.HTTP_404_NOT_FOUND
+            detail = "Method Not Allowed" if method_mismatch else "Not Found"
+            return SubResponse(id=sub_request.id, status=code, body={"detail": detail})
+
+        try:
+            code, body, headers = await self._run(route, scope)
+        except HTTPException as exc:
+            code, body, headers = exc.status_code, {"detail": exc.detail}, dict(exc.headers or {})
+        except RequestValidationError as exc:
+            code, body, headers = status.HTTP_422_UNPROCESSABLE_ENTITY, {"detail": jsonable_encoder(exc.errors())}, {}
+        except Exception as exc:
+            # Leave the shared session usable for the remaining sub-requests
+            self.db.rollback()
+            print(f"Batch sub-request {sub_request.path} failed: {exc!r}")
+            code, body, headers = status.HTTP_500_INTERNAL_SERVER_ERROR, {"detail": "Internal Server Error"}, {}
+        return SubResponse(id=sub_request.id, status=code, headers=headers, body=body)
+
+    async def run(self, sub_requests: List[SubRequest]) -> List[SubResponse]:
+        return list(await asyncio.gather(*(self.run_one(sub_request) for sub_request in sub_requests)))
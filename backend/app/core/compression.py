@@ -0,0 +1,163 @@
+from typing import Optional, Sequence
+import zlib
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.encoding import parse_qualities
+
+try:
+    import brotli
+except ImportError:  # brotli is optional, gzip is always available
+    brotli = None
+
+# Media types that are already compressed or not worth compressing
+INCOMPRESSIBLE_PREFIXES = ("image/", "video/", "audio/", "application/zip", "application/gzip")
+
+def choose_encoding(
+    accept_encoding: str,
+    brotli_enabled: bool = True,
+    available: Optional[Sequence[str]] = None,
+) -> Optional[str]:
+    """
+    Pick the content coding the client rates highest, out of `available` in
+    order of preference (by default what this process can compress with).
+    Codings the client rates equally go by that preference; q=0 refuses one.
+    """
+    accepted = parse_qualities(accept_encoding)
+    if available is None:
+        available = ["br", "gzip"] if brotli is not None and brotli_enabled else ["gzip"]
+
+    best, best_quality = None, 0.0
+    for coding in available:
+        # Only a strictly higher q beats an earlier, more preferred coding
+        quality = accepted.get(coding, accepted.get("*", 0.0))
+        if quality > best_quality:
+            best, best_quality = coding, quality
+    return best
+
+class _Compressor:
+    def __init__(self, encoding: str, gzip_level: int, brotli_quality: int):
+        self.encoding = encoding
+        if encoding == "br":
+            self._brotli = brotli.Compressor(quality=brotli_quality)
+        else:
+            self._zlib = zlib.compressobj(gzip_level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    def compress(self, data: bytes) -> bytes:
+        if self.encoding == "br":
+            return self._brotli.process(data)
+        return self._zlib.compress(data)
+
+    def flush(self) -> bytes:
+        if self.encoding == "br":
+            return self._brotli.flush()
+        return self._zlib.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        if self.encoding == "br":
+            return self._brotli.finish()
+        return self._zlib.flush()
+
+class CompressionMiddleware:
+    """
+    Compress responses with brotli or gzip, negotiated from Accept-Encoding.
+
+    Responses smaller than `minimum_size`, already encoded responses and
+    incompressible media types are passed through untouched.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        minimum_size: int = 1024,
+        gzip_level: int = 6,
+        brotli_quality: int = 4,
+        brotli_enabled: bool = True,
+    ) -> None:
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+        self.brotli_enabled = brotli_enabled
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] == "http":
+            headers = Headers(scope=scope)
+            encoding = choose_encoding(headers.get("Accept-Encoding", ""), self.brotli_enabled)
+            if encoding:
+                responder = CompressionResponder(
+                    self.app, self.minimum_size,
+                    _Compressor(encoding, self.gzip_level, self.brotli_quality),
+                )
+                await responder(scope, receive, send)
+                return
+        await self.app(scope, receive, send)
+
+class CompressionResponder:
+    def __init__(self, app: ASGIApp, minimum_size: int, compressor: _Compressor) -> None:
+        self.app = app
+        self.minimum_size = minimum_size
+        self.compressor = compressor
+        self.send: Send = None
+        self.initial_message: Message = {}
+        self.started = False
+        self.passthrough = False
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        self.send = send
+        await self.app(scope, receive, self.send_compressed)
+
+    async def send_compressed(self, message: Message) -> None:
+        message_type = message["type"]
+        if message_type == "http.response.start":
+            # Hold the start message until the first body chunk decides the headers
+            self.initial_message = message
+            headers = Headers(raw=message["headers"])
+            content_type = headers.get("content-type", "")
+            self.passthrough = (
+                "content-encoding" in headers
+                or content_type.startswith(INCOMPRESSIBLE_PREFIXES)
+            )
+            return
+
+        if message_type != "http.response.body":
+            await self.send(message)
+            return
+
+        if self.passthrough:
+            if not self.started:
+                self.started = True
+                await self.send(self.initial_message)
+            await self.send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+
+        if not self.started:
+            self.started = True
+            if len(body) < self.minimum_size and not more_body:
+                await self.send(self.initial_message)
+                await self.send(message)
+                self.passthrough = True
+                return
+
+            headers = MutableHeaders(raw=self.initial_message["headers"])
+            headers["Content-Encoding"] = self.compressor.encoding
+            headers.add_vary_header("Accept-Encoding")
+            if more_body:
+                del headers["Content-Length"]
+                message["body"] = self.compressor.compress(body) + self.compressor.flush()
+            else:
+                message["body"] = self.compressor.compress(body) + self.compressor.finish()
+                headers["Content-Length"] = str(len(message["body"]))
+            await self.send(self.initial_message)
+            await self.send(message)
+            return
+
+        if more_body:
+            message["body"] = self.compressor.compress(body) + self.compressor.flush()
+        else:
+            message["body"] = self.compressor.compress(body) + self.compressor.finish()
+        await self.send(message)
@@ -14,6 +14,124 @@ class Settings(BaseSettings):
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = int(os.environ.get("ACCESS_TOKEN_EXPIRE_MINUTES", "30"))
     
+    # Read replica (reads go to the primary when unset)
+    DATABASE_READ_URL: Optional[str] = os.environ.get("DATABASE_READ_URL")
+    # Seconds a user's reads stay on the primary after they write
+    READ_YOUR_WRITES_SECONDS: float = float(os.environ.get("READ_YOUR_WRITES_SECONDS", "5"))
+    
+    # Order/tracking number generator shard (0-1023), unique per running process;
+    # under gunicorn it is the host's base and each worker adds its slot
+    ID_SHARD_ID: Optional[int] = int(os.environ["ID_SHARD_ID"]) if os.environ.get("ID_SHARD_ID") else None
+    
+    # Connections opened per engine during startup warm-up
+    DB_POOL_PREWARM: int = int(os.environ.get("DB_POOL_PREWARM", "5"))
+    
+    # Built frontend served at / (not served when unset)
+    STATIC_DIR: Optional[str] = os.environ.get("STATIC_DIR")
+    
+    # Delivery SLA monitor. Its events are only printed for now, so it is off
+    # unless asked for; /at-risk reads the database while it isn't running
+    SLA_MONITOR_ENABLED: bool = os.environ.get("SLA_MONITOR_ENABLED", "false").lower() == "true"
+    # Orders due within this many minutes are flagged as at risk
+    SLA_AT_RISK_MINUTES: int = int(os.environ.get("SLA_AT_RISK_MINUTES", "120"))
+    SLA_CHECK_INTERVAL_SECONDS: float = float(os.environ.get("SLA_CHECK_INTERVAL_SECONDS", "30"))
+    
+    # Idempotency keys
+    IDEMPOTENCY_KEY_TTL_HOURS: int = int(os.environ.get("IDEMPOTENCY_KEY_TTL_HOURS", "24"))
+    # An in-progress claim lapses after this long, so a crashed request doesn't hold its key
+    IDEMPOTENCY_LEASE_SECONDS: int = int(os.environ.get("IDEMPOTENCY_LEASE_SECONDS", "60"))
+    
+    # Rate limiting (token buckets per user and route, per IP for auth routes)
+    RATE_LIMIT_ENABLED: bool = os.environ.get("RATE_LIMIT_ENABLED", "true").lower() == "true"
+    RATE_LIMIT_PER_MINUTE: int = int(os.environ.get("RATE_LIMIT_PER_MINUTE", "600"))
+    RATE_LIMIT_BURST: int = int(os.environ.get("RATE_LIMIT_BURST", "100"))
+    AUTH_RATE_LIMIT_PER_MINUTE: int = int(os.environ.get("AUTH_RATE_LIMIT_PER_MINUTE", "20"))
+    AUTH_RATE_LIMIT_BURST: int = int(os.environ.get("AUTH_RATE_LIMIT_BURST", "10"))
+    
+    # Load shedding (0 disables a check)
+    MAX_IN_FLIGHT_REQUESTS: int = int(os.environ.get("MAX_IN_FLIGHT_REQUESTS", "200"))
+    MAX_POOL_WAIT_MS: int = int(os.environ.get("MAX_POOL_WAIT_MS", "500"))
+    LOAD_SHEDDING_RETRY_AFTER_SECONDS: int = int(os.environ.get("LOAD_SHEDDING_RETRY_AFTER_SECONDS", "2"))
+    
+    # Response compression
+    COMPRESSION_ENABLED: bool = os.environ.get("COMPRESSION_ENABLED", "true").lower() == "true"
+    COMPRESSION_MINIMUM_SIZE: int = int(os.environ.get("COMPRESSION_MINIMUM_SIZE", "1024"))
+    GZIP_LEVEL: int = int(os.environ.get("GZIP_LEVEL", "6"))
+    BROTLI_ENABLED: bool = os.environ.get("BROTLI_ENABLED", "true").lower() == "true"
+    BROTLI_QUALITY: int = int(os.environ.get("BROTLI_QUALITY", "4"))
+    
+    # Carrier change sync: each sync re-reads this many seconds before the client's
+    # watermark, so a write that committed after a later one was read isn't missed
+    SYNC_OVERLAP_SECONDS: float = float(os.environ.get("SYNC_OVERLAP_SECONDS", "5"))
+    
+    # Archival of delivered and cancelled orders
+    ARCHIVE_AFTER_DAYS: int = int(os.environ.get("ARCHIVE_AFTER_DAYS", "90"))
+    ARCHIVE_BATCH_SIZE: int = int(os.environ.get("ARCHIVE_BATCH_SIZE", "1000"))
+    
+    # Purging of soft-deleted orders
+    PURGE_AFTER_MINUTES: int = int(os.environ.get("PURGE_AFTER_MINUTES", "60"))
+    PURGE_BATCH_SIZE: int = int(os.environ.get("PURGE_BATCH_SIZE", "500"))
+    PURGE_ROWS_PER_SECOND: float = float(os.environ.get("PURGE_ROWS_PER_SECOND", "2000"))
+    # Run the purge in the background (in one worker) every PURGE_INTERVAL_SECONDS
+    PURGE_ENABLED: bool = os.environ.get("PURGE_ENABLED", "true").lower() == "true"
+    PURGE_INTERVAL_SECONDS: float = float(os.environ.get("PURGE_INTERVAL_SECONDS", "300"))
+    # Deletion markers for sync clients are kept this long; a client whose last
+    # sync is older has to sync in full
+    TOMBSTONE_RETENTION_DAYS: int = int(os.environ.get("TOMBSTONE_RETENTION_DAYS", "30"))
+    
+    # Share one query between identical concurrent reads (available board, tracking lookups)
+    COALESCE_READS: bool = os.environ.get("COALESCE_READS", "true").lower() == "true"
+    
+    # Per-user cache of serialized list pages, invalidated by per-owner generations
+    PAGE_CACHE_ENABLED: bool = os.environ.get("PAGE_CACHE_ENABLED", "true").lower() == "true"
+    PAGE_CACHE_MAX_ENTRIES: int = int(os.environ.get("PAGE_CACHE_MAX_ENTRIES", "10000"))
+    PAGE_CACHE_TTL_SECONDS: int = int(os.environ.get("PAGE_CACHE_TTL_SECONDS", "300"))
+    # Shared store for all workers, e.g. redis://cache:6379/0 (per-process LRU when unset)
+    PAGE_CACHE_URL: Optional[str] = os.environ.get("PAGE_CACHE_URL")
+    
+    # Cache of users, tokens and order lookups: "mmap" (shared by the workers on a host), "local" or "off"
+    SHARED_CACHE_BACKEND: str = os.environ.get("SHARED_CACHE_BACKEND", "mmap")
+    SHARED_CACHE_PATH: Optional[str] = os.environ.get("SHARED_CACHE_PATH")
+    SHARED_CACHE_SLOTS: int = int(os.environ.get("SHARED_CACHE_SLOTS", "8192"))
+    SHARED_CACHE_SLOT_SIZE: int = int(os.environ.get("SHARED_CACHE_SLOT_SIZE", "512"))
+    # A deactivated user keeps access for up to this long
+    USER_CACHE_TTL_SECONDS: int = int(os.environ.get("USER_CACHE_TTL_SECONDS", "60"))
+    ORDER_CACHE_TTL_SECONDS: int = int(os.environ.get("ORDER_CACHE_TTL_SECONDS", "300"))
+    
+    # Serve the order list endpoints from the denormalized order_read_model table.
+    # Off until rebuild_read_model.py has filled it after the migration that
+    # creates it; the order writes keep it current either way
+    READ_MODEL_ENABLED: bool = os.environ.get("READ_MODEL_ENABLED", "false").lower() == "true"
+    
+    # Serve /orders/available from an in-memory board in each worker, re-read from
+    # the database every ORDER_BOARD_REFRESH_SECONDS and reloaded in full every
+    # ORDER_BOARD_RELOAD_SECONDS
+    ORDER_BOARD_ENABLED: bool = os.environ.get("ORDER_BOARD_ENABLED", "true").lower() == "true"
+    ORDER_BOARD_REFRESH_SECONDS: float = float(os.environ.get("ORDER_BOARD_REFRESH_SECONDS", "2"))
+    ORDER_BOARD_RELOAD_SECONDS: float = float(os.environ.get("ORDER_BOARD_RELOAD_SECONDS", "300"))
+    
+    # Batch dispatch of open orders to carriers (off by default; enable it in one process only)
+    DISPATCH_ENABLED: bool = os.environ.get("DISPATCH_ENABLED", "false").lower() == "true"
+    DISPATCH_INTERVAL_SECONDS: float = float(os.environ.get("DISPATCH_INTERVAL_SECONDS", "60"))
+    # Most urgent open orders considered per run
+    DISPATCH_BATCH_SIZE: int = int(os.environ.get("DISPATCH_BATCH_SIZE", "5000"))
+    # Most open orders (accepted, picked up or in transit) a carrier is given
+    DISPATCH_CARRIER_CAPACITY: int = int(os.environ.get("DISPATCH_CARRIER_CAPACITY", "5"))
+    
+    # Carrier GPS telemetry: latest fixes kept per worker in a ring of TELEMETRY_RING_SIZE
+    # and in the shared cache, history written in bulk every TELEMETRY_FLUSH_SECONDS
+    # (or once TELEMETRY_FLUSH_SIZE fixes are waiting)
+    TELEMETRY_RING_SIZE: int = int(os.environ.get("TELEMETRY_RING_SIZE", "100000"))
+    TELEMETRY_POSITION_TTL_SECONDS: int = int(os.environ.get("TELEMETRY_POSITION_TTL_SECONDS", "3600"))
+    TELEMETRY_FLUSH_SECONDS: float = float(os.environ.get("TELEMETRY_FLUSH_SECONDS", "1"))
+    TELEMETRY_FLUSH_SIZE: int = int(os.environ.get("TELEMETRY_FLUSH_SIZE", "5000"))
+    # Ingestion answers 503 while this many fixes are waiting to be written
+    TELEMETRY_MAX_BUFFERED: int = int(os.environ.get("TELEMETRY_MAX_BUFFERED", "100000"))
+    # Fixes recorded further ahead of or behind server time are rejected, so a
+    # device with a wrong clock can't pin an order's latest position
+    TELEMETRY_MAX_CLOCK_SKEW_SECONDS: int = int(os.environ.get("TELEMETRY_MAX_CLOCK_SKEW_SECONDS", "300"))
+    TELEMETRY_MAX_AGE_SECONDS: int = int(os.environ.get("TELEMETRY_MAX_AGE_SECONDS", "86400"))
+    
     # CORS
     BACKEND_CORS_ORIGINS: List[str] = [
         "http://localhost:5173",
@@ -1,10 +1,18 @@
-from sqlalchemy import create_engine, text
+from datetime import datetime, timezone
+from typing import Dict, Optional
+from fastapi import Request
+from sqlalchemy import create_engine, event, text
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
 from tenacity import retry, stop_after_attempt, wait_exponential
 import os
+import threading
+import time
 
+from app.core import shm_cache
 from app.core.config import settings
+from app.core.load_shedding import pool_wait
+from app.core.security import get_request_user_id
 
 # Get individual connection parameters from environment variables
 PGHOST = os.environ.get("PGHOST")
@@ -16,30 +24,179 @@ PGPORT = os.environ.get("PGPORT", "5432")
 # Construct the database URL manually
 DATABASE_URL = f"postgresql://{PGUSER}:{PGPASSWORD}@{PGHOST}:{PGPORT}/{PGDATABASE}?sslmode=require"
 
-# Create engine with appropriate parameters for Neon PostgreSQL
-engine = create_engine(
-    DATABASE_URL,
-    pool_pre_ping=True,  # Enables reconnection on stale connections
-    pool_recycle=300,    # Recycle connections every 5 minutes
-    connect_args={
-        "connect_timeout": 10,  # Connection timeout in seconds
-        "keepalives": 1,        # Enable TCP keepalives
-        "keepalives_idle": 60   # Seconds between keepalives
-    }
-)
+def make_engine(url: str):
+    """Create an engine with appropriate parameters for Neon PostgreSQL."""
+    return create_engine(
+        url,
+        pool_pre_ping=True,  # Enables reconnection on stale connections
+        pool_recycle=300,    # Recycle connections every 5 minutes
+        connect_args={
+            "connect_timeout": 10,  # Connection timeout in seconds
+            "keepalives": 1,        # Enable TCP keepalives
+            "keepalives_idle": 60   # Seconds between keepalives
+        }
+    )
+
+engine = make_engine(DATABASE_URL)
+
+# Read-only replica for heavy read endpoints; falls back to the primary
+read_engine = make_engine(settings.DATABASE_READ_URL) if settings.DATABASE_READ_URL else engine
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+ReadSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=read_engine)
 
 Base = declarative_base()
 
+def as_utc(value: datetime) -> datetime:
+    """A timestamp read back from the database, made timezone-aware if needed."""
+    # SQLite hands back naive datetimes; everything is stored in UTC
+    return value.replace(tzinfo=timezone.utc) if value.tzinfo is None else value
+
+class RecentWriters:
+    """
+    Users who committed a write in the last few seconds. Their reads are routed to
+    the primary so they see their own writes before the replica catches up.
+
+    The window is also kept in the shared cache, so the user's next read sticks to
+    the primary whichever worker on the host serves it.
+    """
+
+    def __init__(self, max_users: int = 100_000):
+        self._until: Dict[int, float] = {}
+        self._lock = threading.Lock()
+        self._max_users = max_users
+
+    @staticmethod
+    def _key(user_id: int) -> str:
+        return f"recent-writer:{user_id}"
+
+    def mark(self, user_id: int, seconds: float) -> None:
+        now = time.monotonic()
+        with self._lock:
+            self._until[user_id] = now + seconds
+            if len(self._until) > self._max_users:
+                self._until = {uid: until for uid, until in self._until.items() if until > now}
+        cache = shm_cache.get_cache()
+        if cache is not None:
+            cache.set(self._key(user_id), b"1", seconds)
+
+    def __contains__(self, user_id: int) -> bool:
+        until = self._until.get(user_id)
+        if until is not None and until > time.monotonic():
+            return True
+        # Written through another worker
+        cache = shm_cache.get_cache()
+        return cache is not None and cache.lookup(self._key(user_id)) is not None
+
+    def clear(self) -> None:
+        cache = shm_cache.get_cache()
+        with self._lock:
+            if cache is not None:
+                for user_id in self._until:
+                    cache.delete(self._key(user_id))
+            self._until.clear()
+
+recent_writers = RecentWriters()
+
+@event.listens_for(Session, "after_flush")
+def _flag_flushed_write(session, flush_context):
+    session.info["wrote"] = True
+
+@event.listens_for(Session, "do_orm_execute")
+def _flag_statement_write(orm_execute_state):
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        orm_execute_state.session.info["wrote"] = True
+
+@event.listens_for(Session, "after_commit")
+def _remember_writer(session):
+    user_id = session.info.get("user_id")
+    if session.info.pop("wrote", False) and user_id is not None:
+        recent_writers.mark(user_id, settings.READ_YOUR_WRITES_SECONDS)
+
+@event.listens_for(Session, "after_rollback")
+def _forget_write(session):
+    session.info.pop("wrote", None)
+
+def reads_replica(db: Session) -> bool:
+    """Whether the session reads from a replica that may lag behind the primary."""
+    return read_engine is not engine and db.get_bind() is read_engine
+
+# Request sessions check out a connection on first use, not up front, so a
+# request answered from memory or the shared caches never takes one. The wait
+# for that first connection feeds load shedding.
+
+def _start_checkout_timer(session: Session) -> None:
+    if session.info.get("time_checkout"):
+        session.info["checkout_started"] = time.perf_counter()
+
+@event.listens_for(Session, "do_orm_execute")
+def _time_statement_checkout(orm_execute_state):
+    _start_checkout_timer(orm_execute_state.session)
+
+@event.listens_for(Session, "before_flush")
+def _time_flush_checkout(session, flush_context, instances):
+    _start_checkout_timer(session)
+
+@event.listens_for(Session, "after_begin")
+def _observe_checkout(session, transaction, connection):
+    started = session.info.pop("checkout_started", None)
+    if started is not None:
+        session.info.pop("time_checkout", None)
+        pool_wait.observe(time.perf_counter() - started)
+
+def request_session(session_factory, request: Request) -> Session:
+    db = session_factory()
+    db.info["time_checkout"] = True
+    # Lets the session remember whose writes it commits (read-your-writes routing)
+    db.info["user_id"] = get_request_user_id(request.headers)
+    return db
+
 # Dependency
-def get_db():
-    db = SessionLocal()
+def get_db(request: Request):
+    db = request_session(SessionLocal, request)
+    try:
+        yield db
+    finally:
+        db.close()
+
+def get_read_db(request: Request):
+    """
+    Session for read-only endpoints. Uses the read replica, unless the requesting
+    user wrote recently, in which case the primary serves their reads.
+    """
+    user_id = get_request_user_id(request.headers)
+    use_primary = user_id is not None and user_id in recent_writers
+    db = request_session(SessionLocal if use_primary else ReadSessionLocal, request)
     try:
         yield db
     finally:
         db.close()
 
+@retry(
+    stop=stop_after_attempt(5),
+    wait=wait_exponential(multiplier=1, min=1, max=10),
+    reraise=True
+)
+def prewarm_pool(connections: int) -> int:
+    """
+    Open `connections` pooled connections on the primary (and the replica, if
+    configured) so the first requests don't pay for connection setup.
+    Retries with exponential backoff like check_db_connection.
+    """
+    engines = [engine] if read_engine is engine else [engine, read_engine]
+    for target in engines:
+        opened = []
+        try:
+            for _ in range(connections):
+                connection = target.connect()
+                opened.append(connection)
+                connection.execute(text("SELECT 1"))
+        finally:
+            for connection in opened:
+                connection.close()
+    print(f"Database pool pre-warmed with {connections} connections")
+    return connections
+
 @retry(
     stop=stop_after_attempt(5),
     wait=wait_exponential(multiplier=1, min=1, max=10),
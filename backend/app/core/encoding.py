@@ -0,0 +1,59 @@
+from typing import Any, Dict
+
+from fastapi import Request
+from fastapi.encoders import jsonable_encoder
+from starlette.responses import Response
+
+try:
+    import msgpack
+except ImportError:  # msgpack is optional, clients fall back to JSON
+    msgpack = None
+
+MSGPACK_MEDIA_TYPES = ("application/msgpack", "application/x-msgpack")
+
+# OpenAPI description of the alternative encoding for list endpoints
+MSGPACK_RESPONSES = {
+    200: {"content": {"application/msgpack": {}}, "description": "Successful Response"}
+}
+
+class MsgPackResponse(Response):
+    media_type = "application/msgpack"
+
+    def render(self, content: Any) -> bytes:
+        return msgpack.packb(jsonable_encoder(content), use_bin_type=True)
+
+def parse_qualities(header: str) -> Dict[str, float]:
+    """
+    Value -> q-value from an Accept-style header (Accept, Accept-Encoding), with
+    values lowercased. Values without a q-value get 1; a malformed one counts
+    as 0, i.e. not acceptable.
+    """
+    qualities = {}
+    for part in header.lower().split(","):
+        value, *params = [piece.strip() for piece in part.split(";")]
+        quality = 1.0
+        for param in params:
+            name, _, raw = param.partition("=")
+            if name.strip() == "q":
+                try:
+                    quality = float(raw)
+                except ValueError:
+                    quality = 0.0
+        if value:
+            qualities[value] = quality
+    return qualities
+
+def accepts_msgpack(request: Request) -> bool:
+    """
+    Whether the client prefers MessagePack: it names a MessagePack media type
+    with a non-zero q-value at least as high as JSON's (wildcards only count
+    for JSON).
+    """
+    if msgpack is None:
+        return False
+    qualities = parse_qualities(request.headers.get("Accept", ""))
+    msgpack_quality = max((qualities.get(media_type, 0.0) for media_type in MSGPACK_MEDIA_TYPES), default=0.0)
+    json_quality = qualities.get(
+        "application/json", qualities.get("application/*", qualities.get("*/*", 0.0))
+    )
+    return msgpack_quality > 0 and msgpack_quality >= json_quality
@@ -0,0 +1,89 @@
+from typing import Optional
+
+from fastapi import Depends, Header, HTTPException, Request, status
+from fastapi.responses import JSONResponse
+from sqlalchemy.orm import Session
+
+from app.core.auth import get_current_active_user
+from app.core.database import get_db
+from app.models.idempotency_key import IdempotencyKey
+from app.models.user import User
+from app.services import idempotency as idempotency_service
+
+class IdempotentReplay(Exception):
+    """Raised to short-circuit a retried request with its stored response."""
+
+    def __init__(self, record: IdempotencyKey):
+        self.record = record
+
+async def idempotent_replay_handler(request: Request, exc: IdempotentReplay) -> JSONResponse:
+    return JSONResponse(
+        status_code=exc.record.status_code,
+        content=exc.record.response_body,
+        headers={"Idempotent-Replayed": "true"},
+    )
+
+async def lease_lost_handler(request: Request, exc: idempotency_service.LeaseLost) -> JSONResponse:
+    # The write rolled back; the retry that took the key over answers the client
+    return JSONResponse(
+        status_code=status.HTTP_409_CONFLICT,
+        content={"detail": "A request with this Idempotency-Key is still being processed"},
+    )
+
+async def request_fingerprint(request: Request) -> str:
+    return idempotency_service.fingerprint(
+        request.method, request.url.path, await request.body()
+    )
+
+def idempotency_key(
+    key: Optional[str] = Header(None, alias="Idempotency-Key"),
+    request_hash: str = Depends(request_fingerprint),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """
+    Honour the Idempotency-Key header on write endpoints.
+
+    Runs before the request body is validated, so a retry with a stored response
+    is answered without touching the endpoint. Yields the claimed record (or None
+    when no header was sent); the endpoint stores its response on it in the
+    transaction of its write. A request that fails frees the key for a retry.
+    """
+    if not key:
+        yield None
+        return
+
+    if len(key) > 255:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Idempotency-Key must be at most 255 characters"
+        )
+
+    record = idempotency_service.get_active(db, user_id=current_user.id, key=key)
+    if record is None:
+        record = idempotency_service.reserve(
+            db, user_id=current_user.id, key=key, request_hash=request_hash
+        )
+        if record is not None:
+            try:
+                yield record
+            except Exception:
+                idempotency_service.release(db, record)
+                raise
+            return
+        # Another request claimed the key between our lookup and insert
+        record = idempotency_service.get_active(db, user_id=current_user.id, key=key)
+
+    if record is not None and record.request_hash != request_hash:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="Idempotency-Key was already used with a different request"
+        )
+
+    if record is None or record.status_code is None:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="A request with this Idempotency-Key is still being processed"
+        )
+
+    raise IdempotentReplay(record)
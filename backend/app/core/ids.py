@@ -0,0 +1,158 @@
+from typing import List, Optional
+import hashlib
+import os
+import socket
+import threading
+import time
+
+from app.core.config import settings
+
+# Crockford base32: no I, L, O or U, so numbers survive being read aloud or retyped.
+# The alphabet is in ASCII order, so fixed-width encodings sort like the numbers.
+ALPHABET = "0123456789ABCDEFGHJKMNPQRSTVWXYZ"
+CHECK_SYMBOLS = ALPHABET + "*~$=U"
+_DECODE = {char: value for value, char in enumerate(ALPHABET)}
+_DECODE.update({"O": 0, "I": 1, "L": 1})
+
+# 64-bit ids encode to 13 base32 characters
+ENCODED_LENGTH = 13
+
+# 2025-01-01T00:00:00Z; 41 bits of milliseconds last until 2094
+EPOCH_MS = 1735689600000
+
+TIMESTAMP_BITS = 41
+SHARD_BITS = 10
+SEQUENCE_BITS = 12
+MAX_SHARD = (1 << SHARD_BITS) - 1
+MAX_SEQUENCE = (1 << SEQUENCE_BITS) - 1
+
+# Attempts at a write whose generated number is already taken before giving up
+COLLISION_RETRIES = 3
+
+class InvalidIdError(ValueError):
+    pass
+
+def encode(value: int) -> str:
+    """Encode a 64-bit id as 13 Crockford base32 characters plus a check symbol."""
+    check = CHECK_SYMBOLS[value % 37]
+    chars = []
+    for _ in range(ENCODED_LENGTH):
+        chars.append(ALPHABET[value & 31])
+        value >>= 5
+    return "".join(reversed(chars)) + check
+
+def decode(text: str) -> int:
+    """Decode an encoded id, raising InvalidIdError if it is malformed or the check symbol is wrong."""
+    text = text.strip().upper().replace("-", "")
+    if len(text) != ENCODED_LENGTH + 1:
+        raise InvalidIdError(f"Expected {ENCODED_LENGTH + 1} characters, got {len(text)}")
+    value = 0
+    for char in text[:-1]:
+        if char not in _DECODE:
+            raise InvalidIdError(f"Invalid character {char!r}")
+        value = value * 32 + _DECODE[char]
+    if CHECK_SYMBOLS[value % 37] != text[-1]:
+        raise InvalidIdError("Check symbol does not match")
+    return value
+
+def is_valid(text: str) -> bool:
+    try:
+        decode(text)
+    except InvalidIdError:
+        return False
+    return True
+
+class SnowflakeGenerator:
+    """
+    Time-ordered 64-bit ids: 41 bits of milliseconds since EPOCH_MS, 10 bits of
+    shard id and a 12-bit per-millisecond sequence.
+
+    Ids are unique without any database round trip as long as every running
+    process has its own shard id. When the clock goes backwards or a millisecond's
+    sequence is used up, the generator keeps counting on its last timestamp
+    instead of waiting, so calls never block.
+    """
+
+    def __init__(self, shard_id: int, clock=time.time):
+        if not 0 <= shard_id <= MAX_SHARD:
+            raise ValueError(f"shard_id must be between 0 and {MAX_SHARD}")
+        self.shard_id = shard_id
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._last_ms = -1
+        self._sequence = 0
+
+    def _now_ms(self) -> int:
+        return int(self._clock() * 1000) - EPOCH_MS
+
+    def _reserve(self, count: int):
+        """Reserve `count` consecutive (timestamp, sequence) slots. Returns the first one."""
+        with self._lock:
+            now = self._now_ms()
+            if now > self._last_ms:
+                self._last_ms = now
+                self._sequence = 0
+            start_ms, start_seq = self._last_ms, self._sequence
+            end = start_seq + count
+            self._last_ms += end >> SEQUENCE_BITS
+            self._sequence = end & MAX_SEQUENCE
+            return start_ms, start_seq
+
+    def _compose(self, timestamp_ms: int, sequence: int) -> int:
+        return (timestamp_ms << (SHARD_BITS + SEQUENCE_BITS)) | (self.shard_id << SEQUENCE_BITS) | sequence
+
+    def next_id(self) -> int:
+        return self._compose(*self._reserve(1))
+
+    def next_ids(self, count: int) -> List[int]:
+        """Generate `count` ids with a single lock acquisition."""
+        timestamp_ms, sequence = self._reserve(count)
+        ids = []
+        for _ in range(count):
+            ids.append(self._compose(timestamp_ms, sequence))
+            sequence += 1
+            if sequence > MAX_SEQUENCE:
+                timestamp_ms += 1
+                sequence = 0
+        return ids
+
+def default_shard_id() -> int:
+    """
+    Shard id for this process: ID_SHARD_ID when set, otherwise derived from the
+    host name and process id. gunicorn.conf.py gives each worker its own shard
+    instead; outside gunicorn, set ID_SHARD_ID per process to rule out two
+    processes landing on the same shard.
+    """
+    if settings.ID_SHARD_ID is not None:
+        return settings.ID_SHARD_ID
+    seed = f"{socket.gethostname()}:{os.getpid()}".encode()
+    return int.from_bytes(hashlib.blake2b(seed, digest_size=4).digest(), "big") & MAX_SHARD
+
+_generator: Optional[SnowflakeGenerator] = None
+_generator_pid: Optional[int] = None
+
+def get_generator() -> SnowflakeGenerator:
+    """The process-wide generator, created lazily so forked workers get their own shard."""
+    global _generator, _generator_pid
+    if _generator is None or _generator_pid != os.getpid():
+        _generator = SnowflakeGenerator(default_shard_id())
+        _generator_pid = os.getpid()
+    return _generator
+
+def set_generator(generator: SnowflakeGenerator) -> None:
+    """Replace the id generator, e.g. with one on a fixed shard or clock."""
+    global _generator, _generator_pid
+    _generator = generator
+    _generator_pid = os.getpid()
+
+def report_collision(code: str, attempt: int) -> None:
+    """Log a generated number that was already taken; two processes share a shard."""
+    print(f"Generated number {code} is already taken (attempt {attempt} of {COLLISION_RETRIES}); "
+          f"shard {get_generator().shard_id} is in use by another process")
+
+def new_code(prefix: str) -> str:
+    """A new human-readable code such as ORD-01JCD3Z4W5X6YQ."""
+    return f"{prefix}-{encode(get_generator().next_id())}"
+
+def new_codes(prefix: str, count: int) -> List[str]:
+    return [f"{prefix}-{encode(value)}" for value in get_generator().next_ids(count)]
@@ -0,0 +1,82 @@
+import math
+import threading
+import time
+
+from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.requests import Request
+from starlette.responses import JSONResponse
+
+from app.core.config import settings
+
+class DecayingAverage:
+    """
+    Exponentially weighted average that also decays towards zero while no new
+    samples arrive, so a burst of slow samples stops counting once it is over.
+    """
+
+    def __init__(self, half_life: float):
+        self.half_life = half_life
+        self._value = 0.0
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _decayed(self, now: float) -> float:
+        return self._value * math.pow(0.5, (now - self._updated) / self.half_life)
+
+    def observe(self, sample: float, weight: float = 0.2) -> None:
+        now = time.monotonic()
+        with self._lock:
+            self._value = self._decayed(now) * (1 - weight) + sample * weight
+            self._updated = now
+
+    @property
+    def value(self) -> float:
+        with self._lock:
+            return self._decayed(time.monotonic())
+
+    def reset(self) -> None:
+        with self._lock:
+            self._value = 0.0
+            self._updated = time.monotonic()
+
+# Seconds request sessions spent waiting for their first pooled connection
+pool_wait = DecayingAverage(half_life=5.0)
+
+class LoadSheddingMiddleware(BaseHTTPMiddleware):
+    """
+    Reject new requests with 503 while the process is overloaded, instead of
+    queueing them behind an exhausted connection pool.
+
+    Overload means either too many requests in flight or a recent average
+    connection pool wait above the configured threshold.
+    """
+
+    exempt_paths = ("/health", "/docs", "/redoc")
+
+    def __init__(self, app, max_in_flight: int, max_pool_wait_ms: int):
+        super().__init__(app)
+        self.max_in_flight = max_in_flight
+        self.max_pool_wait = max_pool_wait_ms / 1000.0
+        self.in_flight = 0
+
+    def overloaded(self) -> bool:
+        if self.max_in_flight and self.in_flight >= self.max_in_flight:
+            return True
+        return bool(self.max_pool_wait) and pool_wait.value > self.max_pool_wait
+
+    async def dispatch(self, request: Request, call_next):
+        if request.url.path.startswith(self.exempt_paths):
+            return await call_next(request)
+
+        if self.overloaded():
+            return JSONResponse(
+                status_code=503,
+                content={"detail": "Service is overloaded, please retry later"},
+                headers={"Retry-After": str(settings.LOAD_SHEDDING_RETRY_AFTER_SECONDS)},
+            )
+
+        self.in_flight += 1
+        try:
+            return await call_next(request)
+        finally:
+            self.in_flight -= 1
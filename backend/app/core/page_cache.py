@@ -0,0 +1,240 @@
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Dict, Iterable, Optional, Tuple
+import threading
+import time
+
+from app.core import shm_cache
+from app.core.config import settings
+
+try:
+    import redis
+except ImportError:  # redis is optional, the per-process cache needs nothing
+    redis = None
+
+# Owner scopes with their own generation counter
+SHIPPER = "shipper"
+CARRIER = "carrier"
+
+# Lifetime of a generation in the shared cache; one that expires or is evicted
+# is replaced by a fresh one, which only costs its owner some misses
+GENERATION_TTL_SECONDS = 86400
+
+class PageCacheStore(ABC):
+    """
+    Storage for cached list pages and the generation counters in their keys.
+
+    A page key embeds its owner's current generation, so bumping the generation
+    invalidates every cached page of that owner at once; the orphaned entries
+    simply age out.
+    """
+
+    @abstractmethod
+    def get(self, key: str) -> Optional[bytes]:
+        ...
+
+    @abstractmethod
+    def set(self, key: str, value: bytes, ttl: float) -> None:
+        ...
+
+    @abstractmethod
+    def generation(self, owner: str) -> Tuple[int, float]:
+        """The owner's generation and the wall-clock time it was last bumped (0 if never)."""
+        ...
+
+    @abstractmethod
+    def bump(self, owner: str) -> int:
+        ...
+
+    @abstractmethod
+    def reset(self) -> None:
+        ...
+
+class InMemoryPageCacheStore(PageCacheStore):
+    """
+    Per-process LRU of pages. Each worker keeps its own copy, but the
+    generations live in the shared cache (see shm_cache), so a write in any
+    process on the host, the archive job included, invalidates every worker's
+    copy. Generations are nanosecond timestamps rather than counters, as the
+    shared cache has no atomic increment; they only have to change on a bump.
+    Without a shared cache they are kept per process.
+    """
+
+    def __init__(self, max_entries: int = 10_000):
+        self._pages: "OrderedDict[str, Tuple[bytes, float]]" = OrderedDict()
+        self._generations: Dict[str, Tuple[int, float]] = {}
+        self._lock = threading.Lock()
+        self._max_entries = max_entries
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            entry = self._pages.get(key)
+            if entry is None:
+                return None
+            value, expires = entry
+            if expires < time.monotonic():
+                del self._pages[key]
+                return None
+            self._pages.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: bytes, ttl: float) -> None:
+        with self._lock:
+            self._pages[key] = (value, time.monotonic() + ttl)
+            self._pages.move_to_end(key)
+            while len(self._pages) > self._max_entries:
+                self._pages.popitem(last=False)
+
+    def generation(self, owner: str) -> Tuple[int, float]:
+        cache = shm_cache.get_cache()
+        if cache is None:
+            return self._generations.get(owner, (0, 0.0))
+        key = _generation_key(owner)
+        value = cache.lookup(key)
+        if value is None:
+            # Never bumped, or expired: start a fresh generation, so pages cached
+            # under the lost one can't be served again
+            cache.add(key, f"{time.time_ns()}:0".encode(), GENERATION_TTL_SECONDS)
+            value = cache.lookup(key)
+            if value is None:
+                return time.time_ns(), 0.0
+        generation, bumped_at = value.split(b":")
+        return int(generation), float(bumped_at)
+
+    def bump(self, owner: str) -> int:
+        cache = shm_cache.get_cache()
+        if cache is None:
+            with self._lock:
+                generation = self._generations.get(owner, (0, 0.0))[0] + 1
+                self._generations[owner] = (generation, time.time())
+                return generation
+        generation = time.time_ns()
+        cache.set(_generation_key(owner), f"{generation}:{time.time()!r}".encode(), GENERATION_TTL_SECONDS)
+        return generation
+
+    def reset(self) -> None:
+        with self._lock:
+            self._pages.clear()
+            self._generations.clear()
+
+def _generation_key(owner: str) -> str:
+    return f"page-generation:{owner}"
+
+class KeyValuePageCacheStore(PageCacheStore):
+    """
+    Pages and generations in a key-value store shared by every worker, so a bump
+    in one worker invalidates the pages cached by all of them. Works with any
+    client offering Redis-style `get`, `set(..., ex=)`, `incr` and `delete`.
+    """
+
+    def __init__(self, client, prefix: str = "pages:"):
+        self.client = client
+        self.prefix = prefix
+
+    def get(self, key: str) -> Optional[bytes]:
+        return self.client.get(f"{self.prefix}page:{key}")
+
+    def set(self, key: str, value: bytes, ttl: float) -> None:
+        self.client.set(f"{self.prefix}page:{key}", value, ex=max(1, int(ttl)))
+
+    def generation(self, owner: str) -> Tuple[int, float]:
+        generation = self.client.get(f"{self.prefix}gen:{owner}")
+        bumped_at = self.client.get(f"{self.prefix}gen-at:{owner}")
+        return int(generation or 0), float(bumped_at or 0)
+
+    def bump(self, owner: str) -> int:
+        # Stamp the time first so a reader never sees the new generation without it
+        self.client.set(f"{self.prefix}gen-at:{owner}", repr(time.time()))
+        return int(self.client.incr(f"{self.prefix}gen:{owner}"))
+
+    def reset(self) -> None:
+        for key in list(self.client.scan_iter(f"{self.prefix}*")):
+            self.client.delete(key)
+
+class LocalKeyValueClient:
+    """
+    In-process stand-in for a shared key-value client, implementing the subset of
+    the Redis API that KeyValuePageCacheStore uses. For development and tests.
+    """
+
+    def __init__(self):
+        self._data: Dict[str, Tuple[bytes, Optional[float]]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            value, expires = entry
+            if expires is not None and expires < time.monotonic():
+                del self._data[key]
+                return None
+            return value
+
+    def set(self, key: str, value, ex: Optional[int] = None) -> bool:
+        if isinstance(value, str):
+            value = value.encode()
+        with self._lock:
+            self._data[key] = (value, time.monotonic() + ex if ex else None)
+        return True
+
+    def incr(self, key: str) -> int:
+        with self._lock:
+            entry = self._data.get(key)
+            value = int(entry[0]) + 1 if entry else 1
+            self._data[key] = (str(value).encode(), None)
+            return value
+
+    def delete(self, *keys: str) -> int:
+        with self._lock:
+            return sum(self._data.pop(key, None) is not None for key in keys)
+
+    def scan_iter(self, match: str):
+        prefix = match.rstrip("*")
+        with self._lock:
+            return [key for key in self._data if key.startswith(prefix)]
+
+def make_store(url: Optional[str] = None) -> PageCacheStore:
+    """A store for PAGE_CACHE_URL: `redis://...`, `local://` for the stand-in, or the per-process LRU."""
+    if url and url.startswith("local://"):
+        return KeyValuePageCacheStore(LocalKeyValueClient())
+    if url:
+        if redis is None:
+            raise RuntimeError("PAGE_CACHE_URL is set but the redis package is not installed")
+        return KeyValuePageCacheStore(redis.Redis.from_url(url))
+    return InMemoryPageCacheStore(settings.PAGE_CACHE_MAX_ENTRIES)
+
+_store: Optional[PageCacheStore] = None
+
+def get_store() -> PageCacheStore:
+    global _store
+    if _store is None:
+        _store = make_store(settings.PAGE_CACHE_URL)
+    return _store
+
+def set_store(store: PageCacheStore) -> None:
+    """Replace the page store, e.g. with one shared between workers."""
+    global _store
+    _store = store
+
+def owner_key(scope: str, owner_id: int) -> str:
+    return f"{scope}:{owner_id}"
+
+def invalidate(shipper_id: Optional[int] = None, carrier_id: Optional[int] = None) -> None:
+    """Bump the generations of an order's owners, dropping all their cached pages. Call after commit."""
+    invalidate_many([(shipper_id, carrier_id)])
+
+def invalidate_many(owners: Iterable[Tuple[Optional[int], Optional[int]]]) -> None:
+    """Bump each distinct shipper and carrier among (shipper_id, carrier_id) pairs once."""
+    if not settings.PAGE_CACHE_ENABLED:
+        return
+    keys = set()
+    for shipper_id, carrier_id in owners:
+        if shipper_id is not None:
+            keys.add(owner_key(SHIPPER, shipper_id))
+        if carrier_id is not None:
+            keys.add(owner_key(CARRIER, carrier_id))
+    store = get_store()
+    for key in keys:
+        store.bump(key)
@@ -0,0 +1,128 @@
+from typing import Any, Optional
+import threading
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.orm import Session
+
+class LeaderLock:
+    """
+    A cluster-wide lock that one process takes and keeps, so a job every worker
+    runs acts in only one of them.
+
+    In PostgreSQL it is a session advisory lock on a connection held open for
+    the purpose. It goes away with the process or its connection, and another
+    worker takes it over on its next `acquire`. Other databases are single-host
+    setups (tests, local runs), where every process leads.
+    """
+
+    def __init__(self, name: str, engine: Engine):
+        self.name = name
+        self.engine = engine
+        self._connection: Optional[Connection] = None
+        self._lock = threading.Lock()
+
+    def acquire(self) -> bool:
+        """Whether this process leads, taking the lock if nobody holds it. Never blocks on other processes."""
+        if self.engine.dialect.name != "postgresql":
+            return True
+        with self._lock:
+            if self._connection is not None:
+                try:
+                    self._connection.execute(text("SELECT 1"))
+                    return True
+                except Exception:
+                    # The connection dropped, and the lock with it
+                    self._connection.invalidate()
+                    self._connection = None
+            connection = self.engine.connect()
+            try:
+                held = connection.execute(
+                    text("SELECT pg_try_advisory_lock(hashtext(:name))"), {"name": self.name}
+                ).scalar()
+                connection.commit()
+            except Exception:
+                connection.invalidate()
+                raise
+            if held:
+                self._connection = connection
+            else:
+                connection.close()
+            return bool(held)
+
+    def release(self) -> None:
+        with self._lock:
+            if self._connection is None:
+                return
+            try:
+                self._connection.execute(text("SELECT pg_advisory_unlock(hashtext(:name))"), {"name": self.name})
+                self._connection.commit()
+                self._connection.close()
+            except Exception:
+                # Closing the connection for good releases the lock too
+                self._connection.invalidate()
+            self._connection = None
+
+class PeriodicWorker:
+    """
+    Background thread that runs `run(db)` with a fresh session every `interval`
+    seconds until stopped. A failed run is printed and tried again next time.
+
+    Subclasses set `name` (the thread name and log label) and implement `run`;
+    `wait_time` can shorten the wait, and setting `wake` runs the next round
+    straight away. A job that must act in one process only is given a `leader`
+    lock and checks `is_leader()` in `run`.
+    """
+
+    name = "periodic-worker"
+
+    def __init__(
+        self,
+        session_factory,
+        interval: float,
+        wake: Optional[threading.Event] = None,
+        leader: Optional[LeaderLock] = None
+    ):
+        self.session_factory = session_factory
+        self.interval = interval
+        self.wake = wake or threading.Event()
+        self.leader = leader
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def run(self, db: Session) -> Any:
+        raise NotImplementedError
+
+    def tick(self) -> Any:
+        db = self.session_factory()
+        try:
+            return self.run(db)
+        finally:
+            db.close()
+
+    def is_leader(self) -> bool:
+        return self.leader is None or self.leader.acquire()
+
+    def wait_time(self) -> float:
+        return self.interval
+
+    def _loop(self) -> None:
+        while not self._stop.is_set():
+            try:
+                self.tick()
+            except Exception as e:
+                print(f"{self.name} failed: {e}")
+            self.wake.wait(self.wait_time())
+            self.wake.clear()
+
+    def start(self) -> threading.Thread:
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._loop, name=self.name, daemon=True)
+        self._thread.start()
+        return self._thread
+
+    def stop(self) -> None:
+        self._stop.set()
+        self.wake.set()
+        if self.leader is not None:
+            self.leader.release()
@@ -0,0 +1,78 @@
+from typing import Dict
+
+from fastapi import Depends, HTTPException, status
+from sqlalchemy.orm import Session
+
+from app.core.auth import get_current_active_user
+from app.core.database import get_db, get_read_db
+from app.models.user import User
+from app.services import order as order_service
+from app.services.order import OrderAccess
+from app.services.order_state import OWNER_COLUMNS
+
+# OrderAccess field holding the owner for each account type
+OWNER_FIELDS: Dict[str, str] = {
+    account_type: column.key for account_type, column in OWNER_COLUMNS.items()
+}
+
+class RequireAccountType:
+    """
+    Dependency that returns the current user when their account type is one of
+    `account_types`, and raises 403 with `detail` otherwise.
+    """
+
+    def __init__(self, *account_types: str, detail: str):
+        self.account_types = frozenset(account_types)
+        self.detail = detail
+
+    def __call__(self, current_user: User = Depends(get_current_active_user)) -> User:
+        if current_user.account_type not in self.account_types:
+            raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail=self.detail)
+        return current_user
+
+def check_order_access(user: User, access: OrderAccess, detail: str) -> None:
+    """Raise 403 unless `user` is the shipper or carrier of the order."""
+    owner_field = OWNER_FIELDS.get(user.account_type)
+    if owner_field is None:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Invalid account type")
+    if getattr(access, owner_field) != user.id:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail=detail)
+
+def _not_found(detail: str) -> HTTPException:
+    return HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=detail)
+
+def require_order_access(detail: str, include_archived: bool = False):
+    """
+    Dependency factory for routes with an `order_id` path parameter. The returned
+    dependency authorizes the current user against the order's ownership columns
+    and returns its OrderAccess, so forbidden requests never load the full order.
+    """
+    def order_access(
+        order_id: int,
+        db: Session = Depends(get_db),
+        current_user: User = Depends(get_current_active_user)
+    ) -> OrderAccess:
+        access = order_service.get_access(db, order_id=order_id, include_archived=include_archived)
+        if access is None:
+            raise _not_found(f"Order with ID {order_id} not found")
+        check_order_access(current_user, access, detail)
+        return access
+
+    return order_access
+
+def require_tracking_access(detail: str, include_archived: bool = False):
+    """Like require_order_access, for routes with a `tracking_number` path parameter."""
+    def tracking_access(
+        tracking_number: str,
+        db: Session = Depends(get_read_db),
+        current_user: User = Depends(get_current_active_user)
+    ) -> OrderAccess:
+        access = order_service.get_access(
+            db, tracking_number=tracking_number, include_archived=include_archived
+        )
+        if access is None:
+            raise _not_found(f"Order with tracking number {tracking_number} not found")
+        check_order_access(current_user, access, detail)
+        return access
+
+    return tracking_access
@@ -0,0 +1,126 @@
+from abc import ABC, abstractmethod
+from typing import Dict, Tuple
+import threading
+import time
+
+from fastapi import HTTPException, Request, status
+
+from app.core.config import settings
+from app.core.security import get_request_user_id
+
+class RateLimitStore(ABC):
+    """
+    Storage for token buckets.
+
+    The default store keeps buckets in process memory. Deployments running several
+    workers or hosts can plug in a shared implementation with `set_store`.
+    """
+
+    @abstractmethod
+    def take(self, key: str, rate: float, capacity: float, cost: float = 1.0) -> float:
+        """
+        Try to remove `cost` tokens from the bucket at `key`, refilling at `rate`
+        tokens per second up to `capacity`. Returns 0 when the tokens were taken,
+        otherwise the number of seconds until enough tokens are available.
+        """
+        ...
+
+    @abstractmethod
+    def reset(self) -> None:
+        ...
+
+class InMemoryRateLimitStore(RateLimitStore):
+    def __init__(self, max_keys: int = 100_000):
+        self._buckets: Dict[str, Tuple[float, float]] = {}
+        self._lock = threading.Lock()
+        self._max_keys = max_keys
+
+    def take(self, key: str, rate: float, capacity: float, cost: float = 1.0) -> float:
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated = self._buckets.get(key, (capacity, now))
+            tokens = min(capacity, tokens + (now - updated) * rate)
+            if tokens >= cost:
+                self._buckets[key] = (tokens - cost, now)
+                wait = 0.0
+            else:
+                self._buckets[key] = (tokens, now)
+                wait = (cost - tokens) / rate
+            if len(self._buckets) > self._max_keys:
+                self._prune(now, rate, capacity)
+            return wait
+
+    def _prune(self, now: float, rate: float, capacity: float) -> None:
+        # Buckets that have refilled completely carry no state worth keeping
+        full_after = capacity / rate
+        self._buckets = {
+            key: value for key, value in self._buckets.items()
+            if now - value[1] < full_after
+        }
+
+    def reset(self) -> None:
+        with self._lock:
+            self._buckets.clear()
+
+_store: RateLimitStore = InMemoryRateLimitStore()
+
+def get_store() -> RateLimitStore:
+    return _store
+
+def set_store(store: RateLimitStore) -> None:
+    """Replace the bucket store, e.g. with one shared between workers."""
+    global _store
+    _store = store
+
+def client_ip(request: Request) -> str:
+    return request.client.host if request.client else "unknown"
+
+def user_key(request: Request) -> str:
+    """Key requests by the user id in the bearer token, falling back to the client IP."""
+    user_id = get_request_user_id(request.headers)
+    if user_id is not None:
+        return f"user:{user_id}"
+    return f"ip:{client_ip(request)}"
+
+def ip_key(request: Request) -> str:
+    return f"ip:{client_ip(request)}"
+
+class RateLimiter:
+    """
+    Token-bucket rate limit usable as a route or router dependency.
+
+    Buckets are kept per key and per route, so a client hammering one endpoint
+    does not use up its allowance for the others.
+    """
+
+    def __init__(self, per_minute: int, burst: int, key_func=user_key):
+        self.rate = per_minute / 60.0
+        self.capacity = float(burst)
+        self.key_func = key_func
+
+    def __call__(self, request: Request) -> None:
+        if not settings.RATE_LIMIT_ENABLED:
+            return
+        route = request.scope.get("route")
+        route_path = route.path if route is not None else request.url.path
+        key = f"{request.method}:{route_path}:{self.key_func(request)}"
+        wait = get_store().take(key, self.rate, self.capacity)
+        if wait > 0:
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail="Too many requests",
+                headers={"Retry-After": str(max(1, int(wait + 0.999)))},
+            )
+
+# Per-user limit for authenticated API routes
+user_rate_limit = RateLimiter(
+    per_minute=settings.RATE_LIMIT_PER_MINUTE,
+    burst=settings.RATE_LIMIT_BURST,
+)
+
+# Per-IP limit for credential endpoints, which cost a bcrypt hash each
+auth_rate_limit = RateLimiter(
+    per_minute=settings.AUTH_RATE_LIMIT_PER_MINUTE,
+    burst=settings.AUTH_RATE_LIMIT_BURST,
+    key_func=ip_key,
+)
@@ -1,12 +1,25 @@
 from datetime import datetime, timedelta
+from functools import lru_cache
 from typing import Optional, Union, Any
+import hashlib
+import time
 
-from jose import jwt
-from passlib.context import CryptContext
+# jose.exceptions is cheap to import; jose.jwt and passlib are imported on first use
+# (or by the startup warm-up) to keep them off the cold-start path
+from jose import JWTError
 
+from app.core import shm_cache
 from app.core.config import settings
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+@lru_cache(maxsize=None)
+def get_jwt():
+    from jose import jwt
+    return jwt
+
+@lru_cache(maxsize=None)
+def get_pwd_context():
+    from passlib.context import CryptContext
+    return CryptContext(schemes=["bcrypt"], deprecated="auto")
 
 def create_access_token(subject: Union[str, Any], expires_delta: Optional[timedelta] = None) -> str:
     if expires_delta:
@@ -15,11 +28,53 @@ def create_access_token(subject: Union[str, Any], expires_delta: Optional[timede
         expire = datetime.utcnow() + timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
     
     to_encode = {"exp": expire, "sub": str(subject)}
-    encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
+    encoded_jwt = get_jwt().encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
     return encoded_jwt
 
+def get_token_subject(token: str) -> int:
+    """
+    Decode an access token and return the user id it was issued for.
+    Verified tokens are remembered in the shared cache until they expire, so each
+    worker process doesn't verify the same token again on every request.
+    """
+    cache = shm_cache.get_cache()
+    key = "token:" + hashlib.sha256(token.encode()).hexdigest()
+    if cache is not None:
+        cached = cache.get(key)
+        if cached is not None:
+            return int(cached)
+
+    payload = get_jwt().decode(
+        token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM]
+    )
+    subject = payload.get("sub")
+    if subject is None:
+        raise JWTError("Token has no subject")
+    user_id = int(subject)
+
+    if cache is not None and payload.get("exp") is not None:
+        ttl = payload["exp"] - time.time()
+        if ttl > 0:
+            cache.set(key, str(user_id).encode(), ttl)
+    return user_id
+
+def get_request_user_id(headers) -> Optional[int]:
+    """User id from a request's bearer token, or None if it has no valid token."""
+    scheme, _, token = headers.get("Authorization", "").partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        return None
+    try:
+        return get_token_subject(token)
+    except (JWTError, ValueError):
+        return None
+
 def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return pwd_context.verify(plain_password, hashed_password)
+    return get_pwd_context().verify(plain_password, hashed_password)
 
 def get_password_hash(password: str) -> str:
-    return pwd_context.hash(password) 
\ No newline at end of file
+    return get_pwd_context().hash(password)
+
+def warm_up() -> None:
+    """Import the JWT and bcrypt backends ahead of the first request that needs them."""
+    get_jwt()
+    get_pwd_context().hash("warm-up") 
\ No newline at end of file
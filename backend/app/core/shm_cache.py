@@ -0,0 +1,327 @@
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Dict, Optional, Tuple
+import hashlib
+import mmap
+import os
+import struct
+import tempfile
+import threading
+import time
+
+from app.core.config import settings
+
+try:
+    import fcntl
+except ImportError:  # no cross-process file locks on Windows; fall back to the per-process cache
+    fcntl = None
+
+MAGIC = b"ULSHMC01"
+# magic, slot count, slot size
+_HEADER = struct.Struct("<8sII")
+HEADER_SIZE = 64
+# version (odd while a writer is inside), key hash, last used (monotonic ns),
+# expires (epoch seconds), key length, value length
+_SLOT = struct.Struct("<QQQdHI")
+SLOT_HEADER_SIZE = 40
+# Slots per bucket; a key lives in one of the WAYS slots of its bucket
+WAYS = 8
+READ_ATTEMPTS = 3
+
+# Written by `invalidate`: readers treat it as a miss and `add` will not replace it
+TOMBSTONE = b"\x00tombstone"
+
+def _hash(key: bytes) -> int:
+    # 0 marks an empty slot
+    return int.from_bytes(hashlib.blake2b(key, digest_size=8).digest(), "little") | 1
+
+class Cache(ABC):
+    """
+    Byte-string key/value cache with per-entry TTLs.
+
+    `add` stores only when the key has no live entry, and `invalidate` leaves a
+    short-lived tombstone. Together they keep a reader that loaded a value before
+    a write from caching it after the write invalidated the key.
+    """
+
+    @abstractmethod
+    def get(self, key: str) -> Optional[bytes]:
+        ...
+
+    @abstractmethod
+    def set(self, key: str, value: bytes, ttl: float) -> bool:
+        ...
+
+    @abstractmethod
+    def add(self, key: str, value: bytes, ttl: float) -> bool:
+        ...
+
+    @abstractmethod
+    def delete(self, key: str) -> None:
+        ...
+
+    @abstractmethod
+    def clear(self) -> None:
+        ...
+
+    def invalidate(self, key: str, ttl: float = 5.0) -> None:
+        self.set(key, TOMBSTONE, ttl)
+
+    def lookup(self, key: str) -> Optional[bytes]:
+        """`get`, treating a tombstone as a miss."""
+        value = self.get(key)
+        return None if value == TOMBSTONE else value
+
+class LocalCache(Cache):
+    """Per-process LRU. Every worker warms and holds its own copy."""
+
+    def __init__(self, max_entries: int = 8192):
+        self._entries: "OrderedDict[str, Tuple[bytes, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._max_entries = max_entries
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[1] < time.time():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry[0]
+
+    def _store(self, key: str, value: bytes, ttl: float, only_if_absent: bool) -> bool:
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if only_if_absent and entry is not None and entry[1] >= now:
+                return False
+            self._entries[key] = (value, now + ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+            return True
+
+    def set(self, key: str, value: bytes, ttl: float) -> bool:
+        return self._store(key, value, ttl, only_if_absent=False)
+
+    def add(self, key: str, value: bytes, ttl: float) -> bool:
+        return self._store(key, value, ttl, only_if_absent=True)
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+class SharedMemoryCache(Cache):
+    """
+    Cache in a memory-mapped file shared by every worker process on the host.
+
+    The file is a header followed by `slots` fixed-size slots grouped into
+    buckets of WAYS slots. A key hashes to one bucket and occupies one of its
+    slots; when the bucket is full the least recently used slot is replaced, so
+    eviction is LRU within each bucket. Entries that don't fit in a slot are not
+    cached.
+
+    Reads take no lock. Each slot has a version counter that writers make odd
+    while they rewrite the slot (a seqlock): a reader copies the slot and retries
+    if the version was odd or changed in the meantime. Writers serialize on a
+    thread lock plus an exclusive flock on the file.
+
+    A file is only ever formatted for one layout: resizing it under processes
+    that have it mapped would crash them (SIGBUS). Opening it with another
+    layout raises instead; `layout_path` gives each layout its own file.
+    """
+
+    def __init__(self, path: str, slots: int = 8192, slot_size: int = 512):
+        if fcntl is None:
+            raise RuntimeError("SharedMemoryCache needs fcntl file locks")
+        if slot_size <= SLOT_HEADER_SIZE or slots < WAYS:
+            raise ValueError("Cache too small")
+        self.path = path
+        self.slots = slots - slots % WAYS
+        self.slot_size = slot_size
+        self.capacity = slot_size - SLOT_HEADER_SIZE
+        self.buckets = self.slots // WAYS
+        self._thread_lock = threading.Lock()
+        size = HEADER_SIZE + self.slots * slot_size
+
+        self._fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o600)
+        fcntl.flock(self._fd, fcntl.LOCK_EX)
+        try:
+            existing_size = os.fstat(self._fd).st_size
+            if existing_size not in (0, size):
+                raise RuntimeError(
+                    f"{path} holds a shared cache with a different layout; "
+                    f"open it with its own slots and slot size, or use another file"
+                )
+            # The first process to open the file sizes and formats it
+            if existing_size == 0:
+                os.ftruncate(self._fd, size)
+            self._map = mmap.mmap(self._fd, size)
+            if _HEADER.unpack_from(self._map, 0) != (MAGIC, self.slots, slot_size):
+                self._map[:size] = bytes(size)
+                _HEADER.pack_into(self._map, 0, MAGIC, self.slots, slot_size)
+        except BaseException:
+            # Closing the file also drops the lock
+            os.close(self._fd)
+            raise
+        fcntl.flock(self._fd, fcntl.LOCK_UN)
+
+    def _offset(self, slot: int) -> int:
+        return HEADER_SIZE + slot * self.slot_size
+
+    def _bucket(self, key_hash: int) -> range:
+        first = ((key_hash >> 1) % self.buckets) * WAYS
+        return range(first, first + WAYS)
+
+    def _read(self, slot: int, key: bytes, key_hash: int) -> Optional[Tuple[bytes, float]]:
+        """Copy a slot's value if it holds `key`, retrying torn reads. Returns (value, expires)."""
+        offset = self._offset(slot)
+        for _ in range(READ_ATTEMPTS):
+            version, slot_hash, _, expires, key_len, value_len = _SLOT.unpack_from(self._map, offset)
+            if slot_hash != key_hash:
+                return None
+            if version & 1:
+                continue
+            start = offset + SLOT_HEADER_SIZE
+            data = self._map[start:start + key_len + value_len]
+            if struct.unpack_from("<Q", self._map, offset)[0] != version:
+                continue
+            if data[:key_len] != key:
+                return None
+            return data[key_len:], expires
+        return None
+
+    def get(self, key: str) -> Optional[bytes]:
+        encoded = key.encode()
+        key_hash = _hash(encoded)
+        for slot in self._bucket(key_hash):
+            entry = self._read(slot, encoded, key_hash)
+            if entry is None:
+                continue
+            value, expires = entry
+            if expires < time.time():
+                return None
+            # Unlocked LRU touch; a lost update only makes eviction slightly less exact
+            struct.pack_into("<Q", self._map, self._offset(slot) + 16, time.monotonic_ns())
+            return value
+        return None
+
+    @contextmanager
+    def _locked(self):
+        with self._thread_lock:
+            fcntl.flock(self._fd, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(self._fd, fcntl.LOCK_UN)
+
+    def _write(self, slot: int, key_hash: int, key: bytes, value: bytes, expires: float) -> None:
+        offset = self._offset(slot)
+        version = struct.unpack_from("<Q", self._map, offset)[0]
+        struct.pack_into("<Q", self._map, offset, version + 1)
+        start = offset + SLOT_HEADER_SIZE
+        self._map[start:start + len(key) + len(value)] = key + value
+        _SLOT.pack_into(
+            self._map, offset, version + 1, key_hash, time.monotonic_ns(), expires, len(key), len(value)
+        )
+        struct.pack_into("<Q", self._map, offset, version + 2)
+
+    def _store(self, key: str, value: bytes, ttl: float, only_if_absent: bool) -> bool:
+        encoded = key.encode()
+        if len(encoded) + len(value) > self.capacity or len(encoded) > 0xFFFF:
+            return False
+        key_hash = _hash(encoded)
+        now = time.time()
+        with self._locked():
+            target = None
+            oldest = None
+            for slot in self._bucket(key_hash):
+                _, slot_hash, last_used, expires, _, _ = _SLOT.unpack_from(self._map, self._offset(slot))
+                if slot_hash == key_hash and self._read(slot, encoded, key_hash) is not None:
+                    if only_if_absent and expires >= now:
+                        return False
+                    target = slot
+                    break
+                if target is None and (slot_hash == 0 or expires < now):
+                    target = slot
+                if oldest is None or last_used < oldest[1]:
+                    oldest = (slot, last_used)
+            if target is None:
+                target = oldest[0]
+            self._write(target, key_hash, encoded, value, now + ttl)
+            return True
+
+    def set(self, key: str, value: bytes, ttl: float) -> bool:
+        return self._store(key, value, ttl, only_if_absent=False)
+
+    def add(self, key: str, value: bytes, ttl: float) -> bool:
+        return self._store(key, value, ttl, only_if_absent=True)
+
+    def delete(self, key: str) -> None:
+        encoded = key.encode()
+        key_hash = _hash(encoded)
+        with self._locked():
+            for slot in self._bucket(key_hash):
+                if self._read(slot, encoded, key_hash) is not None:
+                    self._write(slot, 0, b"", b"", 0.0)
+
+    def clear(self) -> None:
+        with self._locked():
+            for slot in range(self.slots):
+                self._write(slot, 0, b"", b"", 0.0)
+
+    def close(self) -> None:
+        self._map.close()
+        os.close(self._fd)
+
+def default_path() -> str:
+    """A per-deployment file in /dev/shm (RAM-backed) when available, else the temp directory."""
+    directory = "/dev/shm" if os.path.isdir("/dev/shm") else tempfile.gettempdir()
+    # Deployments with different secrets or databases never share entries
+    seed = f"{settings.SECRET_KEY}:{os.environ.get('PGHOST')}:{os.environ.get('PGDATABASE')}"
+    namespace = hashlib.blake2b(seed.encode(), digest_size=6).hexdigest()
+    return os.path.join(directory, f"unlodin-cache-{namespace}.bin")
+
+def layout_path(path: str, slots: int, slot_size: int) -> str:
+    """`path` with the file format and layout in its name, e.g. cache.bin -> cache-01-8192x512.bin."""
+    root, extension = os.path.splitext(path)
+    return f"{root}-{MAGIC[-2:].decode()}-{slots - slots % WAYS}x{slot_size}{extension}"
+
+def make_cache(backend: str) -> Optional[Cache]:
+    """The cache for SHARED_CACHE_BACKEND: `mmap`, `local` or `off` (None)."""
+    if backend == "off":
+        return None
+    if backend == "mmap" and fcntl is not None:
+        # A layout change (or a new file format) gets a file of its own, so workers
+        # still running with the old one keep theirs
+        path = layout_path(
+            settings.SHARED_CACHE_PATH or default_path(),
+            settings.SHARED_CACHE_SLOTS,
+            settings.SHARED_CACHE_SLOT_SIZE,
+        )
+        return SharedMemoryCache(path, settings.SHARED_CACHE_SLOTS, settings.SHARED_CACHE_SLOT_SIZE)
+    return LocalCache(settings.SHARED_CACHE_SLOTS)
+
+_cache: Optional[Cache] = None
+_cache_pid: Optional[int] = None
+
+def get_cache() -> Optional[Cache]:
+    """The process's cache, opened lazily so forked workers map the file themselves."""
+    global _cache, _cache_pid
+    if _cache_pid != os.getpid():
+        _cache = make_cache(settings.SHARED_CACHE_BACKEND)
+        _cache_pid = os.getpid()
+    return _cache
+
+def set_cache(cache: Optional[Cache]) -> None:
+    """Replace the cache, e.g. with a LocalCache or None to disable caching."""
+    global _cache, _cache_pid
+    _cache = cache
+    _cache_pid = os.getpid()
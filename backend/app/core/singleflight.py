@@ -0,0 +1,92 @@
+from typing import Any, Callable, Dict, Hashable, NamedTuple, Optional
+import threading
+
+from app.core.config import settings
+
+class FlightStats(NamedTuple):
+    calls: int
+    executions: int
+    coalesced: int
+
+class _Flight:
+    __slots__ = ("done", "result", "error", "followers")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error: Optional[BaseException] = None
+        self.followers = 0
+
+class SingleFlight:
+    """
+    Collapse concurrent calls with the same key into one execution.
+
+    The first caller for a key runs the function; callers arriving while it is in
+    flight wait and receive its result (or exception) instead of running it again.
+    Nothing is cached: once the call finishes the next caller runs it afresh.
+
+    Shared results are mutable (ORM objects, pages), so when a call had followers
+    every caller gets its own `copy` of the result. Without followers the leader
+    gets the original.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self._lock = threading.Lock()
+        self._flights: Dict[Hashable, _Flight] = {}
+        self._calls = 0
+        self._executions = 0
+
+    def do(self, key: Hashable, func: Callable[[], Any], copy: Callable[[Any], Any] = lambda result: result) -> Any:
+        if not settings.COALESCE_READS:
+            return func()
+
+        with self._lock:
+            self._calls += 1
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = _Flight()
+                self._executions += 1
+            else:
+                flight.followers += 1
+
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return copy(flight.result)
+
+        try:
+            flight.result = func()
+        except BaseException as exc:
+            flight.error = exc
+            raise
+        finally:
+            # Later callers start a new flight; followers already joined read this one
+            with self._lock:
+                del self._flights[key]
+                shared = flight.followers > 0
+            flight.done.set()
+        return copy(flight.result) if shared else flight.result
+
+    def stats(self) -> FlightStats:
+        with self._lock:
+            return FlightStats(self._calls, self._executions, self._calls - self._executions)
+
+    def reset(self) -> None:
+        with self._lock:
+            self._calls = 0
+            self._executions = 0
+
+# Every flight group, for reporting
+_groups: Dict[str, SingleFlight] = {}
+
+def group(name: str) -> SingleFlight:
+    """The process-wide flight group called `name`."""
+    if name not in _groups:
+        _groups[name] = SingleFlight(name)
+    return _groups[name]
+
+def all_stats() -> Dict[str, FlightStats]:
+    return {name: flights.stats() for name, flights in _groups.items()}
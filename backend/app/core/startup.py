@@ -0,0 +1,43 @@
+from typing import Dict
+import threading
+
+from app.core import security
+from app.core.database import prewarm_pool
+
+class Readiness:
+    """Tracks the startup warm-up so readiness probes can report it without touching the database."""
+
+    def __init__(self):
+        self.checks: Dict[str, str] = {"database": "pending", "security": "pending"}
+        self._ready = threading.Event()
+
+    @property
+    def ready(self) -> bool:
+        return self._ready.is_set()
+
+    def mark_ready(self) -> None:
+        self._ready.set()
+
+    def mark_not_ready(self) -> None:
+        self._ready.clear()
+
+readiness = Readiness()
+
+def warm_up(connections: int) -> None:
+    """Pre-warm the connection pool and crypto backends, then mark the process ready."""
+    try:
+        prewarm_pool(connections)
+        readiness.checks["database"] = "ok"
+    except Exception as e:
+        readiness.checks["database"] = f"failed: {e}"
+        return
+
+    security.warm_up()
+    readiness.checks["security"] = "ok"
+    readiness.mark_ready()
+
+def start_warm_up(connections: int) -> threading.Thread:
+    """Run the warm-up in the background so liveness is served immediately."""
+    thread = threading.Thread(target=warm_up, args=(connections,), name="startup-warm-up", daemon=True)
+    thread.start()
+    return thread
@@ -0,0 +1,84 @@
+from typing import Iterable, Optional
+import os
+
+from starlette.datastructures import Headers
+from starlette.exceptions import HTTPException
+from starlette.responses import Response
+from starlette.staticfiles import StaticFiles
+from starlette.types import Scope
+
+from app.core.compression import choose_encoding
+
+# Precompressed siblings looked for next to each file, in order of preference
+PRECOMPRESSED_SUFFIXES = {"br": ".br", "gzip": ".gz"}
+
+# Vite emits content-hashed file names under assets/, so they never change
+IMMUTABLE_PREFIX = "assets/"
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+REVALIDATE_CACHE_CONTROL = "no-cache"
+
+class FrontendStaticFiles(StaticFiles):
+    """
+    Serve the built frontend.
+
+    Files with a precompressed `.br` or `.gz` sibling (see precompress_static.py)
+    are sent compressed without spending CPU per request. Hashed assets are cached
+    forever; everything else, index.html included, is revalidated with its ETag.
+    Unknown paths without a file extension fall back to index.html so client-side
+    routes can be reloaded, except under `excluded_prefixes` (the API and health
+    routes), where a client expects a 404 rather than a page.
+    """
+
+    def __init__(self, directory: str, excluded_prefixes: Iterable[str] = ()):
+        super().__init__(directory=directory, html=True)
+        self.excluded_prefixes = tuple(prefix.strip("/") for prefix in excluded_prefixes)
+
+    def _is_excluded(self, path: str) -> bool:
+        return any(path == prefix or path.startswith(prefix + "/") for prefix in self.excluded_prefixes)
+
+    async def get_response(self, path: str, scope: Scope) -> Response:
+        if path == ".":
+            path = "index.html"
+        try:
+            response = await self._get_file_response(path, scope)
+        except HTTPException as exc:
+            if exc.status_code != 404 or os.path.splitext(path)[1] or self._is_excluded(path):
+                raise
+            path = "index.html"
+            response = await self._get_file_response(path, scope)
+
+        cache_control = (
+            IMMUTABLE_CACHE_CONTROL if path.startswith(IMMUTABLE_PREFIX) else REVALIDATE_CACHE_CONTROL
+        )
+        response.headers["Cache-Control"] = cache_control
+        return response
+
+    async def _get_file_response(self, path: str, scope: Scope) -> Response:
+        response = self._precompressed_response(path, scope)
+        if response is None:
+            response = await super().get_response(path, scope)
+        return response
+
+    def _precompressed_response(self, path: str, scope: Scope) -> Optional[Response]:
+        if scope["method"] not in ("GET", "HEAD"):
+            return None
+        accept_encoding = Headers(scope=scope).get("accept-encoding", "")
+        if not accept_encoding:
+            return None
+
+        # Only offer the codings this file actually has a sibling for
+        available = []
+        for coding, suffix in PRECOMPRESSED_SUFFIXES.items():
+            full_path, stat_result = self.lookup_path(path + suffix)
+            if stat_result is not None and os.path.isfile(full_path):
+                available.append((coding, full_path, stat_result))
+        coding = choose_encoding(accept_encoding, available=[entry[0] for entry in available])
+        if coding is None:
+            return None
+
+        _, full_path, stat_result = next(entry for entry in available if entry[0] == coding)
+        # file_response guesses the media type from "app.js.br" as the type of app.js
+        response = self.file_response(full_path, stat_result, scope)
+        response.headers["Content-Encoding"] = coding
+        response.headers["Vary"] = "Accept-Encoding"
+        return response
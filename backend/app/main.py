@@ -8,8 +8,20 @@ from starlette.middleware.base import BaseHTTPMiddleware
 from starlette.responses import Response
 
 from app.api.v1 import api_router
+from app.core.compression import CompressionMiddleware
 from app.core.config import settings
-from app.core.database import check_db_connection
+from app.core.database import ReadSessionLocal, SessionLocal, engine
+from app.core.periodic import LeaderLock
+from app.core.idempotency import IdempotentReplay, idempotent_replay_handler, lease_lost_handler
+from app.core.load_shedding import LoadSheddingMiddleware
+from app.core.startup import readiness, start_warm_up
+from app.core.static import FrontendStaticFiles
+from app.services.board import BoardScheduler, order_board
+from app.services.dispatch import DispatchScheduler, dispatch_engine
+from app.services.idempotency import LeaseLost
+from app.services.purge import PurgeScheduler
+from app.services.telemetry import PositionFlusher, position_writer
+from app.services.sla import SlaScheduler, sla_monitor
 
 app = FastAPI(
     title=settings.PROJECT_NAME,
@@ -27,6 +39,27 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Compress large responses with brotli or gzip
+if settings.COMPRESSION_ENABLED:
+    app.add_middleware(
+        CompressionMiddleware,
+        minimum_size=settings.COMPRESSION_MINIMUM_SIZE,
+        gzip_level=settings.GZIP_LEVEL,
+        brotli_quality=settings.BROTLI_QUALITY,
+        brotli_enabled=settings.BROTLI_ENABLED,
+    )
+
+# Shed load before it queues on the connection pool
+app.add_middleware(
+    LoadSheddingMiddleware,
+    max_in_flight=settings.MAX_IN_FLIGHT_REQUESTS,
+    max_pool_wait_ms=settings.MAX_POOL_WAIT_MS,
+)
+
+# Replay stored responses for retried idempotent requests
+app.add_exception_handler(IdempotentReplay, idempotent_replay_handler)
+app.add_exception_handler(LeaseLost, lease_lost_handler)
+
 # Include API router
 app.include_router(api_router, prefix=settings.API_V1_STR)
 
@@ -48,14 +81,93 @@ async def redoc_html():
 
 @app.on_event("startup")
 async def startup_db_client():
-    """Check database connection on startup."""
-    check_db_connection()
+    """Pre-warm the database pool and crypto backends without blocking startup."""
+    start_warm_up(settings.DB_POOL_PREWARM)
+
+sla_scheduler = SlaScheduler(
+    sla_monitor, ReadSessionLocal, settings.SLA_CHECK_INTERVAL_SECONDS,
+    leader=LeaderLock("sla-monitor", engine)
+)
+
+@app.on_event("startup")
+async def start_sla_monitor():
+    """Load open orders into the SLA monitor and start watching their deadlines."""
+    if settings.SLA_MONITOR_ENABLED:
+        sla_scheduler.start()
+
+board_scheduler = BoardScheduler(
+    order_board, ReadSessionLocal,
+    settings.ORDER_BOARD_REFRESH_SECONDS, settings.ORDER_BOARD_RELOAD_SECONDS
+)
+
+@app.on_event("startup")
+async def start_order_board():
+    """Load the available board into memory and keep reconciling it with the database."""
+    if settings.ORDER_BOARD_ENABLED and settings.READ_MODEL_ENABLED:
+        board_scheduler.start()
+
+dispatch_scheduler = DispatchScheduler(
+    dispatch_engine, SessionLocal, settings.DISPATCH_INTERVAL_SECONDS,
+    leader=LeaderLock("dispatch", engine)
+)
+
+@app.on_event("startup")
+async def start_dispatch():
+    """Periodically assign open orders to available carriers."""
+    if settings.DISPATCH_ENABLED:
+        dispatch_scheduler.start()
+
+purge_scheduler = PurgeScheduler(SessionLocal, settings.PURGE_INTERVAL_SECONDS, leader=LeaderLock("purge", engine))
+
+@app.on_event("startup")
+async def start_purge():
+    """Periodically remove soft-deleted orders and expired tombstones for good."""
+    if settings.PURGE_ENABLED:
+        purge_scheduler.start()
+
+position_flusher = PositionFlusher(position_writer, SessionLocal, settings.TELEMETRY_FLUSH_SECONDS)
+
+@app.on_event("startup")
+async def start_position_flusher():
+    """Write buffered carrier positions to the history table in bulk."""
+    position_flusher.start()
+
+@app.on_event("shutdown")
+async def shutdown_readiness():
+    """Stop receiving traffic while shutting down."""
+    readiness.mark_not_ready()
+    sla_scheduler.stop()
+    board_scheduler.stop()
+    dispatch_scheduler.stop()
+    purge_scheduler.stop()
+    position_flusher.stop()
 
 @app.get("/health")
 async def health_check():
     """Health check endpoint."""
     return {"status": "ok"}
 
+@app.get("/health/live")
+async def liveness_check():
+    """Liveness probe: the process is up and serving requests."""
+    return {"status": "ok"}
+
+@app.get("/health/ready")
+async def readiness_check():
+    """Readiness probe: startup warm-up has finished and the database is reachable."""
+    if not readiness.ready:
+        return JSONResponse(
+            status_code=503,
+            content={"status": "starting", "checks": readiness.checks},
+        )
+    return {"status": "ready", "checks": readiness.checks}
+
+# Serve the built frontend from the same origin; mounted last so API routes win
+if settings.STATIC_DIR:
+    app.mount("/", FrontendStaticFiles(
+        directory=settings.STATIC_DIR, excluded_prefixes=(settings.API_V1_STR, "/health")
+    ), name="frontend")
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8000) 
\ No newline at end of file
@@ -2,3 +2,8 @@ from app.core.database import Base
 from app.models.user import User
 from app.models.order import Order, OrderStatus
 from app.models.order_item import OrderItem
+from app.models.idempotency_key import IdempotencyKey
+from app.models.archive import ArchivedOrder, ArchivedOrderItem
+from app.models.order_tombstone import OrderTombstone
+from app.models.order_read_model import OrderReadModel
+from app.models.order_position import OrderPosition
@@ -0,0 +1,47 @@
+from sqlalchemy import Column, Integer, String, Float, DateTime, Enum, Boolean
+from sqlalchemy.sql import func
+
+from app.core.database import Base
+from app.models.order import OrderStatus
+
+class ArchivedOrder(Base):
+    """Delivered or cancelled order moved out of `orders` by the archival job."""
+    __tablename__ = "orders_archive"
+
+    id = Column(Integer, primary_key=True)
+    order_number = Column(String, index=True, nullable=False)
+    shipper_id = Column(Integer, index=True, nullable=False)
+    carrier_id = Column(Integer, index=True, nullable=True)
+    is_assigned = Column(Boolean, default=False)
+    pickup_location = Column(String, nullable=False)
+    delivery_location = Column(String, nullable=False)
+    pickup_date = Column(DateTime(timezone=True), nullable=False)
+    delivery_deadline = Column(DateTime(timezone=True), nullable=False)
+    package_description = Column(String, nullable=False)
+    weight = Column(Float, nullable=False)
+    dimensions = Column(String, nullable=True)
+    customer_name = Column(String, nullable=False)
+    customer_email = Column(String, nullable=False)
+    customer_phone = Column(String, nullable=False)
+    tracking_number = Column(String, index=True, nullable=True)
+    status = Column(Enum(OrderStatus, name='orderstatus', create_constraint=True, validate_strings=True),
+                   nullable=False)
+    notes = Column(String, nullable=True)
+    total_amount = Column(Float, nullable=False)
+    payment_status = Column(String, nullable=False)
+    created_at = Column(DateTime(timezone=True))
+    updated_at = Column(DateTime(timezone=True))
+    archived_at = Column(DateTime(timezone=True), server_default=func.now())
+
+class ArchivedOrderItem(Base):
+    """Item of an archived order."""
+    __tablename__ = "order_items_archive"
+
+    id = Column(Integer, primary_key=True)
+    order_id = Column(Integer, index=True, nullable=False)
+    product_name = Column(String, nullable=False)
+    product_sku = Column(String, nullable=False)
+    quantity = Column(Integer, nullable=False)
+    unit_price = Column(Float, nullable=False)
+    created_at = Column(DateTime(timezone=True))
+    updated_at = Column(DateTime(timezone=True))
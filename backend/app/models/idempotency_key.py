@@ -0,0 +1,28 @@
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, JSON, UniqueConstraint
+from sqlalchemy.sql import func
+
+from app.core.database import Base
+
+class IdempotencyKey(Base):
+    __tablename__ = "idempotency_keys"
+    __table_args__ = (
+        UniqueConstraint("user_id", "key", name="uq_idempotency_keys_user_id_key"),
+        # Ids are never reused (as with PostgreSQL sequences), so a claim that
+        # lapsed can't be mistaken for the one that replaced it
+        {"sqlite_autoincrement": True},
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    key = Column(String, nullable=False)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    
+    # Fingerprint of method, path and body used to detect key reuse
+    request_hash = Column(String, nullable=False)
+    
+    # Stored response (both NULL while the original request is still running)
+    status_code = Column(Integer, nullable=True)
+    response_body = Column(JSON, nullable=True)
+    
+    # Timestamps
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    expires_at = Column(DateTime(timezone=True), nullable=False, index=True)
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, Enum, Boolean
+from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, Enum, Boolean, Index, text
 from sqlalchemy.sql import func
 import enum
 
@@ -63,7 +63,62 @@ class Order(Base):
     
     # Timestamps
     created_at = Column(DateTime(timezone=True), server_default=func.now())
-    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+    # Indexed so changes can be read incrementally from a watermark
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), index=True)
+    
+    # Set when the order is deleted; the row is purged later by a background job
+    deleted_at = Column(DateTime(timezone=True), nullable=True)
+    
+    __table_args__ = (
+        # Lets the archival job find old terminal orders without scanning the table
+        Index(
+            "ix_orders_terminal_created_at", "created_at",
+            postgresql_where=text("status IN ('DELIVERED', 'CANCELLED')")
+        ),
+        # Partial indexes over live orders for the list endpoints, tie-broken by id
+        Index(
+            "ix_orders_live_shipper_id_created_at", "shipper_id", "created_at", "id",
+            postgresql_where=text("deleted_at IS NULL"),
+            sqlite_where=text("deleted_at IS NULL")
+        ),
+        Index(
+            "ix_orders_live_carrier_id_created_at", "carrier_id", "created_at", "id",
+            postgresql_where=text("deleted_at IS NULL"),
+            sqlite_where=text("deleted_at IS NULL")
+        ),
+        # Status facets and multi-status filters: one index range per status,
+        # with created_at inside it for date filters and ordering
+        Index(
+            "ix_orders_live_shipper_id_status_created_at", "shipper_id", "status", "created_at",
+            postgresql_where=text("deleted_at IS NULL"),
+            sqlite_where=text("deleted_at IS NULL")
+        ),
+        Index(
+            "ix_orders_live_carrier_id_status_created_at", "carrier_id", "status", "created_at",
+            postgresql_where=text("deleted_at IS NULL"),
+            sqlite_where=text("deleted_at IS NULL")
+        ),
+        # The available board, one index per sort; id breaks ties so every sort is a total order
+        *[
+            Index(
+                f"ix_orders_live_available_{column}", column, "id",
+                postgresql_where=text("is_assigned = false AND deleted_at IS NULL"),
+                sqlite_where=text("is_assigned = 0 AND deleted_at IS NULL")
+            )
+            for column in ("created_at", "delivery_deadline", "pickup_date", "weight", "total_amount")
+        ],
+        # Lets the purge job find deleted orders without scanning live ones
+        Index(
+            "ix_orders_deleted_at", "deleted_at",
+            postgresql_where=text("deleted_at IS NOT NULL"),
+            sqlite_where=text("deleted_at IS NOT NULL")
+        ),
+    )
+    
+    # Predicate every read path uses to skip deleted orders (matches the partial indexes)
+    @classmethod
+    def live(cls):
+        return cls.deleted_at.is_(None)
     
     # For Pydantic compatibility
     model_config = {"arbitrary_types_allowed": True} 
\ No newline at end of file
@@ -7,7 +7,8 @@ class OrderItem(Base):
     __tablename__ = "order_items"
 
     id = Column(Integer, primary_key=True, index=True)
-    order_id = Column(Integer, ForeignKey("orders.id"), nullable=False)
+    # Items go with their order when it is purged; the index keeps that cascade cheap
+    order_id = Column(Integer, ForeignKey("orders.id", ondelete="CASCADE"), nullable=False, index=True)
     product_name = Column(String, nullable=False)
     product_sku = Column(String, nullable=False)
     quantity = Column(Integer, nullable=False)
@@ -0,0 +1,24 @@
+from sqlalchemy import Column, Integer, Float, DateTime
+from sqlalchemy.sql import func
+
+from app.core.database import Base
+
+class OrderPosition(Base):
+    """
+    GPS fix reported by a carrier for an order it is moving. In PostgreSQL the
+    table is partitioned by day on `recorded_at` (see services/telemetry.py), so
+    old history is dropped a partition at a time.
+    """
+    __tablename__ = "order_positions"
+    __table_args__ = {"postgresql_partition_by": "RANGE (recorded_at)"}
+
+    # No foreign key: history is kept after the order is archived or purged
+    order_id = Column(Integer, primary_key=True)
+    # Part of the key so a resent fix is stored once
+    recorded_at = Column(DateTime(timezone=True), primary_key=True)
+    carrier_id = Column(Integer, nullable=False)
+    latitude = Column(Float, nullable=False)
+    longitude = Column(Float, nullable=False)
+    speed_kmh = Column(Float, nullable=True)
+    heading = Column(Float, nullable=True)
+    received_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
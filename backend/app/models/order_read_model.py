@@ -0,0 +1,50 @@
+from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, Enum, Boolean, Index, JSON, Text, text
+
+from app.core.database import Base
+from app.models.order import OrderStatus
+
+class OrderReadModel(Base):
+    """
+    One row per live order, denormalized for the list endpoints: the filter and
+    sort columns, the items embedded as JSON and the order pre-serialized in the
+    two shapes lists return. Written in the same transaction as the order by the
+    order services (see services/read_model.py).
+    """
+    __tablename__ = "order_read_model"
+
+    # Same value as orders.id, so list queries filter, sort and tie-break like on orders
+    id = Column(Integer, ForeignKey("orders.id", ondelete="CASCADE"), primary_key=True)
+    shipper_id = Column(Integer, nullable=False)
+    carrier_id = Column(Integer, nullable=True)
+    is_assigned = Column(Boolean, nullable=False)
+    status = Column(Enum(OrderStatus, name='orderstatus', create_constraint=True, validate_strings=True),
+                   nullable=False)
+    customer_email = Column(String, nullable=False)
+    created_at = Column(DateTime(timezone=True), nullable=True)
+    pickup_date = Column(DateTime(timezone=True), nullable=False)
+    delivery_deadline = Column(DateTime(timezone=True), nullable=False)
+    weight = Column(Float, nullable=False)
+    total_amount = Column(Float, nullable=False)
+
+    item_count = Column(Integer, nullable=False)
+    items = Column(JSON, nullable=False)
+    # The order as the list endpoints return it: in full with items, and as the `fields=summary` projection
+    payload = Column(Text, nullable=False)
+    summary_payload = Column(Text, nullable=False)
+
+    __table_args__ = (
+        # The same list indexes as on orders, without the deleted_at predicate:
+        # deleted orders leave the read model
+        Index("ix_order_read_model_shipper_id_created_at", "shipper_id", "created_at", "id"),
+        Index("ix_order_read_model_carrier_id_created_at", "carrier_id", "created_at", "id"),
+        Index("ix_order_read_model_shipper_id_status_created_at", "shipper_id", "status", "created_at"),
+        Index("ix_order_read_model_carrier_id_status_created_at", "carrier_id", "status", "created_at"),
+        *[
+            Index(
+                f"ix_order_read_model_available_{column}", column, "id",
+                postgresql_where=text("is_assigned = false"),
+                sqlite_where=text("is_assigned = 0")
+            )
+            for column in ("created_at", "delivery_deadline", "pickup_date", "weight", "total_amount")
+        ],
+    )
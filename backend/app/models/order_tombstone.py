@@ -0,0 +1,18 @@
+from sqlalchemy import Column, Integer, DateTime, Index
+from sqlalchemy.sql import func
+
+from app.core.database import Base
+
+class OrderTombstone(Base):
+    """Marker left behind by a deleted order so sync clients can drop their copy."""
+    __tablename__ = "order_tombstones"
+    __table_args__ = (
+        # Serves "deletions for this carrier since the watermark"
+        Index("ix_order_tombstones_carrier_id_deleted_at", "carrier_id", "deleted_at"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    order_id = Column(Integer, nullable=False, index=True)
+    shipper_id = Column(Integer, nullable=False, index=True)
+    carrier_id = Column(Integer, nullable=True)
+    deleted_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
@@ -0,0 +1,29 @@
+from pydantic import BaseModel, Field, validator
+from typing import Any, Dict, List, Literal, Optional
+
+# Largest number of sub-requests one batch may carry
+MAX_BATCH_REQUESTS = 20
+
+# One read request inside a batch, addressed relative to the API root (e.g. /users/me)
+class SubRequest(BaseModel):
+    id: Optional[str] = Field(None, description="Echoed back on the matching response")
+    method: Literal["GET"] = "GET"
+    path: str = Field(..., description="Path and query string, e.g. /orders/available?page=2")
+
+    @validator('path')
+    def validate_path(cls, v):
+        if not v.startswith("/"):
+            raise ValueError("Path must start with '/'")
+        return v
+
+class BatchRequest(BaseModel):
+    requests: List[SubRequest] = Field(..., min_length=1, max_length=MAX_BATCH_REQUESTS)
+
+class SubResponse(BaseModel):
+    id: Optional[str] = None
+    status: int
+    headers: Dict[str, str] = {}
+    body: Any = None
+
+class BatchResponse(BaseModel):
+    responses: List[SubResponse]
@@ -1,6 +1,6 @@
 from pydantic import BaseModel, EmailStr, Field, validator
 from typing import Optional, List
-from datetime import datetime
+from datetime import datetime, timezone
 import re
 
 from app.models.order import OrderStatus
@@ -76,10 +76,76 @@ class OrderStatusUpdate(BaseModel):
                 raise ValueError(f"Invalid status value: {v}. Valid values are: {[s.value for s in OrderStatus]}")
         return v
 
+# Largest number of orders one batch status update may touch
+MAX_STATUS_BATCH = 500
+
+# Properties to receive via API for a batch status update
+class OrderStatusBatchUpdate(OrderStatusUpdate):
+    order_ids: List[int] = Field(..., min_length=1, max_length=MAX_STATUS_BATCH)
+
+# Outcome of a batch status update for one order
+class OrderStatusResult(BaseModel):
+    order_id: int
+    status: Optional[OrderStatus] = None
+    error: Optional[str] = None
+    detail: Optional[str] = None
+
+class OrderStatusBatchResult(BaseModel):
+    updated: int
+    failed: int
+    results: List[OrderStatusResult]
+
+# Open order flagged by the SLA monitor
+class AtRiskOrder(BaseModel):
+    order_id: int
+    order_number: str
+    status: OrderStatus
+    carrier_id: Optional[int] = None
+    delivery_deadline: datetime
+    risk: str  # "at_risk" or "overdue"
+
 # Properties to receive via API for carrier assignment
 class CarrierAssignment(BaseModel):
     carrier_id: int
 
+# Largest number of position fixes one telemetry batch may carry
+MAX_POSITION_BATCH = 1000
+
+# GPS fix reported by a carrier for an order it is moving
+class PositionFix(BaseModel):
+    order_id: int
+    latitude: float = Field(..., ge=-90, le=90)
+    longitude: float = Field(..., ge=-180, le=180)
+    recorded_at: datetime
+    speed_kmh: Optional[float] = Field(None, ge=0)
+    heading: Optional[float] = Field(None, ge=0, lt=360)
+    
+    @validator('recorded_at')
+    def validate_recorded_at(cls, v):
+        """Treat device times without an offset as UTC"""
+        return v.replace(tzinfo=timezone.utc) if v.tzinfo is None else v
+
+class PositionBatch(BaseModel):
+    points: List[PositionFix] = Field(..., min_length=1, max_length=MAX_POSITION_BATCH)
+
+# Order whose fixes were turned away, with the reason
+class PositionRejection(BaseModel):
+    order_id: int
+    error: str
+    detail: str
+
+class PositionBatchResult(BaseModel):
+    accepted: int
+    rejected: List[PositionRejection]
+
+# Latest known position of an order
+class OrderPosition(BaseModel):
+    latitude: float
+    longitude: float
+    recorded_at: datetime
+    speed_kmh: Optional[float] = None
+    heading: Optional[float] = None
+
 # Properties shared by models stored in DB
 class OrderInDBBase(OrderBase):
     id: int
@@ -99,13 +165,45 @@ class OrderInDBBase(OrderBase):
 class Order(OrderInDBBase):
     items: List[OrderItem] = []
 
+# Order as returned by tracking, with its live position while it is on the move
+class TrackedOrder(Order):
+    position: Optional[OrderPosition] = None
+
 # Additional properties stored in DB
 class OrderInDB(OrderInDBBase):
     pass
 
+# Orders changed since a sync watermark
+class OrderChanges(BaseModel):
+    orders: List[Order]
+    deleted: List[int]
+    watermark: Optional[datetime] = None
+    has_more: bool
+
+# Sparse projection of an order for list screens; only requested fields are set
+class OrderSummary(OrderBase):
+    id: int
+    order_number: Optional[str] = None
+    shipper_id: Optional[int] = None
+    carrier_id: Optional[int] = None
+    is_assigned: Optional[bool] = None
+    tracking_number: Optional[str] = None
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
+    items: Optional[List[OrderItem]] = None
+
+    class Config:
+        from_attributes = True
+
+# Fields that can be requested with `fields=`, and the default summary set
+ORDER_FIELDS = tuple(name for name in OrderSummary.model_fields if name != "items")
+SUMMARY_FIELDS = ("id", "order_number", "status", "pickup_location", "delivery_location", "delivery_deadline")
+
 # Properties for order filter
 class OrderFilter(BaseModel):
     status: Optional[OrderStatus] = None
+    # Matches any of the listed statuses; combined with `status` when both are set
+    statuses: Optional[List[OrderStatus]] = None
     customer_email: Optional[EmailStr] = None
     date_from: Optional[datetime] = None
     date_to: Optional[datetime] = None
@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field
-from typing import Generic, TypeVar, List, Optional
+from typing import Dict, Generic, TypeVar, List, Optional
 
 T = TypeVar('T')
 
@@ -22,4 +22,17 @@ class PaginatedResult(BaseModel, Generic[T]):
             page=page,
             page_size=page_size,
             pages=pages
-        ) 
\ No newline at end of file
+        )
+
+class FacetedResult(PaginatedResult[T], Generic[T]):
+    """A page of items plus counts over the whole filtered result, keyed by facet value."""
+    status_counts: Dict[str, int] = Field(
+        default_factory=dict,
+        description="Matching items per status, ignoring the status filter"
+    )
+    
+    @classmethod
+    def create(cls, items: List[T], total: int, page: int, page_size: int, status_counts: Optional[Dict[str, int]] = None):
+        result = super().create(items=items, total=total, page=page, page_size=page_size)
+        result.status_counts = status_counts or {}
+        return result
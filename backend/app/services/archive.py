@@ -0,0 +1,87 @@
+from typing import Optional
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import insert, select, delete
+from sqlalchemy.orm import Session
+
+from app.core import page_cache
+from app.core.config import settings
+from app.models.archive import ArchivedOrder, ArchivedOrderItem
+from app.models.order import Order, OrderStatus
+from app.models.order_item import OrderItem
+from app.models.order_tombstone import OrderTombstone
+from app.services import order_cache
+from app.services import read_model
+from app.services.board import order_board
+
+# Orders in these states never change again and can be moved to the archive
+TERMINAL_STATUSES = (OrderStatus.DELIVERED, OrderStatus.CANCELLED)
+
+def _copy_statement(source, target, ids, key_column):
+    """INSERT INTO target (...) SELECT ... FROM source for the rows matching ids."""
+    columns = [column.name for column in target.__table__.columns if column.name in source.__table__.columns]
+    return insert(target.__table__).from_select(
+        columns,
+        select(*[source.__table__.c[name] for name in columns]).where(key_column.in_(ids))
+    )
+
+def archive_batch(db: Session, cutoff: datetime, batch_size: int) -> int:
+    """Move one batch of terminal orders created before `cutoff`. Returns the number moved."""
+    rows = db.query(Order.id, Order.shipper_id, Order.carrier_id).filter(
+        Order.status.in_(TERMINAL_STATUSES),
+        Order.created_at < cutoff,
+        Order.live()
+    ).order_by(Order.id).limit(batch_size).all()
+    if not rows:
+        return 0
+    ids = [row.id for row in rows]
+
+    read_model.remove(db, ids)
+    # Archived orders leave carriers' synced lists like deleted ones do
+    db.execute(insert(OrderTombstone.__table__).from_select(
+        ["order_id", "shipper_id", "carrier_id"],
+        select(Order.id, Order.shipper_id, Order.carrier_id).where(Order.id.in_(ids))
+    ))
+    db.execute(_copy_statement(Order, ArchivedOrder, ids, Order.id))
+    db.execute(_copy_statement(OrderItem, ArchivedOrderItem, ids, OrderItem.order_id))
+    db.execute(delete(OrderItem).where(OrderItem.order_id.in_(ids)))
+    db.execute(delete(Order).where(Order.id.in_(ids)))
+    db.commit()
+    order_board.remove(ids)
+    # Archived orders leave the owners' list pages
+    page_cache.invalidate_many((row.shipper_id, row.carrier_id) for row in rows)
+    order_cache.forget(ids)
+    return len(ids)
+
+def archive_terminal_orders(
+    db: Session,
+    older_than_days: Optional[int] = None,
+    batch_size: Optional[int] = None
+) -> int:
+    """
+    Move delivered and cancelled orders older than `older_than_days` (and their items)
+    into the archive tables, one committed batch at a time. Returns the number of
+    orders archived.
+    """
+    days = settings.ARCHIVE_AFTER_DAYS if older_than_days is None else older_than_days
+    size = batch_size or settings.ARCHIVE_BATCH_SIZE
+    cutoff = datetime.now(timezone.utc) - timedelta(days=days)
+
+    total = 0
+    while True:
+        moved = archive_batch(db, cutoff, size)
+        total += moved
+        if moved < size:
+            return total
+
+def get_by_id(db: Session, order_id: int) -> Optional[ArchivedOrder]:
+    return db.query(ArchivedOrder).filter(ArchivedOrder.id == order_id).first()
+
+def get_by_tracking_number(db: Session, tracking_number: str) -> Optional[ArchivedOrder]:
+    return db.query(ArchivedOrder).filter(ArchivedOrder.tracking_number == tracking_number).first()
+
+def get_items(db: Session, order_id: int):
+    return db.query(ArchivedOrderItem).filter(ArchivedOrderItem.order_id == order_id).all()
+
+def is_archived(order) -> bool:
+    return isinstance(order, ArchivedOrder)
@@ -0,0 +1,267 @@
+from array import array
+from bisect import bisect_left, bisect_right
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterable, List, Mapping, Optional, Sequence, Tuple
+import threading
+import time
+
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.database import as_utc
+from app.core.periodic import PeriodicWorker
+from app.models.order import Order
+from app.models.order_read_model import OrderReadModel
+from app.schemas.pagination import PaginatedResult
+
+orders = Order.__table__
+read_model = OrderReadModel.__table__
+
+# Watermark before anything has been seen
+EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+# The board's sorts; the same columns the list endpoints accept in `sort=`
+SORT_KEYS = ("created_at", "delivery_deadline", "pickup_date", "weight", "total_amount")
+
+_COLUMNS = (
+    read_model.c.id, read_model.c.is_assigned,
+    *[read_model.c[name] for name in SORT_KEYS],
+    read_model.c.payload, read_model.c.summary_payload,
+)
+
+def _sort_key(value) -> float:
+    if value is None:
+        return float("-inf")
+    if isinstance(value, datetime):
+        return as_utc(value).timestamp()
+    return float(value)
+
+class BoardEntry:
+    """An unassigned order as the board keeps it: its sort keys and pre-serialized payloads."""
+    __slots__ = ("id", "keys", "payload", "summary_payload")
+
+    def __init__(self, row: Mapping):
+        self.id = row["id"]
+        self.keys = tuple(_sort_key(row[name]) for name in SORT_KEYS)
+        self.payload = row["payload"]
+        self.summary_payload = row["summary_payload"]
+
+class _SortIndex:
+    """(key, id) pairs in ascending order, held in two parallel arrays."""
+    __slots__ = ("keys", "ids")
+
+    def __init__(self, pairs: Iterable[Tuple[float, int]] = ()):
+        pairs = sorted(pairs)
+        self.keys = array("d", [key for key, _ in pairs])
+        self.ids = array("q", [order_id for _, order_id in pairs])
+
+    def _position(self, key: float, order_id: int) -> int:
+        low = bisect_left(self.keys, key)
+        high = bisect_right(self.keys, key, low)
+        return bisect_left(self.ids, order_id, low, high)
+
+    def insert(self, key: float, order_id: int) -> None:
+        position = self._position(key, order_id)
+        self.keys.insert(position, key)
+        self.ids.insert(position, order_id)
+
+    def remove(self, key: float, order_id: int) -> None:
+        position = self._position(key, order_id)
+        if position < len(self.ids) and self.ids[position] == order_id:
+            del self.keys[position]
+            del self.ids[position]
+
+    def page(self, skip: int, limit: int, descending: bool) -> List[int]:
+        if not descending:
+            return list(self.ids[skip:skip + limit])
+        end = len(self.ids) - skip
+        if end <= 0:
+            return []
+        return list(reversed(self.ids[max(0, end - limit):end]))
+
+class OrderBoard:
+    """
+    In-memory view of the available board: every live unassigned order, with one
+    array-backed sorted index per sort, so a page is a slice instead of a query.
+
+    The board is loaded from the read model, kept current from the order
+    services' writes in this process, and reconciled with the database for
+    writes made by other workers: changed orders are re-read from an
+    `updated_at` watermark, and the whole board is reloaded now and then to
+    catch what a watermark can't see (hard deletes, late commits).
+
+    Re-read rows may come from a replica that hasn't caught up with this
+    worker's own writes, so the board remembers the `updated_at` of what it
+    applied per order and skips rows older than that.
+    """
+
+    def __init__(self, overlap: timedelta = timedelta(seconds=5)):
+        # Re-read a little before the watermark so late commits with older timestamps aren't missed
+        self.overlap = overlap
+        self.watermark: Optional[datetime] = None
+        self.loaded_at = 0.0
+        self._entries: Dict[int, BoardEntry] = {}
+        self._indexes = {name: _SortIndex() for name in SORT_KEYS}
+        # updated_at of the newest state applied per order, within the re-read window
+        self._versions: Dict[int, datetime] = {}
+        # Writes applied while a load is reading the database, replayed on top of it
+        self._pending: Optional[List[tuple]] = None
+        self._lock = threading.Lock()
+
+    @property
+    def loaded(self) -> bool:
+        return self.watermark is not None
+
+    @property
+    def serving(self) -> bool:
+        return settings.ORDER_BOARD_ENABLED and settings.READ_MODEL_ENABLED and self.loaded
+
+    def load(self, db: Session) -> int:
+        """Load every unassigned order from the read model. Returns the number on the board."""
+        with self._lock:
+            self._pending = []
+        try:
+            watermark = db.execute(select(func.max(orders.c.updated_at))).scalar()
+            rows = db.execute(select(*_COLUMNS).where(read_model.c.is_assigned == False)).mappings().all()
+            entries = {row["id"]: BoardEntry(row) for row in rows}
+            indexes = {
+                name: _SortIndex((entry.keys[position], entry.id) for entry in entries.values())
+                for position, name in enumerate(SORT_KEYS)
+            }
+        except Exception:
+            with self._lock:
+                self._pending = None
+            raise
+
+        with self._lock:
+            self._entries, self._indexes = entries, indexes
+            for operation, values in self._pending:
+                if operation == "upsert":
+                    self._upsert(values)
+                else:
+                    self._take_off(values)
+            self._pending = None
+            self.watermark = as_utc(watermark) if watermark is not None else EPOCH
+            self.loaded_at = time.monotonic()
+            return len(self._entries)
+
+    def refresh(self, db: Session) -> int:
+        """
+        Re-read orders changed since the watermark, except those this worker
+        already holds a newer state of. Returns the number of orders read.
+        """
+        since = max(EPOCH, self.watermark - self.overlap)
+        changed = db.execute(
+            select(orders.c.id, orders.c.updated_at).where(orders.c.updated_at >= since)
+        ).all()
+        order_ids = [row.id for row in changed]
+        rows = []
+        if order_ids:
+            rows = db.execute(select(*_COLUMNS).where(read_model.c.id.in_(order_ids))).mappings().all()
+
+        with self._lock:
+            # Older versions can't be re-read once they are behind the window
+            self._versions = {
+                order_id: version for order_id, version in self._versions.items() if version >= since
+            }
+            versions = {row.id: row.updated_at for row in changed if not self._is_stale(row.id, row.updated_at)}
+            # Orders with no read-model row were deleted or archived
+            self._remove(versions)
+            self._upsert(dict(row, updated_at=versions[row["id"]]) for row in rows if row["id"] in versions)
+            for row in changed:
+                if row.updated_at is not None:
+                    self.watermark = max(self.watermark, as_utc(row.updated_at))
+        return len(order_ids)
+
+    def upsert(self, rows: Sequence[Mapping]) -> None:
+        """Apply committed read-model rows: unassigned orders go on the board, the rest come off."""
+        self._apply("upsert", rows)
+
+    def remove(self, order_ids: Sequence[int]) -> None:
+        """Take committed deletions or archivals off the board."""
+        self._apply("remove", order_ids)
+
+    def _apply(self, operation: str, values) -> None:
+        with self._lock:
+            if self._pending is not None:
+                self._pending.append((operation, list(values)))
+            if not self.loaded:
+                return
+            if operation == "upsert":
+                self._upsert(values)
+            else:
+                self._take_off(values)
+
+    def _is_stale(self, order_id: int, updated_at: Optional[datetime]) -> bool:
+        version = self._versions.get(order_id)
+        return version is not None and updated_at is not None and as_utc(updated_at) < version
+
+    def _upsert(self, rows: Iterable[Mapping]) -> None:
+        for row in rows:
+            updated_at = row.get("updated_at")
+            if self._is_stale(row["id"], updated_at):
+                continue
+            if updated_at is not None:
+                self._versions[row["id"]] = as_utc(updated_at)
+            self._remove([row["id"]])
+            if row["is_assigned"]:
+                continue
+            entry = BoardEntry(row)
+            self._entries[entry.id] = entry
+            for position, name in enumerate(SORT_KEYS):
+                self._indexes[name].insert(entry.keys[position], entry.id)
+
+    def _take_off(self, order_ids: Iterable[int]) -> None:
+        # Deleted and archived orders never come back, so any row read later is older
+        now = datetime.now(timezone.utc)
+        for order_id in order_ids:
+            self._versions[order_id] = now
+        self._remove(order_ids)
+
+    def _remove(self, order_ids: Iterable[int]) -> None:
+        for order_id in order_ids:
+            entry = self._entries.pop(order_id, None)
+            if entry is None:
+                continue
+            for position, name in enumerate(SORT_KEYS):
+                self._indexes[name].remove(entry.keys[position], order_id)
+
+    def page(self, skip: int, limit: int, sort_key: str, descending: bool) -> PaginatedResult:
+        """A page of board entries in (sort key, id) order, like the database query."""
+        with self._lock:
+            order_ids = self._indexes[sort_key].page(skip, limit, descending)
+            items = [self._entries[order_id] for order_id in order_ids]
+            total = len(self._entries)
+        page = (skip // limit) + 1 if limit > 0 else 1
+        return PaginatedResult.create(items=items, total=total, page=page, page_size=limit)
+
+    def reset(self) -> None:
+        with self._lock:
+            self._entries = {}
+            self._indexes = {name: _SortIndex() for name in SORT_KEYS}
+            self._versions = {}
+            self._pending = None
+            self.watermark = None
+            self.loaded_at = 0.0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+class BoardScheduler(PeriodicWorker):
+    """Background thread that loads the board, then keeps reconciling it with the database."""
+
+    name = "order-board"
+
+    def __init__(self, board: OrderBoard, session_factory, interval: float, reload_interval: float):
+        super().__init__(session_factory, interval)
+        self.board = board
+        self.reload_interval = reload_interval
+
+    def run(self, db: Session) -> None:
+        if not self.board.loaded or time.monotonic() - self.board.loaded_at >= self.reload_interval:
+            self.board.load(db)
+        else:
+            self.board.refresh(db)
+
+order_board = OrderBoard()
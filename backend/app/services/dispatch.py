@@ -0,0 +1,395 @@
+from datetime import datetime, timezone
+from functools import lru_cache
+from typing import Callable, Dict, Iterable, List, NamedTuple, Optional, Sequence, Tuple
+import hashlib
+import heapq
+import time
+
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.database import as_utc
+from app.core.periodic import LeaderLock, PeriodicWorker
+from app.models.order import Order, OrderStatus
+from app.models.user import User
+from app.services import order_state
+
+# numpy and scipy take most of a second to import, so they are imported by the
+# first solve rather than with the app
+np = None
+linear_sum_assignment = None
+_numeric_imported = False
+
+def _import_numeric() -> None:
+    global np, linear_sum_assignment, _numeric_imported
+    if _numeric_imported:
+        return
+    try:
+        import numpy
+        np = numpy
+    except ImportError:  # numpy is optional, costs are then computed in pure Python
+        pass
+    try:
+        from scipy.optimize import linear_sum_assignment as solver
+        linear_sum_assignment = solver
+    except ImportError:  # scipy is optional, every batch is then solved greedily
+        pass
+    _numeric_imported = True
+
+orders = Order.__table__
+users = User.__table__
+
+# Statuses in which an order counts towards its carrier's load
+OPEN_STATUSES = (OrderStatus.ACCEPTED, OrderStatus.PICKED_UP, OrderStatus.IN_TRANSIT)
+
+# Problems up to this many (order, carrier slot) cells are solved exactly with
+# scipy; bigger ones with the greedy candidate solver
+EXACT_MAX_CELLS = 4_000_000
+# Cheapest carriers kept per order in each greedy round
+CANDIDATES = 8
+# Orders per open carrier slot kept for the greedy rounds after the first
+OVERSAMPLE = 4
+# Orders costed at a time by the vectorized solver, bounding its memory
+BLOCK_SIZE = 1024
+# Orders given to the atomic assignment per transaction
+APPLY_BATCH_SIZE = 500
+
+Position = Tuple[float, float]
+Locator = Callable[[str], Position]
+
+# Side of the square the default locator spreads locations over
+AREA_KM = 100.0
+
+@lru_cache(maxsize=65536)
+def hashed_locator(location: str) -> Position:
+    """
+    A stable stand-in position (km) for a free-text location, derived from its hash.
+
+    Orders only carry addresses, so the engine needs a locator to turn them into
+    coordinates. This one puts equal addresses at the same point and spreads the
+    rest evenly over the area; install a geocoder with set_locator().
+    """
+    digest = hashlib.blake2b(location.strip().lower().encode(), digest_size=8).digest()
+    x = int.from_bytes(digest[:4], "big") / 0xFFFFFFFF
+    y = int.from_bytes(digest[4:], "big") / 0xFFFFFFFF
+    return (x * AREA_KM, y * AREA_KM)
+
+_locator: Locator = hashed_locator
+
+def get_locator() -> Locator:
+    return _locator
+
+def set_locator(locator: Locator) -> None:
+    global _locator
+    _locator = locator
+
+class Weights(NamedTuple):
+    """Terms of the cost of giving an order to a carrier."""
+    # Per km from the carrier to the pickup
+    distance: float = 1.0
+    # Per hour of deadline slack left after the trip, so urgent orders go first
+    slack: float = 2.0
+    # Per open order the carrier already holds, to spread the work
+    load: float = 10.0
+    # Slack above this many hours makes no difference
+    horizon_hours: float = 48.0
+    # Distance assumed for carriers with no known position
+    unknown_distance_km: float = 25.0
+    speed_kmh: float = 50.0
+
+class DispatchProblem(NamedTuple):
+    """Open orders and available carriers as parallel sequences."""
+    order_ids: List[int]
+    pickups: List[Position]
+    # Hours until each order's delivery deadline
+    hours_left: List[float]
+    # Pickup to delivery distance of each order
+    trip_km: List[float]
+    carrier_ids: List[int]
+    # Last known position of each carrier, None when unknown
+    positions: List[Optional[Position]]
+    # Open orders each carrier already holds
+    loads: List[int]
+    # Most open orders a carrier may hold
+    capacity: int
+
+class DispatchRun(NamedTuple):
+    orders: int
+    carriers: int
+    proposed: int
+    assigned: int
+    solve_ms: float
+
+def _distance(a: Position, b: Position) -> float:
+    return ((a[0] - b[0]) ** 2 + (a[1] - b[1]) ** 2) ** 0.5
+
+def load_problem(
+    db: Session,
+    batch_size: int,
+    capacity: int,
+    locator: Optional[Locator] = None,
+    now: Optional[datetime] = None
+) -> DispatchProblem:
+    """
+    Read the `batch_size` most urgent open orders and every active carrier below
+    `capacity`. A carrier is placed at the delivery location of its most recently
+    updated open order.
+    """
+    locator = locator or get_locator()
+    now = now or datetime.now(timezone.utc)
+    open_orders = db.execute(
+        select(orders.c.id, orders.c.pickup_location, orders.c.delivery_location, orders.c.delivery_deadline)
+        .where(
+            orders.c.is_assigned == False,
+            orders.c.status == OrderStatus.PENDING,
+            orders.c.deleted_at.is_(None),
+        )
+        .order_by(orders.c.delivery_deadline, orders.c.id)
+        .limit(batch_size)
+    ).all()
+
+    carrier_ids = db.execute(
+        select(users.c.id)
+        .where(users.c.account_type == "carrier", users.c.is_active == True)
+        .order_by(users.c.id)
+    ).scalars().all()
+    loads = dict(db.execute(
+        select(orders.c.carrier_id, func.count())
+        .where(orders.c.status.in_(OPEN_STATUSES), orders.c.deleted_at.is_(None))
+        .group_by(orders.c.carrier_id)
+    ).all())
+    last_locations = {}
+    for row in db.execute(
+        select(orders.c.carrier_id, orders.c.delivery_location)
+        .where(orders.c.status.in_(OPEN_STATUSES), orders.c.deleted_at.is_(None))
+        .order_by(orders.c.updated_at, orders.c.id)
+    ):
+        last_locations[row.carrier_id] = row.delivery_location
+    carrier_ids = [carrier_id for carrier_id in carrier_ids if loads.get(carrier_id, 0) < capacity]
+
+    pickups = [locator(row.pickup_location) for row in open_orders]
+    return DispatchProblem(
+        order_ids=[row.id for row in open_orders],
+        pickups=pickups,
+        hours_left=[(as_utc(row.delivery_deadline) - now).total_seconds() / 3600 for row in open_orders],
+        trip_km=[_distance(pickup, locator(row.delivery_location)) for pickup, row in zip(pickups, open_orders)],
+        carrier_ids=carrier_ids,
+        positions=[
+            locator(last_locations[carrier_id]) if carrier_id in last_locations else None
+            for carrier_id in carrier_ids
+        ],
+        loads=[loads.get(carrier_id, 0) for carrier_id in carrier_ids],
+        capacity=capacity,
+    )
+
+class _Vectors:
+    """The problem as float32 numpy arrays, built once per solve."""
+
+    def __init__(self, problem: DispatchProblem):
+        pickups = np.asarray(problem.pickups, dtype=np.float32).reshape(-1, 2)
+        positions = np.array(
+            [position if position is not None else (np.nan, np.nan) for position in problem.positions],
+            dtype=np.float32,
+        ).reshape(-1, 2)
+        self.pickup_x, self.pickup_y = pickups[:, 0], pickups[:, 1]
+        self.carrier_x, self.carrier_y = positions[:, 0], positions[:, 1]
+        self.unknown = np.isnan(self.carrier_x)
+        self.hours_left = np.asarray(problem.hours_left, dtype=np.float32)
+        self.trip_km = np.asarray(problem.trip_km, dtype=np.float32)
+        self.loads = np.asarray(problem.loads, dtype=np.float32)
+
+    def costs(self, weights: Weights, rows, columns):
+        """len(rows) x len(columns) matrix of the cost of giving each order to each carrier."""
+        # Worked in place: at 50K x 2K the temporaries, not the arithmetic, set the pace
+        distance = self.pickup_x[rows, None] - self.carrier_x[None, columns]
+        dy = self.pickup_y[rows, None] - self.carrier_y[None, columns]
+        distance *= distance
+        dy *= dy
+        distance += dy
+        np.sqrt(distance, out=distance)
+        unknown = self.unknown[columns]
+        if unknown.any():
+            distance[:, unknown] = weights.unknown_distance_km
+
+        # Hours to spare after reaching the pickup and driving to the delivery
+        slack = np.multiply(distance, np.float32(-1 / weights.speed_kmh), out=dy)
+        slack += (self.hours_left[rows] - self.trip_km[rows] / weights.speed_kmh)[:, None]
+        np.clip(slack, 0.0, weights.horizon_hours, out=slack)
+
+        slack *= np.float32(weights.slack)
+        distance *= np.float32(weights.distance)
+        distance += slack
+        distance += (weights.load * self.loads[columns])[None, :]
+        return distance
+
+def _python_costs(problem: DispatchProblem, weights: Weights, row: int, columns: Sequence[int]) -> List[float]:
+    pickup = problem.pickups[row]
+    costs = []
+    for column in columns:
+        position = problem.positions[column]
+        distance = _distance(pickup, position) if position is not None else weights.unknown_distance_km
+        slack = problem.hours_left[row] - (distance + problem.trip_km[row]) / weights.speed_kmh
+        slack = min(max(slack, 0.0), weights.horizon_hours)
+        costs.append(
+            weights.distance * distance + weights.slack * slack + weights.load * problem.loads[column]
+        )
+    return costs
+
+def _candidates(
+    problem: DispatchProblem,
+    weights: Weights,
+    vectors: Optional[_Vectors],
+    rows: List[int],
+    columns: List[int]
+) -> Iterable[Tuple[float, int, int]]:
+    """(cost, order, carrier) for the CANDIDATES cheapest carriers of every order, cheapest first."""
+    k = min(CANDIDATES, len(columns))
+    if vectors is None:
+        found = []
+        for row in rows:
+            costs = _python_costs(problem, weights, row, columns)
+            found.extend(
+                (cost, row, columns[position])
+                for cost, position in heapq.nsmallest(k, zip(costs, range(len(columns))))
+            )
+        found.sort()
+        return found
+
+    columns_array = np.asarray(columns)
+    costs_found, rows_found, columns_found = [], [], []
+    for start in range(0, len(rows), BLOCK_SIZE):
+        block = np.asarray(rows[start:start + BLOCK_SIZE])
+        costs = vectors.costs(weights, block, columns_array)
+        if k < len(columns):
+            nearest = np.argpartition(costs, k - 1, axis=1)[:, :k]
+        else:
+            nearest = np.broadcast_to(np.arange(k), costs.shape)
+        costs_found.append(np.take_along_axis(costs, nearest, axis=1).ravel())
+        rows_found.append(np.repeat(block, k))
+        columns_found.append(columns_array[nearest].ravel())
+    costs = np.concatenate(costs_found)
+    order = np.argsort(costs, kind="stable")
+    return zip(
+        costs[order].tolist(),
+        np.concatenate(rows_found)[order].tolist(),
+        np.concatenate(columns_found)[order].tolist(),
+    )
+
+def _solve_greedy(problem: DispatchProblem, weights: Weights, remaining: List[int]) -> Dict[int, int]:
+    """
+    Hand out the cheapest (order, carrier) candidates first, in rounds: each
+    round looks at the cheapest few carriers with room left for every order
+    still waiting, so every round assigns at least one order. After the first
+    round only the orders with the cheapest best carrier, a few per open slot,
+    are costed again.
+    """
+    vectors = _Vectors(problem) if np is not None else None
+    assigned: Dict[int, int] = {}
+    slots = sum(remaining)
+    rows = list(range(len(problem.order_ids)))
+    while True:
+        columns = [column for column, room in enumerate(remaining) if room > 0]
+        if not rows or not columns:
+            return assigned
+        before = len(assigned)
+        best: Dict[int, float] = {}
+        for cost, row, column in _candidates(problem, weights, vectors, rows, columns):
+            best.setdefault(row, cost)
+            if row not in assigned and remaining[column] > 0:
+                assigned[row] = column
+                remaining[column] -= 1
+                slots -= 1
+                if not slots:
+                    return assigned
+        if len(assigned) == before:
+            return assigned
+        rows = sorted((row for row in best if row not in assigned), key=best.get)[:slots * OVERSAMPLE]
+
+def _solve_exact(problem: DispatchProblem, weights: Weights, remaining: List[int]) -> Dict[int, int]:
+    """
+    Minimum-cost assignment over carrier slots: a carrier with room for n more
+    orders is n columns, the k-th of them costed as if it held k more orders.
+    """
+    room = np.asarray(remaining)
+    slot_columns = np.repeat(np.arange(len(remaining)), room)
+    slot_number = np.arange(len(slot_columns)) - np.repeat(np.cumsum(room) - room, room)
+    vectors = _Vectors(problem)
+    costs = vectors.costs(weights, np.arange(len(problem.order_ids)), slot_columns)
+    costs += weights.load * slot_number[None, :]
+    rows, slots = linear_sum_assignment(costs)
+    return dict(zip(rows.tolist(), slot_columns[slots].tolist()))
+
+def solve(problem: DispatchProblem, weights: Weights = Weights()) -> Dict[int, int]:
+    """
+    Match open orders to carriers with room left, at most `capacity` open orders
+    per carrier. Returns {order id: carrier id}; orders that don't fit wait for
+    the next run.
+    """
+    remaining = [max(0, problem.capacity - load) for load in problem.loads]
+    slots = sum(remaining)
+    if not problem.order_ids or not slots:
+        return {}
+    _import_numeric()
+    exact = (
+        np is not None and linear_sum_assignment is not None
+        and len(problem.order_ids) * slots <= EXACT_MAX_CELLS
+    )
+    matches = _solve_exact(problem, weights, remaining) if exact else _solve_greedy(problem, weights, remaining)
+    return {problem.order_ids[row]: problem.carrier_ids[column] for row, column in sorted(matches.items())}
+
+class DispatchEngine:
+    """Solves a batch of open orders against the available carriers and assigns the result."""
+
+    def __init__(
+        self,
+        batch_size: int,
+        capacity: int,
+        weights: Weights = Weights(),
+        locator: Optional[Locator] = None
+    ):
+        self.batch_size = batch_size
+        self.capacity = capacity
+        self.weights = weights
+        self.locator = locator
+
+    def run(self, db: Session, now: Optional[datetime] = None) -> DispatchRun:
+        problem = load_problem(db, self.batch_size, self.capacity, self.locator, now)
+        # End the read transaction; each assignment batch runs in its own
+        db.rollback()
+        start = time.perf_counter()
+        matches = solve(problem, self.weights)
+        solve_ms = (time.perf_counter() - start) * 1000
+
+        # Orders a carrier accepted while we were solving are skipped by the guarded update
+        assigned = 0
+        items = list(matches.items())
+        for offset in range(0, len(items), APPLY_BATCH_SIZE):
+            assigned += len(order_state.assign(db, dict(items[offset:offset + APPLY_BATCH_SIZE])))
+        return DispatchRun(len(problem.order_ids), len(problem.carrier_ids), len(matches), assigned, solve_ms)
+
+class DispatchScheduler(PeriodicWorker):
+    """
+    Background thread that runs the dispatch engine every `interval` seconds in
+    the worker holding `leader`. Runs in several workers at once would each see
+    a carrier's room as free and fill it again.
+    """
+
+    name = "dispatch"
+
+    def __init__(self, engine: DispatchEngine, session_factory, interval: float, leader: Optional[LeaderLock] = None):
+        super().__init__(session_factory, interval, leader=leader)
+        self.engine = engine
+
+    def run(self, db: Session) -> Optional[DispatchRun]:
+        if not self.is_leader():
+            return None
+        run = self.engine.run(db)
+        if run.assigned:
+            print(
+                f"Dispatch assigned {run.assigned} of {run.orders} open orders "
+                f"to {run.carriers} carriers (solved in {run.solve_ms:.0f} ms)"
+            )
+        return run
+
+dispatch_engine = DispatchEngine(settings.DISPATCH_BATCH_SIZE, settings.DISPATCH_CARRIER_CAPACITY)
@@ -0,0 +1,110 @@
+from typing import Optional, Any
+from datetime import datetime, timedelta, timezone
+import hashlib
+
+from sqlalchemy.orm import Session
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm.exc import ObjectDeletedError
+
+from app.core.config import settings
+from app.models.idempotency_key import IdempotencyKey
+
+class LeaseLost(Exception):
+    """The request's claim on its key lapsed and was dropped or taken over by a retry."""
+
+def utcnow() -> datetime:
+    return datetime.now(timezone.utc)
+
+def fingerprint(method: str, path: str, body: bytes) -> str:
+    """Hash the parts of a request that must match for a key to be replayed."""
+    digest = hashlib.sha256()
+    digest.update(method.upper().encode())
+    digest.update(b"\0")
+    digest.update(path.encode())
+    digest.update(b"\0")
+    digest.update(body)
+    return digest.hexdigest()
+
+def get_active(db: Session, user_id: int, key: str) -> Optional[IdempotencyKey]:
+    """Get the unexpired record stored for a user's key."""
+    return db.query(IdempotencyKey).filter(
+        IdempotencyKey.user_id == user_id,
+        IdempotencyKey.key == key,
+        IdempotencyKey.expires_at > utcnow()
+    ).first()
+
+def reserve(db: Session, user_id: int, key: str, request_hash: str) -> Optional[IdempotencyKey]:
+    """
+    Claim a key for a new request by storing an in-progress record. The claim is
+    a short lease (IDEMPOTENCY_LEASE_SECONDS); saving the response extends it to
+    the key's full lifetime, so a request that dies before answering frees its
+    key soon instead of leaving it "in progress" for a day. A request that
+    outlives its lease can't save its response (see `save_response`).
+    Returns None if a concurrent request claimed the key first.
+    """
+    now = utcnow()
+
+    # An expired record still holds the unique constraint, so drop it first
+    db.query(IdempotencyKey).filter(
+        IdempotencyKey.user_id == user_id,
+        IdempotencyKey.key == key,
+        IdempotencyKey.expires_at <= now
+    ).delete(synchronize_session=False)
+
+    record = IdempotencyKey(
+        key=key,
+        user_id=user_id,
+        request_hash=request_hash,
+        expires_at=now + timedelta(seconds=settings.IDEMPOTENCY_LEASE_SECONDS)
+    )
+    db.add(record)
+    try:
+        db.commit()
+    except IntegrityError:
+        db.rollback()
+        return None
+    return record
+
+def save_response(db: Session, record: IdempotencyKey, status_code: int, body: Any) -> None:
+    """
+    Store the response of the original request so retries can replay it.
+
+    Runs in the caller's transaction and doesn't commit: call it before the
+    write it answers commits (see the services' `before_commit`), so the write
+    and its stored response are saved or lost together. Raises LeaseLost if the
+    claim is no longer this request's, in which case the write must roll back
+    as well, since a retry may already be running it.
+    """
+    try:
+        record_id, key, request_hash = record.id, record.key, record.request_hash
+    except ObjectDeletedError:
+        # Reloading the claim found it gone
+        raise LeaseLost("Idempotency-Key claim was dropped after its lease ran out")
+    saved = db.query(IdempotencyKey).filter(
+        IdempotencyKey.id == record_id,
+        IdempotencyKey.request_hash == request_hash,
+        IdempotencyKey.status_code.is_(None)
+    ).update({
+        "status_code": status_code,
+        "response_body": body,
+        "expires_at": utcnow() + timedelta(hours=settings.IDEMPOTENCY_KEY_TTL_HOURS)
+    }, synchronize_session=False)
+    if saved != 1:
+        raise LeaseLost(f"Idempotency-Key {key!r} was claimed by another request")
+
+def release(db: Session, record: IdempotencyKey) -> None:
+    """Drop an in-progress record after its request failed, so the key can be retried."""
+    db.rollback()
+    db.query(IdempotencyKey).filter(
+        IdempotencyKey.id == record.id,
+        IdempotencyKey.status_code.is_(None)
+    ).delete(synchronize_session=False)
+    db.commit()
+
+def purge_expired(db: Session) -> int:
+    """Delete all expired keys in a single statement. Returns the number of rows removed."""
+    result = db.query(IdempotencyKey).filter(
+        IdempotencyKey.expires_at <= utcnow()
+    ).delete(synchronize_session=False)
+    db.commit()
+    return result
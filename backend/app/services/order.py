@@ -1,75 +1,346 @@
-from typing import Optional, List, Dict, Any
-from sqlalchemy.orm import Session
-from sqlalchemy import and_, or_, desc
+from typing import Optional, List, Dict, Any, Callable, Sequence, NamedTuple, Tuple
+from sqlalchemy.orm import Session, load_only
+from sqlalchemy import and_, or_, asc, desc, func, insert, inspect, select
+from sqlalchemy import update as sql_update
+from sqlalchemy.exc import IntegrityError
 from datetime import datetime
-import uuid
 
+from app.core import ids, page_cache, singleflight
+from app.models.archive import ArchivedOrder
 from app.models.order import Order, OrderStatus
 from app.models.order_item import OrderItem
-from app.schemas.order import OrderCreate, OrderUpdate, OrderStatusUpdate, OrderFilter, CarrierAssignment
-from app.schemas.pagination import PaginatedResult
+from app.models.order_read_model import OrderReadModel
+from app.models.order_tombstone import OrderTombstone
+from app.schemas.order import (
+    OrderCreate, OrderUpdate, OrderStatusUpdate, OrderFilter, CarrierAssignment, SUMMARY_FIELDS
+)
+from app.schemas.pagination import FacetedResult, PaginatedResult
+from app.services import archive as archive_service
+from app.services import order_cache
+from app.services import read_model
+from app.services.board import order_board
+
+# Identical concurrent reads share one query. Keys include the engine, so reads
+# routed to the primary for read-your-writes never take a replica's result.
+available_flights = singleflight.group("available_orders")
+tracking_flights = singleflight.group("tracking_lookups")
+items_flights = singleflight.group("order_items")
+
+def _copy_row(row):
+    """A detached copy of an ORM row (or dict), safe to hand to another request."""
+    if isinstance(row, dict):
+        return dict(row)
+    if row is None:
+        return None
+    model = type(row)
+    unloaded = inspect(row).unloaded
+    return model(**{
+        column.key: getattr(row, column.key)
+        for column in inspect(model).column_attrs if column.key not in unloaded
+    })
+
+def _copy_page(page: PaginatedResult) -> PaginatedResult:
+    return page.model_copy(update={"items": [_copy_row(row) for row in page.items]})
+
+def _copy_items(items_by_order: Dict[int, List[OrderItem]]) -> Dict[int, List[OrderItem]]:
+    return {order_id: [_copy_row(item) for item in items] for order_id, items in items_by_order.items()}
 
 def generate_order_number() -> str:
-    """Generate a unique order number."""
-    return f"ORD-{uuid.uuid4().hex[:8].upper()}"
+    """Generate a unique, time-ordered order number."""
+    return ids.new_code("ORD")
 
 def generate_tracking_number() -> str:
-    """Generate a unique tracking number."""
-    return f"TRK-{uuid.uuid4().hex[:10].upper()}"
+    """Generate a unique, time-ordered tracking number."""
+    return ids.new_code("TRK")
 
-def get_by_id(db: Session, order_id: int) -> Optional[Order]:
-    return db.query(Order).filter(Order.id == order_id).first()
+def get_by_id(db: Session, order_id: int, include_archived: bool = False) -> Optional[Order]:
+    """Get an order by ID, falling back to the archive when `include_archived` is set."""
+    order = db.query(Order).filter(Order.id == order_id, Order.live()).first()
+    if order is None and include_archived:
+        order = archive_service.get_by_id(db, order_id)
+    return order
 
 def get_by_order_number(db: Session, order_number: str) -> Optional[Order]:
-    return db.query(Order).filter(Order.order_number == order_number).first()
+    return db.query(Order).filter(Order.order_number == order_number, Order.live()).first()
 
-def get_by_tracking_number(db: Session, tracking_number: str) -> Optional[Order]:
-    return db.query(Order).filter(Order.tracking_number == tracking_number).first()
+def get_by_tracking_number(db: Session, tracking_number: str, include_archived: bool = False) -> Optional[Order]:
+    """
+    Get an order by tracking number, falling back to the archive when `include_archived` is set.
+    Concurrent lookups of the same number share one query.
+    """
+    def load():
+        order = db.query(Order).filter(Order.tracking_number == tracking_number, Order.live()).first()
+        if order is None and include_archived:
+            order = archive_service.get_by_tracking_number(db, tracking_number)
+        return order
+    
+    key = ("order", db.get_bind(), tracking_number, include_archived)
+    return tracking_flights.do(key, load, copy=_copy_row)
 
-def get_items(db: Session, order_id: int) -> List[OrderItem]:
-    return db.query(OrderItem).filter(OrderItem.order_id == order_id).all()
+class OrderAccess(NamedTuple):
+    """The columns permission checks need, and whether the order is archived."""
+    id: int
+    shipper_id: int
+    carrier_id: Optional[int]
+    status: OrderStatus
+    archived: bool
 
-def get_multi(
-    db: Session, 
-    shipper_id: Optional[int] = None,
-    carrier_id: Optional[int] = None,
-    filter_params: Optional[OrderFilter] = None,
-    skip: int = 0, 
-    limit: int = 100
-) -> PaginatedResult[Order]:
-    query = db.query(Order)
+def get_access(
+    db: Session,
+    order_id: Optional[int] = None,
+    tracking_number: Optional[str] = None,
+    include_archived: bool = False
+) -> Optional[OrderAccess]:
+    """
+    Look up only the ownership columns of an order by ID or tracking number, so a
+    request can be authorized before the full order is loaded.
+    
+    Lookups go through the shared cache (see order_cache), and concurrent
+    database lookups of the same tracking number share one query.
+    """
+    if order_id is None:
+        order_id = order_cache.get_tracked_order_id(tracking_number)
+    if order_id is not None:
+        cached = order_cache.get_access(order_id)
+        if cached is not None:
+            access = OrderAccess(*cached[:3], OrderStatus(cached[3]), cached[4])
+            return access if include_archived or not access.archived else None
+    
+    if order_id is None:
+        key = ("access", db.get_bind(), tracking_number, include_archived)
+        access = tracking_flights.do(key, lambda: _load_access(db, None, tracking_number, include_archived))
+    else:
+        access = _load_access(db, order_id, None, include_archived)
     
+    if access is not None:
+        if tracking_number is not None:
+            order_cache.remember_tracking(tracking_number, access.id)
+        order_cache.remember_access(access)
+    return access
+
+def _load_access(
+    db: Session,
+    order_id: Optional[int],
+    tracking_number: Optional[str],
+    include_archived: bool
+) -> Optional[OrderAccess]:
+    models = (Order, ArchivedOrder) if include_archived else (Order,)
+    for model in models:
+        query = db.query(model.id, model.shipper_id, model.carrier_id, model.status)
+        if model is Order:
+            query = query.filter(Order.live())
+        if order_id is not None:
+            query = query.filter(model.id == order_id)
+        else:
+            query = query.filter(model.tracking_number == tracking_number)
+        row = query.first()
+        if row is not None:
+            return OrderAccess(*row, archived=model is ArchivedOrder)
+    return None
+
+def get_by_access(db: Session, access: OrderAccess) -> Order:
+    """Load the full order an access check was made on, from the live or archive table."""
+    if access.archived:
+        return archive_service.get_by_id(db, access.id)
+    return get_by_id(db, access.id)
+
+def get_items(db: Session, order_id: int, archived: bool = False) -> List[OrderItem]:
+    if archived:
+        return archive_service.get_items(db, order_id)
+    return db.query(OrderItem).filter(OrderItem.order_id == order_id).all()
+
+def get_items_for_orders(db: Session, order_ids: Sequence[int]) -> Dict[int, List[OrderItem]]:
+    """
+    Load the items of several orders in one query, grouped by order id.
+    Concurrent loads for the same orders (e.g. the first page of the board) share one query.
+    """
+    if not order_ids:
+        return {}
+    key = (db.get_bind(), tuple(order_ids))
+    return items_flights.do(key, lambda: _load_items(db, order_ids), copy=_copy_items)
+
+def _load_items(db: Session, order_ids: Sequence[int]) -> Dict[int, List[OrderItem]]:
+    items_by_order: Dict[int, List[OrderItem]] = {order_id: [] for order_id in order_ids}
+    items = db.query(OrderItem).filter(OrderItem.order_id.in_(order_ids)).order_by(OrderItem.id).all()
+    for item in items:
+        items_by_order[item.order_id].append(item)
+    return items_by_order
+
+def _select(db: Session, fields: Optional[Sequence[str]], from_read_model: bool = False):
+    """
+    Query whole live orders, or only the named columns when a projection is requested.
+    With `from_read_model`, query read-model rows instead, loading only the
+    pre-serialized payload the page is rendered from: the summary payload for
+    exactly the summary fieldset, else the full order.
+    """
+    if from_read_model:
+        if fields is not None and set(fields) == set(SUMMARY_FIELDS):
+            payload = OrderReadModel.summary_payload
+        else:
+            payload = OrderReadModel.payload
+        return db.query(OrderReadModel).options(load_only(OrderReadModel.id, payload))
+    if fields is None:
+        return db.query(Order).filter(Order.live())
+    return db.query(*[getattr(Order, field) for field in fields]).filter(Order.live())
+
+# Columns the list endpoints can sort by. Each sort is tie-broken by id in the
+# same direction, so (column, id) is a total order that a keyset cursor can seek on.
+# The read model has the same columns under the same names.
+SORT_COLUMNS = {
+    "created_at": Order.created_at,
+    "delivery_deadline": Order.delivery_deadline,
+    "pickup_date": Order.pickup_date,
+    "weight": Order.weight,
+    "total_amount": Order.total_amount,
+}
+DEFAULT_SORT = "-created_at"
+
+def parse_sort(sort: str) -> Tuple[str, bool]:
+    """Split `sort` ("weight" or "-weight") into a column name and whether it is descending."""
+    descending = sort.startswith("-")
+    name = sort[1:] if descending else sort
+    if name not in SORT_COLUMNS:
+        raise ValueError(f"Unknown sort '{name}'")
+    return name, descending
+
+def _order_by(sort: str, model=Order) -> list:
+    name, descending = parse_sort(sort)
+    direction = desc if descending else asc
+    return [direction(getattr(model, name)), direction(model.id)]
+
+def _page_items(
+    query,
+    fields: Optional[Sequence[str]],
+    skip: int,
+    limit: int,
+    sort: str = DEFAULT_SORT,
+    model=Order
+) -> list:
+    rows = query.order_by(*_order_by(sort, model)).offset(skip).limit(limit).all()
+    if fields is None or model is not Order:
+        return rows
+    return [dict(row._mapping) for row in rows]
+
+def _apply_filters(
+    query,
+    shipper_id: Optional[int],
+    carrier_id: Optional[int],
+    filter_params: Optional[OrderFilter],
+    by_status: bool = True,
+    model=Order
+):
     # Apply shipper_id filter if provided
     if shipper_id is not None:
-        query = query.filter(Order.shipper_id == shipper_id)
+        query = query.filter(model.shipper_id == shipper_id)
     
     # Apply carrier_id filter if provided
     if carrier_id is not None:
-        query = query.filter(Order.carrier_id == carrier_id)
+        query = query.filter(model.carrier_id == carrier_id)
     
     # Apply additional filters if provided
     if filter_params:
-        if filter_params.status:
-            query = query.filter(Order.status == filter_params.status)
+        if by_status and filter_params.status:
+            query = query.filter(model.status == filter_params.status)
+        if by_status and filter_params.statuses:
+            query = query.filter(model.status.in_(filter_params.statuses))
         if filter_params.customer_email:
-            query = query.filter(Order.customer_email == filter_params.customer_email)
+            query = query.filter(model.customer_email == filter_params.customer_email)
         if filter_params.date_from:
-            query = query.filter(Order.created_at >= filter_params.date_from)
+            query = query.filter(model.created_at >= filter_params.date_from)
         if filter_params.date_to:
-            query = query.filter(Order.created_at <= filter_params.date_to)
+            query = query.filter(model.created_at <= filter_params.date_to)
         if filter_params.is_assigned is not None:
-            query = query.filter(Order.is_assigned == filter_params.is_assigned)
+            query = query.filter(model.is_assigned == filter_params.is_assigned)
+    return query
+
+def _selected_statuses(filter_params: Optional[OrderFilter]) -> Optional[set]:
+    """The status values the filter lets through, or None when it does not filter on status."""
+    if filter_params is None:
+        return None
+    selected = None
+    if filter_params.status:
+        selected = {OrderStatus(filter_params.status).value}
+    if filter_params.statuses:
+        statuses = {OrderStatus(value).value for value in filter_params.statuses}
+        selected = statuses if selected is None else selected & statuses
+    return selected
+
+def get_status_counts(
+    db: Session,
+    shipper_id: Optional[int] = None,
+    carrier_id: Optional[int] = None,
+    filter_params: Optional[OrderFilter] = None,
+    from_read_model: bool = False
+) -> Dict[str, int]:
+    """
+    Count live orders per status with one grouped query. Every filter except the
+    status filter applies, so clients can show how many orders each status choice
+    would return.
+    """
+    model = OrderReadModel if from_read_model else Order
+    query = db.query(model.status, func.count())
+    if model is Order:
+        query = query.filter(Order.live())
+    query = _apply_filters(query, shipper_id, carrier_id, filter_params, by_status=False, model=model)
+    counts = {status.value: 0 for status in OrderStatus}
+    for order_status, count in query.group_by(model.status).all():
+        counts[OrderStatus(order_status).value] = count
+    return counts
+
+def get_multi(
+    db: Session, 
+    shipper_id: Optional[int] = None,
+    carrier_id: Optional[int] = None,
+    filter_params: Optional[OrderFilter] = None,
+    skip: int = 0, 
+    limit: int = 100,
+    fields: Optional[Sequence[str]] = None,
+    facets: bool = False,
+    sort: str = DEFAULT_SORT,
+    from_read_model: bool = False
+) -> PaginatedResult[Order]:
+    """
+    List orders with filters. When `fields` names a set of columns, only those
+    columns are selected and the page items are plain dicts.
     
-    # Get total count before applying pagination
-    total = query.count()
+    With `facets`, the result is a FacetedResult carrying per-status counts, and
+    the total is summed from those counts instead of running a separate COUNT.
+    `sort` names a SORT_COLUMNS key, prefixed with "-" for descending order.
+    With `from_read_model`, the page items are OrderReadModel rows and `fields`
+    is the requested fieldset, items included, since rows are rendered from
+    their payloads.
+    """
+    model = OrderReadModel if from_read_model else Order
+    query = _apply_filters(
+        _select(db, fields, from_read_model), shipper_id, carrier_id, filter_params, model=model
+    )
+    
+    if facets:
+        status_counts = get_status_counts(db, shipper_id, carrier_id, filter_params, from_read_model)
+        selected = _selected_statuses(filter_params)
+        total = sum(
+            count for order_status, count in status_counts.items()
+            if selected is None or order_status in selected
+        )
+    else:
+        # Get total count before applying pagination
+        total = query.count()
     
     # Apply ordering and pagination
-    items = query.order_by(desc(Order.created_at)).offset(skip).limit(limit).all()
+    items = _page_items(query, fields, skip, limit, sort, model)
     
     # Calculate page information
     page_size = limit
     page = (skip // page_size) + 1 if page_size > 0 else 1
     
+    if facets:
+        return FacetedResult.create(
+            items=items,
+            total=total,
+            page=page,
+            page_size=page_size,
+            status_counts=status_counts
+        )
     return PaginatedResult.create(
         items=items,
         total=total,
@@ -80,16 +351,45 @@ def get_multi(
 def get_available_orders(
     db: Session,
     skip: int = 0,
-    limit: int = 100
+    limit: int = 100,
+    fields: Optional[Sequence[str]] = None,
+    sort: str = DEFAULT_SORT,
+    from_read_model: bool = False
+) -> PaginatedResult[Order]:
+    """
+    Get orders that are not assigned to a carrier. Every SORT_COLUMNS sort has a
+    matching partial index over the board, so deep pages walk an index instead of
+    sorting the table.
+    
+    The board is the same for every carrier, so identical concurrent requests
+    (e.g. page 1 at shift start) share one count and one page query. Once the
+    in-memory board (see services/board.py) is loaded, read-model pages are
+    served from it without a query; the page items are then BoardEntry objects.
+    """
+    if from_read_model and order_board.serving:
+        return order_board.page(skip, limit, *parse_sort(sort))
+    
+    key = (db.get_bind(), skip, limit, tuple(fields) if fields else None, sort, from_read_model)
+    return available_flights.do(
+        key, lambda: _load_available_orders(db, skip, limit, fields, sort, from_read_model), copy=_copy_page
+    )
+
+def _load_available_orders(
+    db: Session,
+    skip: int,
+    limit: int,
+    fields: Optional[Sequence[str]],
+    sort: str,
+    from_read_model: bool
 ) -> PaginatedResult[Order]:
-    """Get orders that are not assigned to a carrier."""
-    query = db.query(Order).filter(Order.is_assigned == False)
+    model = OrderReadModel if from_read_model else Order
+    query = _select(db, fields, from_read_model).filter(model.is_assigned == False)
     
     # Get total count before applying pagination
     total = query.count()
     
     # Apply ordering and pagination
-    items = query.order_by(desc(Order.created_at)).offset(skip).limit(limit).all()
+    items = _page_items(query, fields, skip, limit, sort, model)
     
     # Calculate page information
     page_size = limit
@@ -102,20 +402,39 @@ def get_available_orders(
         page_size=page_size
     )
 
-def create(db: Session, obj_in: OrderCreate, shipper_id: int) -> Order:
-    """Create a new order with items."""
+def create(
+    db: Session,
+    obj_in: OrderCreate,
+    shipper_id: int,
+    before_commit: Optional[Callable[[Order], Any]] = None
+) -> Order:
+    """
+    Create a new order with items, retrying with a fresh order number if the
+    generated one is taken. `before_commit` is called with the flushed order
+    just before the commit, so what it writes (e.g. the stored response of an
+    idempotent request) commits or rolls back with the order.
+    """
     order_data = obj_in.model_dump(exclude={"items", "status"})
     
-    # Create order
-    db_obj = Order(
-        **order_data,
-        shipper_id=shipper_id,
-        order_number=generate_order_number(),
-        status=OrderStatus.PENDING,  # Use the enum directly
-        is_assigned=False
-    )
-    db.add(db_obj)
-    db.flush()  # Flush to get the order ID without committing
+    for attempt in range(1, ids.COLLISION_RETRIES + 1):
+        # Create order
+        db_obj = Order(
+            **order_data,
+            shipper_id=shipper_id,
+            order_number=generate_order_number(),
+            status=OrderStatus.PENDING,  # Use the enum directly
+            is_assigned=False
+        )
+        db.add(db_obj)
+        try:
+            db.flush()  # Flush to get the order ID without committing
+            break
+        except IntegrityError:
+            db.rollback()
+            # Only a taken order number is worth another try, and only a few times
+            if get_by_order_number(db, db_obj.order_number) is None or attempt == ids.COLLISION_RETRIES:
+                raise
+            ids.report_collision(db_obj.order_number, attempt)
     
     # Create order items
     for item in obj_in.items:
@@ -125,9 +444,15 @@ def create(db: Session, obj_in: OrderCreate, shipper_id: int) -> Order:
             order_id=db_obj.id
         )
         db.add(db_item)
-    
+
+    db.flush()
+    read_rows = read_model.refresh(db, [db_obj.id])
+    if before_commit is not None:
+        before_commit(db_obj)
     db.commit()
+    order_board.upsert(read_rows)
     db.refresh(db_obj)
+    page_cache.invalidate(shipper_id=shipper_id)
     return db_obj
 
 def update(db: Session, db_obj: Order, obj_in: OrderUpdate) -> Order:
@@ -138,8 +463,13 @@ def update(db: Session, db_obj: Order, obj_in: OrderUpdate) -> Order:
         setattr(db_obj, field, value)
     
     db.add(db_obj)
+    db.flush()
+    read_rows = read_model.refresh(db, [db_obj.id])
     db.commit()
+    order_board.upsert(read_rows)
     db.refresh(db_obj)
+    page_cache.invalidate(db_obj.shipper_id, db_obj.carrier_id)
+    order_cache.forget([db_obj.id])
     return db_obj
 
 def update_status(db: Session, db_obj: Order, status_update: OrderStatusUpdate) -> Order:
@@ -152,29 +482,57 @@ def update_status(db: Session, db_obj: Order, status_update: OrderStatusUpdate)
         db_obj.tracking_number = generate_tracking_number()
     
     db.add(db_obj)
+    db.flush()
+    read_rows = read_model.refresh(db, [db_obj.id])
     db.commit()
+    order_board.upsert(read_rows)
     db.refresh(db_obj)
+    page_cache.invalidate(db_obj.shipper_id, db_obj.carrier_id)
+    order_cache.forget([db_obj.id])
     return db_obj
 
 def assign_carrier(db: Session, db_obj: Order, carrier_assignment: CarrierAssignment) -> Order:
     """Assign a carrier to an order."""
+    previous_carrier_id = db_obj.carrier_id
     db_obj.carrier_id = carrier_assignment.carrier_id
     db_obj.is_assigned = True
     db_obj.status = OrderStatus.ACCEPTED  # Use the enum directly, now with uppercase values
     db_obj.tracking_number = generate_tracking_number()
     
     db.add(db_obj)
+    db.flush()
+    read_rows = read_model.refresh(db, [db_obj.id])
     db.commit()
+    order_board.upsert(read_rows)
     db.refresh(db_obj)
+    page_cache.invalidate_many([(db_obj.shipper_id, db_obj.carrier_id), (None, previous_carrier_id)])
+    order_cache.forget([db_obj.id])
     return db_obj
 
 def delete(db: Session, order_id: int) -> bool:
-    """Delete an order and its items."""
-    # Delete the order items first
-    db.query(OrderItem).filter(OrderItem.order_id == order_id).delete()
+    """
+    Soft-delete an order, leaving a tombstone for sync clients. The row and its
+    items are removed later by the purge job (see services/purge.py).
+    """
+    owners = db.execute(
+        sql_update(Order)
+        .where(Order.id == order_id, Order.live())
+        .values(deleted_at=func.now())
+        .returning(Order.shipper_id, Order.carrier_id)
+        .execution_options(synchronize_session=False)
+    ).first()
+    if owners is None:
+        db.rollback()
+        return False
     
-    # Delete the order
-    result = db.query(Order).filter(Order.id == order_id).delete()
+    # Record the deletion for clients syncing changes since a watermark
+    db.execute(insert(OrderTombstone.__table__).from_select(
+        ["order_id", "shipper_id", "carrier_id"],
+        select(Order.id, Order.shipper_id, Order.carrier_id).where(Order.id == order_id)
+    ))
+    read_model.remove(db, [order_id])
     db.commit()
-    
-    return result > 0
\ No newline at end of file
+    order_board.remove([order_id])
+    page_cache.invalidate(*owners)
+    order_cache.forget([order_id])
+    return True
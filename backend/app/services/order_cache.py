@@ -0,0 +1,45 @@
+from typing import Iterable, List, Optional
+import json
+
+from app.core import shm_cache
+from app.core.config import settings
+from app.models.order import OrderStatus
+
+# Order lookups kept in the shared cache, so every worker on the host reuses them.
+# Access rows (owners and status) are invalidated by every write to the order;
+# tracking numbers never move to another order, so their mapping is only aged out.
+
+def _access_key(order_id: int) -> str:
+    return f"order-access:{order_id}"
+
+def _tracking_key(tracking_number: str) -> str:
+    return f"order-tracking:{tracking_number}"
+
+def get_access(order_id: int) -> Optional[List]:
+    """The cached [id, shipper_id, carrier_id, status, archived] of an order."""
+    cache = shm_cache.get_cache()
+    value = cache.lookup(_access_key(order_id)) if cache is not None else None
+    return json.loads(value) if value is not None else None
+
+def remember_access(access) -> None:
+    cache = shm_cache.get_cache()
+    if cache is not None:
+        value = json.dumps([access.id, access.shipper_id, access.carrier_id, OrderStatus(access.status).value, access.archived])
+        cache.add(_access_key(access.id), value.encode(), settings.ORDER_CACHE_TTL_SECONDS)
+
+def get_tracked_order_id(tracking_number: str) -> Optional[int]:
+    cache = shm_cache.get_cache()
+    value = cache.lookup(_tracking_key(tracking_number)) if cache is not None else None
+    return int(value) if value is not None else None
+
+def remember_tracking(tracking_number: str, order_id: int) -> None:
+    cache = shm_cache.get_cache()
+    if cache is not None:
+        cache.set(_tracking_key(tracking_number), str(order_id).encode(), settings.ORDER_CACHE_TTL_SECONDS)
+
+def forget(order_ids: Iterable[int]) -> None:
+    """Invalidate cached access rows after a write to these orders commits."""
+    cache = shm_cache.get_cache()
+    if cache is not None:
+        for order_id in order_ids:
+            cache.invalidate(_access_key(order_id))
@@ -0,0 +1,276 @@
+from typing import Any, Callable, Dict, FrozenSet, Iterable, List, Mapping, NamedTuple, Optional, Sequence, Tuple
+
+from sqlalchemy import case, select, update
+from sqlalchemy.engine import Row
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.core import ids, page_cache
+from app.models.order import Order, OrderStatus
+from app.services import order_cache
+from app.services import read_model
+from app.services.board import order_board
+
+orders = Order.__table__
+
+# Allowed transitions: current status -> {next status: account type allowed to make it}.
+# PENDING -> ACCEPTED happens through assign() (the carrier accept route and the
+# dispatch engine), which also assigns the carrier.
+TRANSITIONS: Dict[OrderStatus, Dict[OrderStatus, str]] = {
+    OrderStatus.PENDING: {
+        OrderStatus.CANCELLED: "shipper",
+    },
+    OrderStatus.ACCEPTED: {
+        OrderStatus.PICKED_UP: "carrier",
+        OrderStatus.CANCELLED: "shipper",
+    },
+    OrderStatus.PICKED_UP: {
+        OrderStatus.IN_TRANSIT: "carrier",
+        OrderStatus.CANCELLED: "shipper",
+    },
+    OrderStatus.IN_TRANSIT: {
+        OrderStatus.DELIVERED: "carrier",
+        OrderStatus.CANCELLED: "shipper",
+    },
+}
+
+# The order column that ties an order to each account type
+OWNER_COLUMNS = {
+    "shipper": orders.c.shipper_id,
+    "carrier": orders.c.carrier_id,
+}
+
+def _sources(transitions) -> Dict[Tuple[str, OrderStatus], FrozenSet[OrderStatus]]:
+    sources: Dict[Tuple[str, OrderStatus], set] = {}
+    for from_status, targets in transitions.items():
+        for to_status, account_type in targets.items():
+            sources.setdefault((account_type, to_status), set()).add(from_status)
+    return {key: frozenset(value) for key, value in sources.items()}
+
+# (account type, next status) -> statuses it can be reached from, built once from TRANSITIONS
+SOURCES = _sources(TRANSITIONS)
+
+class TransitionError(Exception):
+    pass
+
+class ForbiddenTransition(TransitionError):
+    """The account type may never move an order to the requested status."""
+
+class InvalidTransition(TransitionError):
+    """The requested status can't be reached from the order's current status."""
+
+class TransitionResult(NamedTuple):
+    order_id: int
+    status: Optional[OrderStatus]
+    error: Optional[str] = None
+    detail: Optional[str] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+def check(account_type: str, from_status: OrderStatus, to_status: OrderStatus) -> None:
+    """Raise ForbiddenTransition or InvalidTransition unless the transition is allowed."""
+    sources = SOURCES.get((account_type, to_status))
+    if sources is None:
+        raise ForbiddenTransition(f"{account_type.title()}s cannot set orders to {to_status}")
+    if from_status not in sources:
+        raise InvalidTransition(f"Invalid status transition from {from_status} to {to_status}")
+
+def transition(
+    db: Session,
+    order_id: int,
+    from_status: OrderStatus,
+    to_status: OrderStatus
+) -> Optional[Row]:
+    """
+    Move an order from `from_status` to `to_status` with a single guarded
+    `UPDATE ... WHERE status = :from RETURNING` and commit. Returns the updated
+    order row, or None when the order was no longer in `from_status`.
+    """
+    return _guarded_update(db, order_id, [from_status], to_status)
+
+def move(
+    db: Session,
+    order_id: int,
+    account_type: str,
+    to_status: OrderStatus,
+    before_commit: Optional[Callable[[Row], Any]] = None
+) -> Optional[Row]:
+    """
+    Move an order to `to_status` from whatever status it is in, guarded by
+    `UPDATE ... WHERE status IN (allowed sources) RETURNING`, and commit. The
+    status is only ever read by the database, never from the shared order
+    cache, so a stale cached status can't fail the update. Returns the updated
+    order row, or None when the order no longer exists. Raises
+    ForbiddenTransition, or InvalidTransition naming the order's actual status.
+    `before_commit` is called with the updated row inside the transaction, so
+    what it writes commits with the new status.
+    """
+    sources = SOURCES.get((account_type, to_status))
+    if sources is None:
+        raise ForbiddenTransition(f"{account_type.title()}s cannot set orders to {to_status}")
+    row = _guarded_update(db, order_id, sources, to_status, before_commit)
+    if row is not None:
+        return row
+
+    current = db.execute(
+        select(orders.c.status).where(orders.c.id == order_id, orders.c.deleted_at.is_(None))
+    ).scalar()
+    db.rollback()
+    # Whatever the cache held for this order didn't match the database
+    order_cache.forget([order_id])
+    if current is None:
+        return None
+    raise InvalidTransition(f"Invalid status transition from {current} to {to_status}")
+
+def _guarded_update(
+    db: Session,
+    order_id: int,
+    from_statuses: Iterable[OrderStatus],
+    to_status: OrderStatus,
+    before_commit: Optional[Callable[[Row], Any]] = None
+) -> Optional[Row]:
+    statement = (
+        update(orders)
+        .where(orders.c.id == order_id, orders.c.status.in_(list(from_statuses)), orders.c.deleted_at.is_(None))
+        .values(status=to_status)
+        .returning(*orders.c)
+    )
+    row = db.execute(statement).first()
+    read_rows = read_model.refresh(db, [row.id]) if row is not None else []
+    if row is not None and before_commit is not None:
+        before_commit(row)
+    db.commit()
+    order_board.upsert(read_rows)
+    if row is not None:
+        page_cache.invalidate(row.shipper_id, row.carrier_id)
+        order_cache.forget([row.id])
+    return row
+
+def assign(db: Session, assignments: Mapping[int, int]) -> List[Row]:
+    """
+    Give orders to carriers ({order id: carrier id}) and move them to ACCEPTED
+    with a single guarded `UPDATE ... WHERE id IN (...) AND is_assigned = false
+    AND status = 'PENDING' RETURNING`, then commit. Returns the assigned order
+    rows; orders taken by someone else in the meantime are left out. If a
+    generated tracking number is already taken, the update is retried with
+    fresh ones up to ids.COLLISION_RETRIES times.
+    """
+    if not assignments:
+        return []
+    order_ids = list(assignments)
+    for attempt in range(1, ids.COLLISION_RETRIES + 1):
+        tracking_numbers = dict(zip(order_ids, ids.new_codes("TRK", len(order_ids))))
+        statement = (
+            update(orders)
+            .where(
+                orders.c.id.in_(order_ids),
+                orders.c.is_assigned == False,
+                orders.c.status == OrderStatus.PENDING,
+                orders.c.deleted_at.is_(None),
+            )
+            .values(
+                carrier_id=case(dict(assignments), value=orders.c.id),
+                is_assigned=True,
+                status=OrderStatus.ACCEPTED,
+                tracking_number=case(tracking_numbers, value=orders.c.id),
+            )
+            .returning(*orders.c)
+        )
+        try:
+            rows = db.execute(statement).all()
+            break
+        except IntegrityError:
+            db.rollback()
+            taken = db.execute(
+                select(orders.c.tracking_number).where(orders.c.tracking_number.in_(tracking_numbers.values()))
+            ).scalars().first()
+            if taken is None or attempt == ids.COLLISION_RETRIES:
+                raise
+            ids.report_collision(taken, attempt)
+    read_rows = read_model.refresh(db, [row.id for row in rows])
+    db.commit()
+    order_board.upsert(read_rows)
+    page_cache.invalidate_many((row.shipper_id, row.carrier_id) for row in rows)
+    order_cache.forget([row.id for row in rows])
+    return rows
+
+def transition_many(
+    db: Session,
+    order_ids: Sequence[int],
+    to_status: OrderStatus,
+    account_type: str,
+    user_id: int,
+    before_commit: Optional[Callable[[List[TransitionResult]], Any]] = None
+) -> List[TransitionResult]:
+    """
+    Move many orders owned by `user_id` to `to_status` in one transaction.
+
+    Every order that is in an allowed source status is updated by a single
+    `UPDATE ... WHERE id IN (...) AND status IN (...) RETURNING`; the rest are
+    classified with one narrow SELECT. Returns a result per distinct order id,
+    in request order. Raises ForbiddenTransition if the account type may never
+    set `to_status`. `before_commit` is called with the results inside the
+    transaction, so what it writes commits with the updates.
+    """
+    sources = SOURCES.get((account_type, to_status))
+    if sources is None:
+        raise ForbiddenTransition(f"{account_type.title()}s cannot set orders to {to_status}")
+    owner_column = OWNER_COLUMNS[account_type]
+    order_ids = list(dict.fromkeys(order_ids))
+    if not order_ids:
+        return []
+
+    statement = (
+        update(orders)
+        .where(
+            orders.c.id.in_(order_ids),
+            orders.c.status.in_(sources),
+            owner_column == user_id,
+            orders.c.deleted_at.is_(None),
+        )
+        .values(status=to_status)
+        .returning(orders.c.id, orders.c.shipper_id, orders.c.carrier_id)
+    )
+    updated_rows = db.execute(statement).all()
+    updated = {row.id for row in updated_rows}
+
+    # Work out why the remaining orders were skipped
+    skipped = [order_id for order_id in order_ids if order_id not in updated]
+    current = {}
+    if skipped:
+        rows = db.execute(
+            select(orders.c.id, owner_column.label("owner_id"), orders.c.status)
+            .where(orders.c.id.in_(skipped), orders.c.deleted_at.is_(None))
+        )
+        current = {row.id: row for row in rows}
+
+    results = []
+    for order_id in order_ids:
+        if order_id in updated:
+            results.append(TransitionResult(order_id, to_status))
+            continue
+        row = current.get(order_id)
+        if row is None:
+            results.append(TransitionResult(
+                order_id, None, "not_found", f"Order with ID {order_id} not found"
+            ))
+        elif row.owner_id != user_id:
+            results.append(TransitionResult(
+                order_id, None, "forbidden", "Not enough permissions to modify this order"
+            ))
+        else:
+            results.append(TransitionResult(
+                order_id, row.status, "invalid_transition",
+                f"Invalid status transition from {row.status} to {to_status}"
+            ))
+
+    read_rows = read_model.refresh(db, list(updated))
+    if before_commit is not None:
+        before_commit(results)
+    db.commit()
+    order_board.upsert(read_rows)
+    page_cache.invalidate_many((row.shipper_id, row.carrier_id) for row in updated_rows)
+    order_cache.forget(updated)
+    return results
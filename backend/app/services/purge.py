@@ -0,0 +1,112 @@
+from datetime import datetime, timedelta, timezone
+from typing import NamedTuple, Optional
+import time
+
+from sqlalchemy import delete, select
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.periodic import PeriodicWorker
+from app.models.order import Order
+from app.models.order_tombstone import OrderTombstone
+
+class PurgeStats(NamedTuple):
+    orders: int
+    seconds: float
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.orders / self.seconds if self.seconds else 0.0
+
+def purge_batch(db: Session, cutoff: datetime, batch_size: int) -> int:
+    """
+    Permanently delete one batch of orders soft-deleted before `cutoff`. Items go
+    with them through ON DELETE CASCADE, so this is a single statement.
+    Returns the number of orders removed.
+    """
+    batch = (
+        select(Order.id)
+        .where(Order.deleted_at.is_not(None), Order.deleted_at < cutoff)
+        .order_by(Order.deleted_at)
+        .limit(batch_size)
+        .scalar_subquery()
+    )
+    result = db.execute(delete(Order).where(Order.id.in_(batch)).execution_options(synchronize_session=False))
+    db.commit()
+    return result.rowcount
+
+def purge_deleted_orders(
+    db: Session,
+    older_than_minutes: Optional[int] = None,
+    batch_size: Optional[int] = None,
+    rows_per_second: Optional[float] = None,
+    sleep=time.sleep
+) -> PurgeStats:
+    """
+    Purge soft-deleted orders in committed batches, pausing between batches so
+    the job removes at most `rows_per_second` orders per second (0 = no limit).
+    """
+    minutes = settings.PURGE_AFTER_MINUTES if older_than_minutes is None else older_than_minutes
+    size = batch_size or settings.PURGE_BATCH_SIZE
+    rate = settings.PURGE_ROWS_PER_SECOND if rows_per_second is None else rows_per_second
+    cutoff = datetime.now(timezone.utc) - timedelta(minutes=minutes)
+
+    total = 0
+    start = time.perf_counter()
+    while True:
+        batch_start = time.perf_counter()
+        removed = purge_batch(db, cutoff, size)
+        total += removed
+        if removed < size:
+            return PurgeStats(total, time.perf_counter() - start)
+        if rate:
+            # Spread batches out so the purge never competes with request traffic
+            pause = removed / rate - (time.perf_counter() - batch_start)
+            if pause > 0:
+                sleep(pause)
+
+def purge_tombstones(db: Session, older_than_days: Optional[int] = None, batch_size: Optional[int] = None) -> int:
+    """
+    Delete deletion markers older than TOMBSTONE_RETENTION_DAYS, the longest gap
+    between syncs a client can catch up on, in committed batches. Returns the
+    number removed.
+    """
+    days = settings.TOMBSTONE_RETENTION_DAYS if older_than_days is None else older_than_days
+    size = batch_size or settings.PURGE_BATCH_SIZE
+    cutoff = datetime.now(timezone.utc) - timedelta(days=days)
+
+    total = 0
+    while True:
+        batch = (
+            select(OrderTombstone.id)
+            .where(OrderTombstone.deleted_at < cutoff)
+            .limit(size)
+            .scalar_subquery()
+        )
+        result = db.execute(
+            delete(OrderTombstone).where(OrderTombstone.id.in_(batch)).execution_options(synchronize_session=False)
+        )
+        db.commit()
+        total += result.rowcount
+        if result.rowcount < size:
+            return total
+
+class PurgeScheduler(PeriodicWorker):
+    """
+    Background thread that purges deleted orders and expired tombstones every
+    `interval` seconds, in the worker holding `leader`.
+    """
+
+    name = "purge"
+
+    def run(self, db: Session) -> Optional[PurgeStats]:
+        if not self.is_leader():
+            return None
+        stats = purge_deleted_orders(db)
+        tombstones = purge_tombstones(db)
+        if stats.orders or tombstones:
+            print(
+                f"Purged {stats.orders} deleted orders in {stats.seconds:.1f}s "
+                f"({stats.rows_per_second:.0f} rows/sec) and {tombstones} expired tombstones"
+            )
+        return stats
@@ -0,0 +1,101 @@
+from typing import Dict, List, Sequence
+
+from sqlalchemy import delete, insert, inspect, select
+from sqlalchemy.orm import Session
+
+from app.models.order import Order
+from app.models.order_item import OrderItem
+from app.models.order_read_model import OrderReadModel
+from app.schemas.order import Order as OrderSchema, OrderSummary, SUMMARY_FIELDS
+
+# Columns copied from the order as they are
+_COPIED_COLUMNS = tuple(
+    column.key for column in inspect(OrderReadModel).column_attrs
+    if column.key in inspect(Order).column_attrs.keys()
+)
+
+def _row(order: Order, items: List[OrderItem]) -> Dict:
+    data = {column.key: getattr(order, column.key) for column in inspect(Order).column_attrs}
+    data["items"] = [
+        {column.key: getattr(item, column.key) for column in inspect(OrderItem).column_attrs}
+        for item in items
+    ]
+    full = OrderSchema.model_validate(data)
+    summary = OrderSummary.model_validate({field: data[field] for field in SUMMARY_FIELDS})
+
+    row = {name: data[name] for name in _COPIED_COLUMNS}
+    row["item_count"] = len(items)
+    row["items"] = [item.model_dump(mode="json") for item in full.items]
+    row["payload"] = full.model_dump_json()
+    row["summary_payload"] = summary.model_dump_json(exclude_unset=True)
+    # Not stored; tells the board which of two rows for an order is newer
+    row["updated_at"] = data["updated_at"]
+    return row
+
+def _build_rows(db: Session, order_ids: Sequence[int]) -> List[Dict]:
+    # Bulk UPDATEs bypass the identity map, so reload orders the session already holds
+    orders = (
+        db.query(Order).filter(Order.id.in_(order_ids), Order.live())
+        .order_by(Order.id).populate_existing().all()
+    )
+    items_by_order: Dict[int, List[OrderItem]] = {order.id: [] for order in orders}
+    if orders:
+        items = db.query(OrderItem).filter(OrderItem.order_id.in_(items_by_order)).order_by(OrderItem.id).all()
+        for item in items:
+            items_by_order[item.order_id].append(item)
+    return [_row(order, items_by_order[order.id]) for order in orders]
+
+def remove(db: Session, order_ids: Sequence[int]) -> None:
+    """Drop orders from the read model, in the caller's transaction."""
+    if order_ids:
+        db.execute(delete(OrderReadModel).where(OrderReadModel.id.in_(list(order_ids))))
+
+def refresh(db: Session, order_ids: Sequence[int]) -> List[Dict]:
+    """
+    Rewrite the read-model rows of these orders from `orders` and `order_items`,
+    in the caller's transaction so the rows commit (or roll back) with the write
+    that changed them. Orders that are gone or deleted are removed. Pending ORM
+    changes must be flushed first. Returns the rows written, each with the
+    order's `updated_at`.
+    """
+    order_ids = list(dict.fromkeys(order_ids))
+    if not order_ids:
+        return []
+    rows = _build_rows(db, order_ids)
+    remove(db, order_ids)
+    if rows:
+        db.execute(insert(OrderReadModel), [
+            {key: value for key, value in row.items() if key != "updated_at"} for row in rows
+        ])
+    return rows
+
+def rebuild(db: Session, batch_size: int = 1000) -> int:
+    """
+    Rewrite the whole read model from the live orders, committing one batch of
+    orders at a time, then drop rows of orders that no longer exist. Lists keep
+    being served from the existing rows while it runs. Returns the number of
+    orders written.
+    """
+    total = 0
+    last_id = 0
+    while True:
+        # Locking the batch waits out writers still inside their transaction, and
+        # keeps new ones from rewriting these rows until the batch commits
+        order_ids = db.execute(
+            select(Order.id).where(Order.id > last_id, Order.live())
+            .order_by(Order.id).limit(batch_size).with_for_update()
+        ).scalars().all()
+        if not order_ids:
+            break
+        refresh(db, order_ids)
+        db.commit()
+        # Keep the identity map from growing with every batch
+        db.expunge_all()
+        total += len(order_ids)
+        last_id = order_ids[-1]
+    
+    db.execute(delete(OrderReadModel).where(
+        OrderReadModel.id.not_in(select(Order.id).where(Order.live()))
+    ))
+    db.commit()
+    return total
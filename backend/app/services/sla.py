@@ -0,0 +1,279 @@
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Dict, List, NamedTuple, Optional
+import heapq
+import threading
+
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.database import as_utc
+from app.core.periodic import LeaderLock, PeriodicWorker
+from app.models.order import Order, OrderStatus
+
+orders = Order.__table__
+
+# Orders in these states have met (or no longer have) a delivery SLA
+CLOSED_STATUSES = (OrderStatus.DELIVERED, OrderStatus.CANCELLED)
+
+# Watermark before anything has been seen
+EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+AT_RISK = "at_risk"
+OVERDUE = "overdue"
+
+# Columns the monitor keeps per open order
+_COLUMNS = (
+    orders.c.id, orders.c.order_number, orders.c.shipper_id, orders.c.carrier_id,
+    orders.c.status, orders.c.delivery_deadline, orders.c.updated_at, orders.c.deleted_at,
+)
+
+class SlaEvent(NamedTuple):
+    kind: str
+    order_id: int
+    order_number: str
+    shipper_id: int
+    carrier_id: Optional[int]
+    status: OrderStatus
+    delivery_deadline: datetime
+
+class _Entry:
+    __slots__ = ("order_id", "order_number", "shipper_id", "carrier_id", "status", "deadline", "state", "version")
+
+    def __init__(self, row, version: int):
+        self.order_id = row.id
+        self.order_number = row.order_number
+        self.shipper_id = row.shipper_id
+        self.carrier_id = row.carrier_id
+        self.status = row.status
+        self.deadline = as_utc(row.delivery_deadline)
+        self.state: Optional[str] = None
+        self.version = version
+
+    def event(self, kind: str) -> SlaEvent:
+        return SlaEvent(
+            kind, self.order_id, self.order_number, self.shipper_id,
+            self.carrier_id, self.status, self.deadline,
+        )
+
+class SlaMonitor:
+    """
+    Deadline-ordered view of open orders.
+
+    Open orders are loaded once, then kept current from rows whose `updated_at`
+    moved past a watermark, so no check ever scans the whole `orders` table.
+    A heap of (alarm time, order id) entries says which order needs attention
+    next: first when it comes within `at_risk_window` of its deadline, then when
+    the deadline passes. Superseded heap entries are skipped lazily.
+    """
+
+    def __init__(self, at_risk_window: timedelta, overlap: timedelta = timedelta(seconds=5)):
+        self.at_risk_window = at_risk_window
+        # Re-read a little before the watermark so late commits with older timestamps aren't missed
+        self.overlap = overlap
+        self.watermark: Optional[datetime] = None
+        self._entries: Dict[int, _Entry] = {}
+        self._heap: List[tuple] = []
+        self._flagged: Dict[int, _Entry] = {}
+        self._listeners: List[Callable[[SlaEvent], None]] = []
+        self._version = 0
+        self._lock = threading.Lock()
+
+    @property
+    def loaded(self) -> bool:
+        return self.watermark is not None
+
+    def subscribe(self, listener: Callable[[SlaEvent], None]) -> None:
+        self._listeners.append(listener)
+
+    def reset(self) -> None:
+        """Forget every order, so `loaded` is False until the next `load`."""
+        with self._lock:
+            self._entries.clear()
+            self._heap.clear()
+            self._flagged.clear()
+            self.watermark = None
+
+    def load(self, db: Session) -> int:
+        """Load every open order. Returns the number tracked."""
+        watermark = db.execute(select(func.max(orders.c.updated_at))).scalar()
+        rows = db.execute(
+            select(*_COLUMNS).where(orders.c.status.notin_(CLOSED_STATUSES), orders.c.deleted_at.is_(None))
+        ).all()
+        with self._lock:
+            self._entries.clear()
+            self._heap.clear()
+            self._flagged.clear()
+            for row in rows:
+                self._upsert(row)
+            self.watermark = as_utc(watermark) if watermark is not None else EPOCH
+        return len(rows)
+
+    def refresh(self, db: Session) -> int:
+        """Apply orders changed since the watermark. Returns the number of rows read."""
+        since = max(EPOCH, self.watermark - self.overlap)
+        rows = db.execute(select(*_COLUMNS).where(orders.c.updated_at >= since)).all()
+
+        # Flagged orders are what /at-risk serves, so make sure none were deleted
+        flagged_ids = list(self._flagged)
+        existing = set()
+        if flagged_ids:
+            existing = set(db.execute(
+                select(orders.c.id).where(orders.c.id.in_(flagged_ids), orders.c.deleted_at.is_(None))
+            ).scalars())
+
+        with self._lock:
+            for row in rows:
+                self._upsert(row)
+                if row.updated_at is not None:
+                    self.watermark = max(self.watermark, as_utc(row.updated_at))
+            for order_id in flagged_ids:
+                if order_id not in existing:
+                    self._remove(order_id)
+        return len(rows)
+
+    def _upsert(self, row) -> None:
+        if row.status in CLOSED_STATUSES or row.deleted_at is not None:
+            self._remove(row.id)
+            return
+
+        current = self._entries.get(row.id)
+        deadline = as_utc(row.delivery_deadline)
+        if current is not None and current.deadline == deadline:
+            # Only the display fields changed; the alarm stays where it is
+            current.status, current.carrier_id = row.status, row.carrier_id
+            return
+
+        self._version += 1
+        entry = _Entry(row, self._version)
+        self._entries[row.id] = entry
+        self._flagged.pop(row.id, None)
+        heapq.heappush(self._heap, (entry.deadline - self.at_risk_window, row.id, entry.version))
+
+    def _remove(self, order_id: int) -> None:
+        self._entries.pop(order_id, None)
+        self._flagged.pop(order_id, None)
+
+    def advance(self, now: Optional[datetime] = None, notify: bool = True) -> List[SlaEvent]:
+        """
+        Pop every alarm that is due, flag the orders and, with `notify`, pass the
+        events to the listeners. Returns the events.
+        """
+        now = now or datetime.now(timezone.utc)
+        events = []
+        with self._lock:
+            while self._heap and self._heap[0][0] <= now:
+                _, order_id, version = heapq.heappop(self._heap)
+                entry = self._entries.get(order_id)
+                if entry is None or entry.version != version:
+                    continue
+                if entry.deadline <= now:
+                    entry.state = OVERDUE
+                else:
+                    entry.state = AT_RISK
+                    # Come back when the deadline itself passes
+                    heapq.heappush(self._heap, (entry.deadline, order_id, version))
+                self._flagged[order_id] = entry
+                events.append(entry.event(entry.state))
+
+        if notify:
+            for event in events:
+                for listener in self._listeners:
+                    listener(event)
+        return events
+
+    def at_risk(
+        self,
+        shipper_id: Optional[int] = None,
+        carrier_id: Optional[int] = None
+    ) -> List[SlaEvent]:
+        """Flagged orders of a shipper or carrier, most urgent first."""
+        with self._lock:
+            entries = [
+                entry for entry in self._flagged.values()
+                if (shipper_id is None or entry.shipper_id == shipper_id)
+                and (carrier_id is None or entry.carrier_id == carrier_id)
+            ]
+        entries.sort(key=lambda entry: entry.deadline)
+        return [entry.event(entry.state) for entry in entries]
+
+    def query_at_risk(
+        self,
+        db: Session,
+        shipper_id: Optional[int] = None,
+        carrier_id: Optional[int] = None,
+        now: Optional[datetime] = None
+    ) -> List[SlaEvent]:
+        """
+        What `at_risk` would return, read from the database instead of memory.
+        Used by workers that don't run the monitor themselves.
+        """
+        now = now or datetime.now(timezone.utc)
+        query = select(*_COLUMNS).where(
+            orders.c.status.notin_(CLOSED_STATUSES),
+            orders.c.deleted_at.is_(None),
+            orders.c.delivery_deadline <= now + self.at_risk_window,
+        )
+        if shipper_id is not None:
+            query = query.where(orders.c.shipper_id == shipper_id)
+        if carrier_id is not None:
+            query = query.where(orders.c.carrier_id == carrier_id)
+        rows = db.execute(query.order_by(orders.c.delivery_deadline, orders.c.id)).all()
+
+        events = []
+        for row in rows:
+            entry = _Entry(row, 0)
+            events.append(entry.event(OVERDUE if entry.deadline <= now else AT_RISK))
+        return events
+
+    def next_alarm(self) -> Optional[datetime]:
+        with self._lock:
+            return self._heap[0][0] if self._heap else None
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+def print_event(event: SlaEvent) -> None:
+    # Placeholder delivery: nothing but the log sees these until a real
+    # notifier (email, webhook) is subscribed in its place
+    label = "is overdue" if event.kind == OVERDUE else "is at risk of missing its deadline"
+    print(f"SLA: order {event.order_number} ({event.status}) {label} {event.delivery_deadline.isoformat()}")
+
+class SlaScheduler(PeriodicWorker):
+    """
+    Background thread that keeps the monitor loaded and fires its alarms.
+
+    Only the worker holding `leader` polls the database and notifies listeners,
+    so an event is raised once and the replica is read once however many
+    workers run. The others stay idle with an empty monitor, and their /at-risk
+    requests query the database instead.
+    """
+
+    name = "sla-monitor"
+
+    def __init__(self, monitor: SlaMonitor, session_factory, interval: float, leader: Optional[LeaderLock] = None):
+        super().__init__(session_factory, interval, leader=leader)
+        self.monitor = monitor
+
+    def run(self, db: Session) -> None:
+        if not self.is_leader():
+            # Drop what was tracked while leading, so /at-risk doesn't serve it stale
+            if self.monitor.loaded:
+                self.monitor.reset()
+            return
+        if not self.monitor.loaded:
+            self.monitor.load(db)
+        else:
+            self.monitor.refresh(db)
+        self.monitor.advance()
+
+    def wait_time(self) -> float:
+        # Wake early when the next alarm is due before the next refresh
+        next_alarm = self.monitor.next_alarm()
+        if next_alarm is None:
+            return self.interval
+        until_alarm = (next_alarm - datetime.now(timezone.utc)).total_seconds()
+        return max(0.05, min(self.interval, until_alarm))
+
+sla_monitor = SlaMonitor(at_risk_window=timedelta(minutes=settings.SLA_AT_RISK_MINUTES))
+sla_monitor.subscribe(print_event)
@@ -0,0 +1,87 @@
+from datetime import datetime, timedelta, timezone
+from typing import List, NamedTuple, Optional
+
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.database import as_utc
+from app.models.order import Order
+from app.models.order_tombstone import OrderTombstone
+
+class WatermarkExpired(Exception):
+    """The watermark is older than the tombstones kept; deletions since then are lost."""
+
+class ChangeSet(NamedTuple):
+    orders: List[Order]
+    deleted: List[int]
+    watermark: Optional[datetime]
+    has_more: bool
+
+def get_carrier_changes(
+    db: Session,
+    carrier_id: int,
+    since: Optional[datetime] = None,
+    limit: int = 500
+) -> ChangeSet:
+    """
+    Orders of a carrier created or updated after `since`, and ids of those deleted
+    after it, oldest change first. Without `since` every current order is returned.
+
+    Pages hold at most `limit` orders, except that orders sharing one `updated_at`
+    are never split across pages, so the returned watermark can be passed back as
+    `since` without missing or repeating changes. `has_more` says whether to ask
+    again straight away.
+
+    A write's `updated_at` is taken before it commits, so it can land behind a
+    watermark already handed out. Changes from the SYNC_OVERLAP_SECONDS before
+    `since` are therefore sent again, ahead of the page; clients apply them as
+    upserts and deletes, so a repeat is harmless.
+
+    Raises WatermarkExpired when `since` is older than TOMBSTONE_RETENTION_DAYS,
+    as deletions from before then may already be forgotten.
+    """
+    if since is not None:
+        retained_from = datetime.now(timezone.utc) - timedelta(days=settings.TOMBSTONE_RETENTION_DAYS)
+        if as_utc(since) < retained_from:
+            raise WatermarkExpired(f"Changes are only kept for {settings.TOMBSTONE_RETENTION_DAYS} days")
+
+    # Deleted orders reach clients through their tombstones
+    live = db.query(Order).filter(Order.carrier_id == carrier_id, Order.live())
+    query = live
+    overlap = []
+    if since is not None:
+        query = live.filter(Order.updated_at > since)
+        reread_from = since - timedelta(seconds=settings.SYNC_OVERLAP_SECONDS)
+        overlap = live.filter(
+            Order.updated_at > reread_from, Order.updated_at <= since
+        ).order_by(Order.updated_at, Order.id).all()
+    orders = query.order_by(Order.updated_at, Order.id).limit(limit + 1).all()
+
+    has_more = len(orders) > limit
+    if has_more:
+        orders = orders[:limit]
+        last = orders[-1].updated_at
+        earlier = [order for order in orders if order.updated_at < last]
+        if earlier:
+            orders = earlier
+        else:
+            # The whole page shares one timestamp; take every order that has it
+            orders = query.filter(Order.updated_at == last).order_by(Order.id).all()
+    watermark = orders[-1].updated_at if orders else since
+    orders = overlap + orders
+
+    deleted = []
+    if since is not None:
+        tombstones = db.query(OrderTombstone.order_id, OrderTombstone.deleted_at).filter(
+            OrderTombstone.carrier_id == carrier_id,
+            OrderTombstone.deleted_at > reread_from
+        )
+        if has_more:
+            # Later deletions are picked up with the later pages
+            tombstones = tombstones.filter(OrderTombstone.deleted_at <= watermark)
+        for order_id, deleted_at in tombstones.order_by(OrderTombstone.deleted_at).all():
+            deleted.append(order_id)
+            if not has_more and deleted_at > watermark:
+                watermark = deleted_at
+
+    return ChangeSet(orders=orders, deleted=deleted, watermark=watermark, has_more=has_more)
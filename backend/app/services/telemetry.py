@@ -0,0 +1,298 @@
+from array import array
+from datetime import date, datetime, timedelta, timezone
+from typing import Dict, Iterable, List, NamedTuple, Optional, Sequence, Set, Tuple
+import json
+import math
+import threading
+import time
+
+from sqlalchemy import insert, text
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from app.core import shm_cache
+from app.core.config import settings
+from app.core.periodic import PeriodicWorker
+from app.models.order import OrderStatus
+from app.models.order_position import OrderPosition
+from app.schemas.order import PositionFix
+from app.services import order as order_service
+
+positions = OrderPosition.__table__
+
+# Carriers report positions for orders in these states
+TRACKED_STATUSES = (OrderStatus.PICKED_UP, OrderStatus.IN_TRANSIT)
+
+class Fix(NamedTuple):
+    order_id: int
+    carrier_id: int
+    latitude: float
+    longitude: float
+    # Seconds since the epoch
+    recorded_at: float
+    speed_kmh: Optional[float] = None
+    heading: Optional[float] = None
+
+    def as_row(self) -> Dict:
+        return dict(self._asdict(), recorded_at=datetime.fromtimestamp(self.recorded_at, timezone.utc))
+
+    def as_position(self) -> Dict:
+        """The fix as the `position` of a tracked order."""
+        return {
+            "latitude": self.latitude,
+            "longitude": self.longitude,
+            "recorded_at": datetime.fromtimestamp(self.recorded_at, timezone.utc),
+            "speed_kmh": self.speed_kmh,
+            "heading": self.heading,
+        }
+
+class BufferFull(Exception):
+    """The history buffer can't take the batch until the next flush."""
+
+def _optional(value: float) -> Optional[float]:
+    return None if math.isnan(value) else value
+
+class PositionRing:
+    """
+    The last `capacity` fixes received by this worker, in preallocated parallel
+    arrays written round-robin, plus the slot of each order's latest fix.
+
+    Recording a fix and reading an order's latest position are both O(1), and
+    memory is fixed up front however many orders are moving. An order whose
+    latest fix has been overwritten by `capacity` newer ones drops out until it
+    reports again.
+    """
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self._order_ids = array("q", [0]) * capacity
+        self._carrier_ids = array("q", [0]) * capacity
+        # latitude, longitude, recorded_at, speed_kmh, heading; NaN for a missing value
+        self._values = [array("d", [math.nan]) * capacity for _ in range(5)]
+        self._next = 0
+        self._latest: Dict[int, int] = {}
+        self._lock = threading.Lock()
+
+    def record(self, fixes: Iterable[Fix]) -> None:
+        with self._lock:
+            for fix in fixes:
+                slot = self._latest.get(fix.order_id)
+                if slot is not None and self._values[2][slot] >= fix.recorded_at:
+                    # Late or repeated fix; the newer one stays the latest
+                    continue
+                slot = self._next
+                if self._latest.get(self._order_ids[slot]) == slot:
+                    del self._latest[self._order_ids[slot]]
+                self._order_ids[slot] = fix.order_id
+                self._carrier_ids[slot] = fix.carrier_id
+                values = (fix.latitude, fix.longitude, fix.recorded_at, fix.speed_kmh, fix.heading)
+                for column, value in zip(self._values, values):
+                    column[slot] = math.nan if value is None else value
+                self._latest[fix.order_id] = slot
+                self._next = (slot + 1) % self.capacity
+
+    def latest(self, order_id: int) -> Optional[Fix]:
+        with self._lock:
+            slot = self._latest.get(order_id)
+            if slot is None:
+                return None
+            latitude, longitude, recorded_at, speed_kmh, heading = (column[slot] for column in self._values)
+            return Fix(
+                order_id, self._carrier_ids[slot], latitude, longitude, recorded_at,
+                _optional(speed_kmh), _optional(heading),
+            )
+
+    def reset(self) -> None:
+        with self._lock:
+            self._latest.clear()
+            self._next = 0
+
+    def __len__(self) -> int:
+        return len(self._latest)
+
+# Latest fixes are also published to the shared cache, so a tracking read on
+# any worker of the host sees the position whichever worker took the ping.
+
+def _position_key(order_id: int) -> str:
+    return f"order-position:{order_id}"
+
+def publish(fixes: Iterable[Fix]) -> None:
+    """Share the newest of `fixes` for each order, one cache write per order."""
+    cache = shm_cache.get_cache()
+    if cache is None:
+        return
+    newest: Dict[int, Fix] = {}
+    for fix in fixes:
+        if fix.order_id not in newest or fix.recorded_at > newest[fix.order_id].recorded_at:
+            newest[fix.order_id] = fix
+    for fix in newest.values():
+        cache.set(_position_key(fix.order_id), json.dumps(fix).encode(), settings.TELEMETRY_POSITION_TTL_SECONDS)
+
+def latest_position(order_id: int) -> Optional[Fix]:
+    """The order's newest fix known to this worker or the shared cache; no database query."""
+    fix = position_ring.latest(order_id)
+    cache = shm_cache.get_cache()
+    value = cache.lookup(_position_key(order_id)) if cache is not None else None
+    if value is not None:
+        shared = Fix(*json.loads(value))
+        if fix is None or shared.recorded_at > fix.recorded_at:
+            fix = shared
+    return fix
+
+def partition_name(day: date) -> str:
+    return f"order_positions_{day:%Y%m%d}"
+
+def ensure_partitions(db: Session, days: Iterable[date]) -> None:
+    """Create the daily partitions of order_positions for `days`. PostgreSQL only."""
+    if db.get_bind().dialect.name != "postgresql":
+        return
+    # Workers creating the same day's partition would otherwise race
+    db.execute(text("SELECT pg_advisory_xact_lock(hashtext('order_positions_partitions'))"))
+    for day in sorted(days):
+        db.execute(text(
+            f"CREATE TABLE IF NOT EXISTS {partition_name(day)} PARTITION OF order_positions "
+            f"FOR VALUES FROM ('{day} 00:00:00+00') TO ('{day + timedelta(days=1)} 00:00:00+00')"
+        ))
+
+def _insert(db: Session):
+    # Resent fixes hit the (order_id, recorded_at) key and are skipped
+    dialect = db.get_bind().dialect.name
+    if dialect == "postgresql":
+        return postgresql.insert(positions).on_conflict_do_nothing()
+    if dialect == "sqlite":
+        return sqlite.insert(positions).on_conflict_do_nothing()
+    return insert(positions)
+
+class PositionWriter:
+    """
+    Buffers fixes in memory and writes them to the history table in bulk, one
+    multi-row INSERT per flush instead of one per request.
+    """
+
+    def __init__(self, flush_size: int, max_buffered: int):
+        self.flush_size = flush_size
+        self.max_buffered = max_buffered
+        # Set when the buffer reaches flush_size, to flush before the interval is up
+        self.wake = threading.Event()
+        self._buffer: List[Fix] = []
+        # Fixes lost to failed writes
+        self.dropped = 0
+        self._partitions: Set[date] = set()
+        self._lock = threading.Lock()
+
+    def add(self, fixes: Sequence[Fix]) -> None:
+        """Queue fixes for the next flush. Raises BufferFull when there is no room for all of them."""
+        with self._lock:
+            if len(self._buffer) + len(fixes) > self.max_buffered:
+                raise BufferFull(f"{len(self._buffer)} position fixes are waiting to be written")
+            self._buffer.extend(fixes)
+            if len(self._buffer) >= self.flush_size:
+                self.wake.set()
+
+    def flush(self, db: Session) -> int:
+        """
+        Write every buffered fix. Returns the number written. If the write
+        fails the fixes are dropped and counted in `dropped`, so a batch the
+        database keeps refusing can't fill the buffer and block ingestion.
+        """
+        with self._lock:
+            fixes, self._buffer = self._buffer, []
+        if not fixes:
+            return 0
+        days = {datetime.fromtimestamp(fix.recorded_at, timezone.utc).date() for fix in fixes}
+        try:
+            ensure_partitions(db, days - self._partitions)
+            db.execute(_insert(db), [fix.as_row() for fix in fixes])
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            self.dropped += len(fixes)
+            print(f"Dropped {len(fixes)} position fixes that could not be written: {e}")
+            return 0
+        self._partitions |= days
+        return len(fixes)
+
+    def reset(self) -> None:
+        with self._lock:
+            self._buffer = []
+            self.dropped = 0
+            self._partitions = set()
+        self.wake.clear()
+
+    def __len__(self) -> int:
+        return len(self._buffer)
+
+def ingest(db: Session, carrier_id: int, points: Sequence[PositionFix]) -> Tuple[int, List[Tuple[int, str, str]]]:
+    """
+    Take a carrier's batch of fixes: those for orders it is moving go to the
+    ring, the shared cache and the history buffer; the rest are rejected per
+    order as (order id, error, detail). Fixes recorded more than
+    TELEMETRY_MAX_CLOCK_SKEW_SECONDS ahead of server time or
+    TELEMETRY_MAX_AGE_SECONDS behind it are left out and their order rejected.
+    Order lookups go through the shared order cache. Returns (accepted,
+    rejections). Raises BufferFull.
+    """
+    rejections = []
+    allowed = {}
+    for order_id in dict.fromkeys(point.order_id for point in points):
+        access = order_service.get_access(db, order_id)
+        if access is None:
+            rejections.append((order_id, "not_found", f"Order with ID {order_id} not found"))
+        elif access.carrier_id != carrier_id:
+            rejections.append((order_id, "forbidden", "Not enough permissions to report positions for this order"))
+        elif access.status not in TRACKED_STATUSES:
+            rejections.append((order_id, "invalid_status", f"Positions can't be reported for {access.status} orders"))
+        else:
+            allowed[order_id] = True
+
+    now = time.time()
+    earliest = now - settings.TELEMETRY_MAX_AGE_SECONDS
+    latest = now + settings.TELEMETRY_MAX_CLOCK_SKEW_SECONDS
+    fixes = []
+    mistimed = {}
+    for point in points:
+        if point.order_id not in allowed:
+            continue
+        recorded_at = point.recorded_at.timestamp()
+        if not earliest <= recorded_at <= latest:
+            mistimed[point.order_id] = True
+            continue
+        fixes.append(Fix(
+            point.order_id, carrier_id, point.latitude, point.longitude,
+            recorded_at, point.speed_kmh, point.heading
+        ))
+    for order_id in mistimed:
+        rejections.append((
+            order_id, "invalid_recorded_at",
+            f"recorded_at must be within {settings.TELEMETRY_MAX_AGE_SECONDS}s before and "
+            f"{settings.TELEMETRY_MAX_CLOCK_SKEW_SECONDS}s after server time"
+        ))
+    position_writer.add(fixes)
+    position_ring.record(fixes)
+    publish(fixes)
+    return len(fixes), rejections
+
+class PositionFlusher(PeriodicWorker):
+    """Background thread that flushes the history buffer every `interval` seconds, or sooner when it fills up."""
+
+    name = "position-flusher"
+
+    def __init__(self, writer: PositionWriter, session_factory, interval: float):
+        super().__init__(session_factory, interval, wake=writer.wake)
+        self.writer = writer
+
+    def run(self, db: Session) -> int:
+        return self.writer.flush(db)
+
+    def stop(self) -> None:
+        """Stop the thread and write what is still buffered."""
+        super().stop()
+        if self._thread is not None:
+            self._thread.join(timeout=self.interval + 5)
+        try:
+            self.tick()
+        except Exception as e:
+            print(f"{self.name} failed: {e}")
+
+position_ring = PositionRing(settings.TELEMETRY_RING_SIZE)
+position_writer = PositionWriter(settings.TELEMETRY_FLUSH_SIZE, settings.TELEMETRY_MAX_BUFFERED)
@@ -1,6 +1,7 @@
 from typing import Optional
 from sqlalchemy.orm import Session
 
+from app.core.auth import forget_user
 from app.core.security import get_password_hash, verify_password
 from app.models.user import User
 from app.schemas.user import UserCreate, UserUpdate
@@ -41,6 +42,7 @@ def update(db: Session, db_obj: User, obj_in: UserUpdate) -> User:
         setattr(db_obj, field, value)
     db.add(db_obj)
     db.commit()
+    forget_user(db_obj.id)
     db.refresh(db_obj)
     return db_obj
 
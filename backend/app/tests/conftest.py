@@ -0,0 +1,148 @@
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi import Request
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+import app.models  # noqa: F401 - register every table on Base.metadata
+from app.main import app
+from app.core import page_cache, rate_limit, shm_cache
+from app.core.config import settings
+from app.core.database import Base, get_db, get_read_db, recent_writers, request_session
+from app.core.load_shedding import pool_wait
+from app.core.security import create_access_token, get_password_hash
+from app.models.user import User
+from app.services.board import order_board
+from app.services.sla import sla_monitor
+from app.services.telemetry import position_ring, position_writer
+
+engine = create_engine(
+    "sqlite:///:memory:",
+    connect_args={"check_same_thread": False},
+    poolclass=StaticPool,
+)
+@event.listens_for(engine, "connect")
+def enable_foreign_keys(dbapi_connection, connection_record):
+    # SQLite only enforces ON DELETE CASCADE with foreign keys switched on
+    dbapi_connection.execute("PRAGMA foreign_keys=ON")
+
+TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+def override_get_db(request: Request):
+    db = request_session(TestingSessionLocal, request)
+    try:
+        yield db
+    finally:
+        db.close()
+
+@pytest.fixture
+def db():
+    Base.metadata.create_all(bind=engine)
+    session = TestingSessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
+        Base.metadata.drop_all(bind=engine)
+
+@pytest.fixture
+def client(db):
+    previous = dict(app.dependency_overrides)
+    app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_read_db] = override_get_db
+    recent_writers.clear()
+    rate_limit.get_store().reset()
+    page_cache.get_store().reset()
+    # Database ids restart with every test, so cached users and orders must not leak
+    shm_cache.set_cache(shm_cache.LocalCache())
+    # Not loaded unless a test loads it, so lists and /at-risk come from the database
+    order_board.reset()
+    sla_monitor.reset()
+    position_ring.reset()
+    position_writer.reset()
+    pool_wait.reset()
+    # Not used as a context manager, so startup hooks don't probe the real database
+    yield TestClient(app)
+    app.dependency_overrides.clear()
+    app.dependency_overrides.update(previous)
+
+def _create_user(db, username: str, account_type: str) -> User:
+    user = User(
+        name=username.title(),
+        email=f"{username}@example.com",
+        username=username,
+        hashed_password=get_password_hash("password123"),
+        account_type=account_type,
+        is_active=True,
+    )
+    db.add(user)
+    db.commit()
+    db.refresh(user)
+    return user
+
+@pytest.fixture
+def read_model_enabled(monkeypatch):
+    # Off by default until rebuild_read_model.py has filled the table
+    monkeypatch.setattr(settings, "READ_MODEL_ENABLED", True)
+
+@pytest.fixture
+def shipper(db):
+    return _create_user(db, "shipper", "shipper")
+
+@pytest.fixture
+def carrier(db):
+    return _create_user(db, "carrier", "carrier")
+
+@pytest.fixture
+def shipper_headers(shipper):
+    return {"Authorization": f"Bearer {create_access_token(shipper.id)}"}
+
+@pytest.fixture
+def carrier_headers(carrier):
+    return {"Authorization": f"Bearer {create_access_token(carrier.id)}"}
+
+def order_payload(**overrides):
+    pickup_date = datetime(2026, 1, 5, 9, 0)
+    payload = {
+        "customer_name": "Test Customer",
+        "customer_email": "customer@example.com",
+        "customer_phone": "555-0100",
+        "pickup_location": "Warehouse A",
+        "delivery_location": "123 Test St",
+        "pickup_date": pickup_date.isoformat(),
+        "delivery_deadline": (pickup_date + timedelta(days=2)).isoformat(),
+        "package_description": "Books",
+        "weight": 2.5,
+        "total_amount": 99.99,
+        "items": [
+            {
+                "product_name": "Test Product",
+                "product_sku": "TEST-001",
+                "quantity": 1,
+                "unit_price": 99.99
+            }
+        ]
+    }
+    payload.update(overrides)
+    return payload
+
+def create_order(client, headers, **overrides):
+    """Create an order through the API and return it as the API does."""
+    response = client.post("/api/v1/orders/", headers=headers, json=order_payload(**overrides))
+    assert response.status_code == 201, response.text
+    return response.json()
+
+def create_orders(client, headers, count, **overrides):
+    return [create_order(client, headers, **overrides) for _ in range(count)]
+
+def create_accepted_orders(client, shipper_headers, carrier_headers, count):
+    """Create `count` orders and have the carrier accept them; returns their ids."""
+    order_ids = []
+    for order in create_orders(client, shipper_headers, count):
+        response = client.post(f"/api/v1/orders/{order['id']}/accept", headers=carrier_headers)
+        assert response.status_code == 200, response.text
+        order_ids.append(order["id"])
+    return order_ids
@@ -0,0 +1,43 @@
+from datetime import timedelta
+
+from app.models.archive import ArchivedOrder, ArchivedOrderItem
+from app.models.order import Order, OrderStatus
+from app.models.order_item import OrderItem
+from app.services import archive as archive_service
+from app.services.idempotency import utcnow
+from app.tests.conftest import create_order
+
+def age_order(db, order_id, status, days):
+    order = db.query(Order).get(order_id)
+    order.status = status
+    order.tracking_number = f"TRK-{order_id}"
+    order.created_at = utcnow() - timedelta(days=days)
+    db.commit()
+
+def test_archives_only_old_terminal_orders(client, db, shipper_headers):
+    old_delivered = create_order(client, shipper_headers)["id"]
+    old_pending = create_order(client, shipper_headers)["id"]
+    new_cancelled = create_order(client, shipper_headers)["id"]
+    age_order(db, old_delivered, OrderStatus.DELIVERED, days=120)
+    age_order(db, old_pending, OrderStatus.PENDING, days=120)
+    age_order(db, new_cancelled, OrderStatus.CANCELLED, days=5)
+
+    assert archive_service.archive_terminal_orders(db, older_than_days=90, batch_size=1) == 1
+
+    assert {o.id for o in db.query(Order).all()} == {old_pending, new_cancelled}
+    assert [o.id for o in db.query(ArchivedOrder).all()] == [old_delivered]
+    assert db.query(ArchivedOrderItem).count() == 1
+    assert db.query(OrderItem).filter(OrderItem.order_id == old_delivered).count() == 0
+
+def test_archived_orders_are_found_by_id_and_tracking_number(client, db, shipper_headers):
+    order_id = create_order(client, shipper_headers)["id"]
+    age_order(db, order_id, OrderStatus.DELIVERED, days=120)
+    archive_service.archive_terminal_orders(db, older_than_days=90)
+
+    by_id = client.get(f"/api/v1/orders/{order_id}", headers=shipper_headers)
+    by_tracking = client.get(f"/api/v1/orders/track/TRK-{order_id}", headers=shipper_headers)
+
+    assert by_id.status_code == 200
+    assert by_id.json()["status"] == "DELIVERED"
+    assert len(by_id.json()["items"]) == 1
+    assert by_tracking.json()["id"] == order_id
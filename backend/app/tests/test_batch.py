@@ -0,0 +1,56 @@
+from app.tests.conftest import order_payload
+from app.tests.test_permissions import captured_statements
+
+def test_batch_runs_sub_requests_in_order(client, shipper_headers, carrier_headers):
+    client.post("/api/v1/orders/", headers=shipper_headers, json=order_payload())
+
+    response = client.post("/api/v1/batch", headers=carrier_headers, json={"requests": [
+        {"id": "me", "path": "/users/me"},
+        {"id": "mine", "path": "/orders/my-deliveries"},
+        {"id": "board", "path": "/orders/available?fields=summary&page_size=5"},
+    ]})
+
+    assert response.status_code == 200
+    responses = response.json()["responses"]
+    assert [r["id"] for r in responses] == ["me", "mine", "board"]
+    assert [r["status"] for r in responses] == [200, 200, 200]
+    assert responses[0]["body"]["username"] == "carrier"
+    assert responses[1]["body"]["total"] == 0
+    assert responses[2]["body"]["total"] == 1
+    assert responses[2]["body"]["page_size"] == 5
+
+def test_batch_loads_the_user_once(client, carrier_headers):
+    with captured_statements() as statements:
+        client.post("/api/v1/batch", headers=carrier_headers, json={"requests": [
+            {"path": "/users/me"}, {"path": "/orders/my-deliveries"}, {"path": "/orders/available"},
+        ]})
+
+    assert len([s for s in statements if "FROM users" in s]) == 1
+
+def test_sub_request_errors_do_not_fail_the_batch(client, shipper_headers):
+    response = client.post("/api/v1/batch", headers=shipper_headers, json={"requests": [
+        {"path": "/orders/available"},
+        {"path": "/orders/my-shipments?sort=secret"},
+        {"path": "/orders/999999"},
+        {"path": "/nowhere"},
+        {"path": "/orders/not-a-number"},
+        {"path": "/users/me"},
+    ]})
+
+    assert response.status_code == 200
+    statuses = [r["status"] for r in response.json()["responses"]]
+    assert statuses == [403, 400, 404, 404, 422, 200]
+
+def test_batch_rejects_writes_and_requires_auth(client, shipper_headers):
+    response = client.post("/api/v1/batch", headers=shipper_headers, json={"requests": [
+        {"method": "POST", "path": "/orders/"},
+    ]})
+    assert response.status_code == 422
+
+    response = client.post("/api/v1/batch", headers=shipper_headers, json={"requests": [
+        {"path": "/batch"},
+    ]})
+    assert response.json()["responses"][0]["status"] == 405
+
+    response = client.post("/api/v1/batch", json={"requests": [{"path": "/users/me"}]})
+    assert response.status_code == 401
@@ -0,0 +1,81 @@
+from datetime import timedelta
+
+import pytest
+
+from app.models.order import Order
+from app.services import order as order_service
+from app.services import read_model
+from app.services.board import OrderBoard, _SortIndex, order_board
+from app.tests.conftest import create_order
+from app.tests.test_permissions import captured_statements
+
+pytestmark = pytest.mark.usefixtures("read_model_enabled")
+
+AVAILABLE = "/api/v1/orders/available"
+
+def test_sort_index_pages_match_database_order():
+    index = _SortIndex([(2.0, 5), (1.0, 9), (2.0, 3)])
+    index.insert(1.0, 4)
+    assert index.page(0, 10, descending=False) == [4, 9, 3, 5]
+    assert index.page(1, 2, descending=True) == [3, 9]
+    assert index.page(4, 2, descending=True) == []
+
+    index.remove(2.0, 3)
+    index.remove(2.0, 7)
+    assert index.page(0, 10, descending=False) == [4, 9, 5]
+
+@pytest.mark.parametrize("query", ["", "?sort=weight&page_size=2&page=2", "?sort=-weight", "?fields=summary,items"])
+def test_board_pages_match_the_database(client, db, shipper_headers, carrier_headers, query):
+    orders = [create_order(client, shipper_headers, weight=weight) for weight in [5.0, 2.5, 5.0, 9.0, 1.0]]
+    client.post(f"/api/v1/orders/{orders[0]['id']}/accept", headers=carrier_headers)
+
+    from_database = client.get(AVAILABLE + query, headers=carrier_headers).json()
+    assert order_board.load(db) == 4
+    with captured_statements() as statements:
+        from_board = client.get(AVAILABLE + query, headers=carrier_headers).json()
+    assert from_board == from_database
+    assert not any("order_read_model" in statement or "FROM orders" in statement for statement in statements)
+
+def test_create_and_accept_update_the_board(client, db, shipper_headers, carrier_headers):
+    order_board.load(db)
+    first, second = create_order(client, shipper_headers, weight=1.0), create_order(client, shipper_headers, weight=2.0)
+    assert [order["id"] for order in client.get(AVAILABLE, headers=carrier_headers).json()["items"]] == [
+        second["id"], first["id"]
+    ]
+
+    client.post(f"/api/v1/orders/{first['id']}/accept", headers=carrier_headers)
+    order_service.delete(db, second["id"])
+    page = client.get(AVAILABLE, headers=carrier_headers).json()
+    assert page["total"] == 0 and page["items"] == []
+
+def test_refresh_keeps_this_workers_newer_writes(client, db, shipper_headers):
+    board = OrderBoard(overlap=timedelta(seconds=5))
+    order = create_order(client, shipper_headers)
+    assert board.load(db) == 1
+
+    # This worker assigned the order; the database below still has it open, like a lagging replica
+    [row] = read_model.refresh(db, [order["id"]])
+    db.rollback()
+    board.upsert([dict(row, is_assigned=True, updated_at=row["updated_at"] + timedelta(minutes=1))])
+    assert len(board) == 0
+
+    assert board.refresh(db) == 1
+    assert len(board) == 0
+
+def test_refresh_and_reload_reconcile_other_workers_writes(client, db, shipper_headers):
+    board = OrderBoard(overlap=timedelta(seconds=5))
+    first, second = create_order(client, shipper_headers, weight=1.0), create_order(client, shipper_headers, weight=2.0)
+    assert board.load(db) == 2
+
+    # Another worker takes the first order and creates a third one
+    db.query(Order).filter(Order.id == first["id"]).update({"is_assigned": True})
+    read_model.refresh(db, [first["id"]])
+    db.commit()
+    third = create_order(client, shipper_headers, weight=3.0)
+    assert board.refresh(db) >= 2
+    assert [entry.id for entry in board.page(0, 10, "weight", False).items] == [second["id"], third["id"]]
+
+    # Hard deletes are only caught by a full reload
+    db.query(Order).filter(Order.id == second["id"]).delete()
+    db.commit()
+    assert board.load(db) == 1
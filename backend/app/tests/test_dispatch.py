@@ -0,0 +1,102 @@
+import pytest
+
+from app.models.order import Order, OrderStatus
+from app.models.order_read_model import OrderReadModel
+from app.services import dispatch, order_state
+from app.services.board import order_board
+from app.services.dispatch import DispatchEngine, DispatchProblem, DispatchScheduler
+from app.tests.conftest import TestingSessionLocal, _create_user, create_orders
+
+SOLVERS = ["exact", "greedy", "python"]
+
+@pytest.fixture(params=SOLVERS)
+def solver(request, monkeypatch):
+    dispatch._import_numeric()
+    if request.param != "exact":
+        monkeypatch.setattr(dispatch, "EXACT_MAX_CELLS", 0)
+    if request.param == "python":
+        monkeypatch.setattr(dispatch, "np", None)
+    return request.param
+
+def _problem(pickups, hours_left, positions, loads, capacity):
+    return DispatchProblem(
+        order_ids=[100 + n for n in range(len(pickups))],
+        pickups=pickups,
+        hours_left=hours_left,
+        trip_km=[0.0] * len(pickups),
+        carrier_ids=[n + 1 for n in range(len(positions))],
+        positions=positions,
+        loads=loads,
+        capacity=capacity,
+    )
+
+def test_orders_go_to_the_nearest_carrier_with_room(solver):
+    problem = _problem(
+        pickups=[(0.0, 0.0), (1.0, 0.0), (90.0, 90.0)],
+        hours_left=[100.0] * 3,
+        positions=[(0.0, 1.0), (90.0, 91.0), None],
+        loads=[0, 0, 0],
+        capacity=1,
+    )
+    matches = dispatch.solve(problem)
+    assert matches[102] == 2
+    assert sorted(matches) == [100, 101, 102]
+    assert sorted(matches.values()) == [1, 2, 3]
+
+def test_urgent_orders_win_when_carriers_run_short(solver):
+    problem = _problem(
+        pickups=[(10.0, 10.0), (10.0, 10.0)],
+        hours_left=[40.0, 2.0],
+        positions=[(10.0, 10.0), (50.0, 50.0)],
+        loads=[1, 2],
+        capacity=2,
+    )
+    assert dispatch.solve(problem) == {101: 1}
+
+def test_assign_skips_orders_taken_in_the_meantime(client, db, shipper_headers, carrier, carrier_headers):
+    first, second = create_orders(client, shipper_headers, 2)
+    client.post(f"/api/v1/orders/{first['id']}/accept", headers=carrier_headers)
+    other = _create_user(db, "other", "carrier")
+
+    rows = order_state.assign(db, {first["id"]: other.id, second["id"]: other.id})
+    assert [(row.id, row.carrier_id, row.status) for row in rows] == [
+        (second["id"], other.id, OrderStatus.ACCEPTED)
+    ]
+    assert rows[0].tracking_number.startswith("TRK-")
+
+    # The losing side of a race gets a 400, not a second assignment
+    response = client.post(f"/api/v1/orders/{second['id']}/accept", headers=carrier_headers)
+    assert response.status_code == 400
+    assert db.get(Order, second["id"]).carrier_id == other.id
+
+def test_engine_assigns_open_orders_up_to_capacity(client, db, shipper_headers, carrier, carrier_headers):
+    orders = create_orders(client, shipper_headers, 4)
+    client.post(f"/api/v1/orders/{orders[0]['id']}/accept", headers=carrier_headers)
+    idle = _create_user(db, "idle", "carrier")
+    order_board.load(db)
+
+    run = DispatchEngine(batch_size=100, capacity=2).run(db)
+    assert (run.orders, run.carriers, run.proposed, run.assigned) == (3, 2, 3, 3)
+
+    db.expire_all()
+    carriers = {order.id: order.carrier_id for order in db.query(Order).all()}
+    assert sorted(carriers.values()) == sorted([carrier.id, carrier.id, idle.id, idle.id])
+    assert all(row.is_assigned and row.status == "ACCEPTED" for row in db.query(OrderReadModel).all())
+    assert len(order_board) == 0
+
+    # Every carrier is now full
+    assert DispatchEngine(batch_size=100, capacity=2).run(db).carriers == 0
+
+class _Follower:
+    def acquire(self) -> bool:
+        return False
+
+    def release(self) -> None:
+        pass
+
+def test_scheduler_only_dispatches_in_the_leader(client, db, shipper_headers, carrier):
+    create_orders(client, shipper_headers, 2)
+    scheduler = DispatchScheduler(DispatchEngine(batch_size=100, capacity=2), TestingSessionLocal, 60, leader=_Follower())
+
+    assert scheduler.tick() is None
+    assert db.query(Order).filter(Order.carrier_id.isnot(None)).count() == 0
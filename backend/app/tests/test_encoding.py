@@ -0,0 +1,63 @@
+import gzip
+
+import brotli
+import msgpack
+import pytest
+from starlette.requests import Request
+
+from app.core.compression import choose_encoding
+from app.core.encoding import accepts_msgpack
+from app.tests.conftest import create_orders
+
+def test_choose_encoding_prefers_brotli_and_respects_q_values():
+    assert choose_encoding("gzip, deflate, br") == "br"
+    assert choose_encoding("gzip, br;q=0") == "gzip"
+    assert choose_encoding("br", brotli_enabled=False) is None
+    assert choose_encoding("identity") is None
+
+def test_choose_encoding_follows_the_clients_relative_q_values():
+    assert choose_encoding("br;q=0.5, gzip;q=0.8") == "gzip"
+    assert choose_encoding("gzip;q=0.5, *;q=0.9") == "br"
+    # Equal ratings fall back to the server's preference
+    assert choose_encoding("gzip;q=0.7, br;q=0.7") == "br"
+    assert choose_encoding("gzip, br;q=0.5", available=["br", "gzip"]) == "gzip"
+    assert choose_encoding("gzip;q=abc, br;q=0") is None
+
+def test_large_list_pages_are_compressed(client, shipper_headers):
+    create_orders(client, shipper_headers, 5)
+
+    for encoding, decompress in (("gzip", gzip.decompress), ("br", brotli.decompress)):
+        response = client.get(
+            "/api/v1/orders/my-shipments",
+            headers={**shipper_headers, "Accept-Encoding": encoding},
+        )
+        assert response.headers["Content-Encoding"] == encoding
+        assert response.json()["total"] == 5
+
+def test_small_responses_are_not_compressed(client):
+    response = client.get("/health", headers={"Accept-Encoding": "gzip"})
+    assert "Content-Encoding" not in response.headers
+
+def test_list_pages_can_be_negotiated_as_msgpack(client, shipper_headers):
+    create_orders(client, shipper_headers, 2)
+
+    response = client.get(
+        "/api/v1/orders/my-shipments",
+        headers={**shipper_headers, "Accept": "application/msgpack"},
+    )
+    assert response.headers["Content-Type"] == "application/msgpack"
+    page = msgpack.unpackb(response.content)
+    assert page["total"] == 2
+    assert len(page["items"][0]["items"]) == 1
+
+@pytest.mark.parametrize("accept, expected", [
+    ("application/msgpack", True),
+    ("application/json, application/x-msgpack", True),
+    ("application/msgpack;q=0", False),
+    ("application/json, application/msgpack;q=0.5", False),
+    ("application/msgpack;q=0.9, */*;q=0.1", True),
+    ("*/*", False),
+])
+def test_msgpack_negotiation_respects_q_values(accept, expected):
+    request = Request({"type": "http", "headers": [(b"accept", accept.encode())]})
+    assert accepts_msgpack(request) is expected
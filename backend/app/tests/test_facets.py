@@ -0,0 +1,58 @@
+from datetime import datetime, timezone
+
+from app.models.order import Order
+from app.services import read_model
+from app.tests.conftest import create_orders
+from app.tests.test_permissions import captured_statements
+
+def _cancel(client, headers, order):
+    response = client.patch(f"/api/v1/orders/{order['id']}/status", headers=headers, json={"status": "CANCELLED"})
+    assert response.status_code == 200
+
+def test_status_counts_ignore_the_status_filter(client, shipper_headers):
+    orders = create_orders(client, shipper_headers, 3)
+    _cancel(client, shipper_headers, orders[0])
+
+    page = client.get("/api/v1/orders/my-shipments?status=cancelled", headers=shipper_headers).json()
+    assert page["total"] == 1
+    assert [order["id"] for order in page["items"]] == [orders[0]["id"]]
+    assert page["status_counts"]["PENDING"] == 2
+    assert page["status_counts"]["CANCELLED"] == 1
+    assert page["status_counts"]["DELIVERED"] == 0
+
+def test_multi_status_filter_accepts_repeated_and_comma_separated_values(client, shipper_headers):
+    orders = create_orders(client, shipper_headers, 3)
+    _cancel(client, shipper_headers, orders[0])
+
+    for query in ("status=PENDING,CANCELLED", "status=PENDING&status=CANCELLED"):
+        page = client.get(f"/api/v1/orders/my-shipments?{query}", headers=shipper_headers).json()
+        assert page["total"] == 3
+
+    response = client.get("/api/v1/orders/my-shipments?status=PENDING,LOST", headers=shipper_headers)
+    assert response.status_code == 400
+
+def test_date_range_filters_page_and_counts(client, db, shipper_headers):
+    orders = create_orders(client, shipper_headers, 2)
+    db.query(Order).filter(Order.id == orders[0]["id"]).update(
+        {Order.created_at: datetime(2026, 1, 1, tzinfo=timezone.utc)}
+    )
+    read_model.refresh(db, [orders[0]["id"]])
+    db.commit()
+
+    page = client.get(
+        "/api/v1/orders/my-shipments?date_to=2026-01-31T00:00:00Z", headers=shipper_headers
+    ).json()
+    assert page["total"] == 1
+    assert page["items"][0]["id"] == orders[0]["id"]
+    assert page["status_counts"]["PENDING"] == 1
+
+def test_facets_replace_the_count_query(client, shipper_headers, read_model_enabled):
+    create_orders(client, shipper_headers, 2)
+
+    with captured_statements() as statements:
+        response = client.get("/api/v1/orders/my-shipments?fields=summary", headers=shipper_headers)
+
+    assert response.json()["status_counts"]["PENDING"] == 2
+    order_queries = [s for s in statements if "FROM order_read_model" in s]
+    assert len(order_queries) == 2
+    assert any("GROUP BY order_read_model.status" in s for s in order_queries)
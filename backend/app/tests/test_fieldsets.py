@@ -0,0 +1,30 @@
+from app.schemas.order import SUMMARY_FIELDS
+from app.tests.conftest import order_payload
+
+def test_summary_fieldset_returns_only_summary_fields(client, shipper_headers):
+    client.post("/api/v1/orders/", headers=shipper_headers, json=order_payload())
+
+    response = client.get("/api/v1/orders/my-shipments?fields=summary", headers=shipper_headers)
+    assert response.status_code == 200
+    page = response.json()
+    assert page["total"] == 1
+    assert set(page["items"][0]) == set(SUMMARY_FIELDS)
+
+def test_items_are_loaded_only_when_requested(client, shipper_headers):
+    client.post("/api/v1/orders/", headers=shipper_headers, json=order_payload())
+
+    response = client.get("/api/v1/orders/my-shipments?fields=status,items", headers=shipper_headers)
+    order = response.json()["items"][0]
+    assert set(order) == {"id", "status", "items"}
+    assert order["items"][0]["product_sku"] == "TEST-001"
+
+def test_unknown_field_is_rejected(client, shipper_headers):
+    response = client.get("/api/v1/orders/my-shipments?fields=secret", headers=shipper_headers)
+    assert response.status_code == 400
+
+def test_full_orders_are_returned_without_fields(client, shipper_headers):
+    client.post("/api/v1/orders/", headers=shipper_headers, json=order_payload())
+
+    order = client.get("/api/v1/orders/my-shipments", headers=shipper_headers).json()["items"][0]
+    assert order["customer_name"] == "Test Customer"
+    assert len(order["items"]) == 1
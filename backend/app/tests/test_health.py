@@ -0,0 +1,33 @@
+from app.core import startup
+from app.core.startup import readiness
+
+def test_liveness_does_not_wait_for_warm_up(client):
+    readiness.mark_not_ready()
+    assert client.get("/health/live").status_code == 200
+
+def test_readiness_reports_warm_up_state(client, monkeypatch):
+    readiness.mark_not_ready()
+    response = client.get("/health/ready")
+    assert response.status_code == 503
+    assert response.json()["status"] == "starting"
+
+    monkeypatch.setattr(startup, "prewarm_pool", lambda connections: connections)
+    startup.warm_up(2)
+    try:
+        response = client.get("/health/ready")
+        assert response.status_code == 200
+        assert response.json()["checks"] == {"database": "ok", "security": "ok"}
+    finally:
+        readiness.mark_not_ready()
+
+def test_failed_warm_up_stays_not_ready(client, monkeypatch):
+    readiness.mark_not_ready()
+
+    def unreachable(connections):
+        raise ConnectionError("database unreachable")
+
+    monkeypatch.setattr(startup, "prewarm_pool", unreachable)
+    startup.warm_up(2)
+    response = client.get("/health/ready")
+    assert response.status_code == 503
+    assert "database unreachable" in response.json()["checks"]["database"]
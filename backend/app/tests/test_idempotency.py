@@ -0,0 +1,116 @@
+import json
+from datetime import timedelta
+
+import pytest
+
+from app.models.idempotency_key import IdempotencyKey
+from app.models.order import Order
+from app.services import idempotency as idempotency_service
+from app.services import order as order_service
+from app.services.idempotency import LeaseLost
+from app.tests.conftest import order_payload
+
+def test_retried_create_returns_original_order(client, db, shipper_headers):
+    headers = {**shipper_headers, "Idempotency-Key": "create-1"}
+    first = client.post("/api/v1/orders/", headers=headers, json=order_payload())
+    retry = client.post("/api/v1/orders/", headers=headers, json=order_payload())
+
+    assert first.status_code == 201
+    assert retry.status_code == 201
+    assert retry.headers["Idempotent-Replayed"] == "true"
+    assert retry.json() == first.json()
+    assert db.query(Order).count() == 1
+
+def test_key_reused_with_different_body_is_rejected(client, shipper_headers):
+    headers = {**shipper_headers, "Idempotency-Key": "create-2"}
+    client.post("/api/v1/orders/", headers=headers, json=order_payload())
+    response = client.post("/api/v1/orders/", headers=headers, json=order_payload(weight=9.0))
+
+    assert response.status_code == 422
+
+def test_request_failing_after_the_claim_frees_the_key(client, db, shipper_headers, monkeypatch):
+    create = order_service.create
+
+    def fail(*args, **kwargs):
+        raise RuntimeError("database went away")
+
+    headers = {**shipper_headers, "Idempotency-Key": "create-3"}
+    monkeypatch.setattr(order_service, "create", fail)
+    with pytest.raises(RuntimeError):
+        client.post("/api/v1/orders/", headers=headers, json=order_payload())
+    assert db.query(IdempotencyKey).count() == 0
+
+    monkeypatch.setattr(order_service, "create", create)
+    assert client.post("/api/v1/orders/", headers=headers, json=order_payload()).status_code == 201
+    assert db.query(Order).count() == 1
+
+def test_order_and_stored_response_commit_together(client, db, shipper_headers, monkeypatch):
+    # Failing after the order is written but before the response is stored
+    def crash(*args, **kwargs):
+        raise RuntimeError("worker killed")
+
+    headers = {**shipper_headers, "Idempotency-Key": "create-5"}
+    monkeypatch.setattr(idempotency_service, "save_response", crash)
+    with pytest.raises(RuntimeError):
+        client.post("/api/v1/orders/", headers=headers, json=order_payload())
+    assert db.query(Order).count() == 0
+    assert db.query(IdempotencyKey).count() == 0
+
+    monkeypatch.undo()
+    first = client.post("/api/v1/orders/", headers=headers, json=order_payload())
+    retry = client.post("/api/v1/orders/", headers=headers, json=order_payload())
+    assert first.status_code == 201
+    assert retry.json() == first.json()
+    assert db.query(Order).count() == 1
+
+def test_request_that_lost_its_lease_rolls_back(client, db, shipper_headers, monkeypatch):
+    save_response = idempotency_service.save_response
+
+    def taken_over(session, record, *args):
+        # The lease ran out and a retry dropped the claim while the order was being written
+        session.query(IdempotencyKey).filter(IdempotencyKey.id == record.id).delete()
+        return save_response(session, record, *args)
+
+    headers = {**shipper_headers, "Idempotency-Key": "create-6"}
+    monkeypatch.setattr(idempotency_service, "save_response", taken_over)
+    response = client.post("/api/v1/orders/", headers=headers, json=order_payload())
+
+    assert response.status_code == 409
+    assert db.query(Order).count() == 0
+
+def test_save_response_refuses_a_claim_taken_over_by_a_retry(db, shipper):
+    first = idempotency_service.reserve(db, shipper.id, "create-7", "x")
+    db.query(IdempotencyKey).update({"expires_at": idempotency_service.utcnow() - timedelta(seconds=1)})
+    db.commit()
+    # Once the lease is up the key is free, for the same request or another one
+    assert idempotency_service.reserve(db, shipper.id, "create-7", "y") is not None
+
+    with pytest.raises(LeaseLost):
+        idempotency_service.save_response(db, first, 201, {})
+
+def test_purge_expired_removes_only_expired_keys(db, shipper):
+    now = idempotency_service.utcnow()
+    db.add_all([
+        IdempotencyKey(key="old", user_id=shipper.id, request_hash="x", expires_at=now - timedelta(hours=1)),
+        IdempotencyKey(key="new", user_id=shipper.id, request_hash="x", expires_at=now + timedelta(hours=1)),
+    ])
+    db.commit()
+
+    assert idempotency_service.purge_expired(db) == 1
+    assert [k.key for k in db.query(IdempotencyKey).all()] == ["new"]
+
+def test_abandoned_claim_lapses_after_its_lease(client, db, shipper, shipper_headers):
+    # A request that crashed after claiming the key never saved a response
+    now = idempotency_service.utcnow()
+    request_hash = idempotency_service.fingerprint("POST", "/api/v1/orders/", json.dumps(order_payload()).encode())
+    assert idempotency_service.reserve(db, shipper.id, "create-4", request_hash) is not None
+    headers = {**shipper_headers, "Idempotency-Key": "create-4"}
+    assert client.post("/api/v1/orders/", headers=headers, json=order_payload()).status_code == 409
+
+    db.query(IdempotencyKey).update({"expires_at": now - timedelta(seconds=1)})
+    db.commit()
+    assert client.post("/api/v1/orders/", headers=headers, json=order_payload()).status_code == 201
+    record = db.query(IdempotencyKey).one()
+    db.refresh(record)
+    assert record.status_code == 201
+    assert record.expires_at.replace(tzinfo=None) > (now + timedelta(hours=1)).replace(tzinfo=None)
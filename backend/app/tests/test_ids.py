@@ -0,0 +1,98 @@
+from pathlib import Path
+from types import SimpleNamespace
+import runpy
+
+import pytest
+
+from app.core import ids
+from app.core.ids import SnowflakeGenerator
+from app.models.order import Order
+from app.services import order_state
+from app.tests.conftest import order_payload
+
+def test_ids_are_unique_and_time_ordered_as_text():
+    generator = SnowflakeGenerator(shard_id=3)
+    values = generator.next_ids(50_000) + [generator.next_id() for _ in range(1_000)]
+    codes = [ids.encode(value) for value in values]
+
+    assert len(set(values)) == len(values)
+    assert values == sorted(values)
+    assert [code[:-1] for code in codes] == sorted(code[:-1] for code in codes)
+
+def test_sequence_overflow_and_clock_rollback_do_not_repeat_ids():
+    now = [1_800_000_000.0]
+    generator = SnowflakeGenerator(shard_id=1, clock=lambda: now[0])
+
+    first = generator.next_ids(ids.MAX_SEQUENCE + 10)
+    now[0] -= 5  # clock jumps backwards
+    second = generator.next_ids(100)
+
+    assert len(set(first + second)) == len(first) + len(second)
+    assert max(first) < min(second)
+
+def test_shards_never_collide():
+    clock = lambda: 1_800_000_000.0
+    a = SnowflakeGenerator(shard_id=1, clock=clock).next_ids(1_000)
+    b = SnowflakeGenerator(shard_id=2, clock=clock).next_ids(1_000)
+    assert not set(a) & set(b)
+
+def test_encoding_round_trips_and_detects_typos():
+    value = SnowflakeGenerator(shard_id=7).next_id()
+    code = ids.encode(value)
+
+    assert ids.decode(code) == value
+    assert ids.decode(code.lower()) == value
+    typo = ("1" if code[5] != "1" else "2").join([code[:5], code[6:]])
+    with pytest.raises(ids.InvalidIdError):
+        ids.decode(typo)
+
+def test_generated_numbers_have_prefix_and_valid_check_symbol():
+    from app.services.order import generate_order_number, generate_tracking_number
+
+    order_number = generate_order_number()
+    tracking_number = generate_tracking_number()
+    assert order_number.startswith("ORD-") and ids.is_valid(order_number[4:])
+    assert tracking_number.startswith("TRK-") and ids.is_valid(tracking_number[4:])
+
+def _fixed_generator():
+    return SnowflakeGenerator(shard_id=5, clock=lambda: 1_800_000_000.0)
+
+@pytest.fixture
+def restore_generator(monkeypatch):
+    monkeypatch.setattr(ids, "_generator", ids._generator)
+    monkeypatch.setattr(ids, "_generator_pid", ids._generator_pid)
+
+def test_taken_order_number_is_retried(client, shipper_headers, restore_generator):
+    ids.set_generator(_fixed_generator())
+    first = client.post("/api/v1/orders/", headers=shipper_headers, json=order_payload()).json()
+    # A second process on the same shard hands out the same number first
+    ids.set_generator(_fixed_generator())
+    response = client.post("/api/v1/orders/", headers=shipper_headers, json=order_payload())
+
+    assert response.status_code == 201
+    assert response.json()["order_number"] != first["order_number"]
+
+def test_taken_tracking_number_is_retried(client, db, shipper_headers, carrier, restore_generator):
+    first, second = [client.post("/api/v1/orders/", headers=shipper_headers, json=order_payload()).json() for _ in range(2)]
+    ids.set_generator(_fixed_generator())
+    order_state.assign(db, {first["id"]: carrier.id})
+    ids.set_generator(_fixed_generator())
+    rows = order_state.assign(db, {second["id"]: carrier.id})
+
+    assert len(rows) == 1
+    assert rows[0].tracking_number != db.get(Order, first["id"]).tracking_number
+
+def test_gunicorn_workers_get_their_own_shards():
+    config = runpy.run_path(str(Path(__file__).resolve().parents[2] / "gunicorn.conf.py"))
+    server = SimpleNamespace(WORKERS={})
+    for pid in range(4):
+        worker = SimpleNamespace()
+        config["pre_fork"](server, worker)
+        server.WORKERS[pid] = worker
+    assert sorted(worker.id_shard for worker in server.WORKERS.values()) == [0, 1, 2, 3]
+
+    # A recycled worker takes the slot its predecessor left
+    del server.WORKERS[1]
+    replacement = SimpleNamespace()
+    config["pre_fork"](server, replacement)
+    assert replacement.id_shard == 1
@@ -0,0 +1,98 @@
+import pytest
+
+from app.models.order import Order, OrderStatus
+from app.services import order as order_service
+from app.services import order_cache, order_state
+from app.services.order_state import ForbiddenTransition, InvalidTransition
+from app.tests.conftest import create_accepted_orders, create_order
+
+def test_check_follows_the_transition_table():
+    order_state.check("carrier", OrderStatus.ACCEPTED, OrderStatus.PICKED_UP)
+    order_state.check("shipper", OrderStatus.IN_TRANSIT, OrderStatus.CANCELLED)
+
+    with pytest.raises(InvalidTransition):
+        order_state.check("carrier", OrderStatus.ACCEPTED, OrderStatus.DELIVERED)
+    with pytest.raises(InvalidTransition):
+        order_state.check("shipper", OrderStatus.DELIVERED, OrderStatus.CANCELLED)
+    with pytest.raises(ForbiddenTransition):
+        order_state.check("carrier", OrderStatus.ACCEPTED, OrderStatus.CANCELLED)
+    with pytest.raises(ForbiddenTransition):
+        order_state.check("shipper", OrderStatus.PENDING, OrderStatus.PICKED_UP)
+
+def test_transition_is_guarded_on_current_status(client, db, shipper_headers, carrier_headers):
+    [order_id] = create_accepted_orders(client, shipper_headers, carrier_headers, 1)
+
+    row = order_state.transition(db, order_id, OrderStatus.ACCEPTED, OrderStatus.PICKED_UP)
+    assert row.status == OrderStatus.PICKED_UP
+    assert row.order_number.startswith("ORD-")
+
+    # A second caller still expecting ACCEPTED loses the race
+    assert order_state.transition(db, order_id, OrderStatus.ACCEPTED, OrderStatus.PICKED_UP) is None
+
+def test_status_endpoint_uses_the_state_machine(client, db, shipper_headers, carrier_headers):
+    [order_id] = create_accepted_orders(client, shipper_headers, carrier_headers, 1)
+    url = f"/api/v1/orders/{order_id}/status"
+
+    response = client.patch(url, headers=carrier_headers, json={"status": "PICKED_UP"})
+    assert response.status_code == 200
+    assert response.json()["status"] == "PICKED_UP"
+    assert len(response.json()["items"]) == 1
+
+    assert client.patch(url, headers=carrier_headers, json={"status": "DELIVERED"}).status_code == 400
+    assert client.patch(url, headers=carrier_headers, json={"status": "CANCELLED"}).status_code == 403
+
+def test_status_endpoint_does_not_trust_a_stale_cached_status(client, db, shipper_headers, carrier_headers):
+    [order_id] = create_accepted_orders(client, shipper_headers, carrier_headers, 1)
+    url = f"/api/v1/orders/{order_id}/status"
+    # The access row, status ACCEPTED, is cached; then the order moves on behind the cache's back
+    assert order_service.get_access(db, order_id).status == OrderStatus.ACCEPTED
+    db.query(Order).filter(Order.id == order_id).update({"status": OrderStatus.PICKED_UP})
+    db.commit()
+
+    response = client.patch(url, headers=carrier_headers, json={"status": "PICKED_UP"})
+    assert response.status_code == 400
+    assert "from PICKED_UP" in response.json()["detail"]
+    assert order_cache.get_access(order_id) is None
+
+    response = client.patch(url, headers=carrier_headers, json={"status": "IN_TRANSIT"})
+    assert response.status_code == 200
+
+def test_transition_many_reports_each_order(client, db, shipper, carrier, shipper_headers, carrier_headers):
+    picked_up = create_accepted_orders(client, shipper_headers, carrier_headers, 3)
+    still_accepted = create_accepted_orders(client, shipper_headers, carrier_headers, 1)
+    unassigned = create_order(client, shipper_headers)["id"]
+    order_state.transition_many(db, picked_up, OrderStatus.PICKED_UP, "carrier", carrier.id)
+
+    results = order_state.transition_many(
+        db, picked_up + still_accepted + [unassigned, 999999], OrderStatus.IN_TRANSIT, "carrier", carrier.id
+    )
+
+    assert [result.error for result in results] == [
+        None, None, None, "invalid_transition", "forbidden", "not_found"
+    ]
+    in_transit = db.query(Order.id).filter(Order.status == OrderStatus.IN_TRANSIT).all()
+    assert sorted(row.id for row in in_transit) == sorted(picked_up)
+
+    with pytest.raises(ForbiddenTransition):
+        order_state.transition_many(db, picked_up, OrderStatus.CANCELLED, "carrier", carrier.id)
+
+def test_batch_status_endpoint(client, db, shipper_headers, carrier_headers):
+    order_ids = create_accepted_orders(client, shipper_headers, carrier_headers, 3)
+    client.patch(f"/api/v1/orders/{order_ids[0]}/status", headers=carrier_headers, json={"status": "PICKED_UP"})
+
+    response = client.patch(
+        "/api/v1/orders/status:batch", headers=carrier_headers,
+        json={"order_ids": order_ids + [999999], "status": "picked_up"}
+    )
+
+    assert response.status_code == 200
+    body = response.json()
+    assert (body["updated"], body["failed"]) == (2, 2)
+    assert [r["error"] for r in body["results"]] == ["invalid_transition", None, None, "not_found"]
+    assert body["results"][1]["status"] == "PICKED_UP"
+
+    response = client.patch(
+        "/api/v1/orders/status:batch", headers=carrier_headers,
+        json={"order_ids": order_ids, "status": "CANCELLED"}
+    )
+    assert response.status_code == 403
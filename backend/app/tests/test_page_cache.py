@@ -0,0 +1,80 @@
+from app.api.v1.endpoints import orders as orders_endpoints
+from app.core import page_cache
+from app.core.page_cache import InMemoryPageCacheStore, KeyValuePageCacheStore, LocalKeyValueClient
+from app.services import order as order_service
+from app.tests.conftest import order_payload
+
+def _get(client, headers, path="/api/v1/orders/my-shipments"):
+    response = client.get(path, headers=headers)
+    assert response.status_code == 200
+    return response
+
+def test_repeated_page_is_served_from_cache(client, shipper_headers):
+    client.post("/api/v1/orders/", headers=shipper_headers, json=order_payload())
+
+    first = _get(client, shipper_headers)
+    second = _get(client, shipper_headers)
+    assert first.headers["X-Page-Cache"] == "miss"
+    assert second.headers["X-Page-Cache"] == "hit"
+    assert second.json() == first.json()
+
+    other_page = _get(client, shipper_headers, "/api/v1/orders/my-shipments?fields=summary")
+    assert other_page.headers["X-Page-Cache"] == "miss"
+
+def test_writes_invalidate_both_owners_pages(client, db, shipper_headers, carrier_headers):
+    order = client.post("/api/v1/orders/", headers=shipper_headers, json=order_payload()).json()
+    _get(client, shipper_headers)
+    _get(client, carrier_headers, "/api/v1/orders/my-deliveries")
+
+    client.post(f"/api/v1/orders/{order['id']}/accept", headers=carrier_headers)
+    shipper_page = _get(client, shipper_headers)
+    carrier_page = _get(client, carrier_headers, "/api/v1/orders/my-deliveries")
+    assert shipper_page.headers["X-Page-Cache"] == "miss"
+    assert shipper_page.json()["items"][0]["status"] == "ACCEPTED"
+    assert carrier_page.headers["X-Page-Cache"] == "miss"
+    assert carrier_page.json()["total"] == 1
+
+    client.patch(f"/api/v1/orders/{order['id']}/status", headers=carrier_headers, json={"status": "PICKED_UP"})
+    assert _get(client, shipper_headers).json()["items"][0]["status"] == "PICKED_UP"
+
+    order_service.delete(db, order["id"])
+    assert _get(client, shipper_headers).json()["total"] == 0
+    assert _get(client, carrier_headers, "/api/v1/orders/my-deliveries").json()["total"] == 0
+
+def test_shared_store_invalidates_pages_cached_by_other_workers(client, shipper_headers, monkeypatch):
+    shared = LocalKeyValueClient()
+    monkeypatch.setattr(page_cache, "_store", KeyValuePageCacheStore(shared))
+    _get(client, shipper_headers)
+    assert _get(client, shipper_headers).headers["X-Page-Cache"] == "hit"
+
+    # Another worker's store over the same client records the write
+    other_worker = KeyValuePageCacheStore(shared)
+    monkeypatch.setattr(page_cache, "_store", other_worker)
+    client.post("/api/v1/orders/", headers=shipper_headers, json=order_payload())
+
+    monkeypatch.setattr(page_cache, "_store", KeyValuePageCacheStore(shared))
+    page = _get(client, shipper_headers)
+    assert page.headers["X-Page-Cache"] == "miss"
+    assert page.json()["total"] == 1
+
+def test_lagging_replica_pages_are_not_cached_right_after_a_write(client, shipper_headers, monkeypatch):
+    client.post("/api/v1/orders/", headers=shipper_headers, json=order_payload())
+    monkeypatch.setattr(orders_endpoints, "reads_replica", lambda db: True)
+
+    _get(client, shipper_headers)
+    assert _get(client, shipper_headers).headers["X-Page-Cache"] == "miss"
+
+def test_default_store_shares_generations_between_workers(client, shipper_headers, monkeypatch):
+    # Two workers, each with its own page LRU, over the host's shared cache
+    worker = InMemoryPageCacheStore()
+    monkeypatch.setattr(page_cache, "_store", worker)
+    _get(client, shipper_headers)
+    assert _get(client, shipper_headers).headers["X-Page-Cache"] == "hit"
+
+    monkeypatch.setattr(page_cache, "_store", InMemoryPageCacheStore())
+    client.post("/api/v1/orders/", headers=shipper_headers, json=order_payload())
+
+    monkeypatch.setattr(page_cache, "_store", worker)
+    page = _get(client, shipper_headers)
+    assert page.headers["X-Page-Cache"] == "miss"
+    assert page.json()["total"] == 1
@@ -0,0 +1,36 @@
+import threading
+
+from app.core.periodic import PeriodicWorker
+
+class _Session:
+    def close(self):
+        pass
+
+class _Counter(PeriodicWorker):
+    name = "counter"
+
+    def __init__(self):
+        super().__init__(lambda: _Session(), interval=60)
+        self.runs = 0
+        self.ran = threading.Event()
+
+    def run(self, db):
+        self.runs += 1
+        self.ran.set()
+        if self.runs == 1:
+            raise RuntimeError("first run fails")
+
+def test_worker_survives_failures_and_wakes_early():
+    worker = _Counter()
+    thread = worker.start()
+    assert worker.ran.wait(5)
+
+    # The failed first run doesn't end the thread; waking runs it again before the interval
+    worker.ran.clear()
+    worker.wake.set()
+    assert worker.ran.wait(5)
+    assert worker.runs == 2
+
+    worker.stop()
+    thread.join(5)
+    assert not thread.is_alive()
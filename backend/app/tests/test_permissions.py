@@ -0,0 +1,60 @@
+from contextlib import contextmanager
+
+from sqlalchemy import event
+
+from app.core.security import create_access_token
+from app.tests.conftest import _create_user, engine, order_payload
+
+@contextmanager
+def captured_statements():
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, "before_cursor_execute", before_cursor_execute)
+
+def test_role_dependency_rejects_wrong_account_type(client, shipper_headers, carrier_headers):
+    response = client.get("/api/v1/orders/available", headers=shipper_headers)
+    assert response.status_code == 403
+    assert response.json()["detail"] == "Only carriers can view available orders"
+
+    response = client.post("/api/v1/orders/", headers=carrier_headers, json=order_payload())
+    assert response.status_code == 403
+    assert response.json()["detail"] == "Only shippers can create orders"
+
+def test_forbidden_order_costs_one_narrow_probe(client, db, shipper_headers):
+    order = client.post("/api/v1/orders/", headers=shipper_headers, json=order_payload()).json()
+    other = _create_user(db, "other", "shipper")
+    other_headers = {"Authorization": f"Bearer {create_access_token(other.id)}"}
+
+    with captured_statements() as statements:
+        response = client.get(f"/api/v1/orders/{order['id']}", headers=other_headers)
+
+    assert response.status_code == 403
+    order_queries = [s for s in statements if "FROM orders" in s or "FROM order_items" in s]
+    assert len(order_queries) == 1
+    assert "orders.package_description" not in order_queries[0]
+
+def test_owner_gets_full_order_and_missing_order_is_404(client, shipper_headers):
+    order = client.post("/api/v1/orders/", headers=shipper_headers, json=order_payload()).json()
+
+    response = client.get(f"/api/v1/orders/{order['id']}", headers=shipper_headers)
+    assert response.status_code == 200
+    assert response.json()["items"][0]["product_sku"] == "TEST-001"
+
+    assert client.get("/api/v1/orders/999999", headers=shipper_headers).status_code == 404
+    assert client.get("/api/v1/orders/track/TRK-NOPE", headers=shipper_headers).status_code == 404
+
+def test_unassigned_carrier_cannot_update_status(client, shipper_headers, carrier_headers):
+    order = client.post("/api/v1/orders/", headers=shipper_headers, json=order_payload()).json()
+
+    response = client.patch(
+        f"/api/v1/orders/{order['id']}/status", headers=carrier_headers, json={"status": "PICKED_UP"}
+    )
+    assert response.status_code == 403
+    assert response.json()["detail"] == "Not enough permissions to modify this order"
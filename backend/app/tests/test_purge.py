@@ -0,0 +1,62 @@
+from datetime import timedelta
+
+from app.core.config import settings
+from app.models.order import Order
+from app.models.order_item import OrderItem
+from app.models.order_tombstone import OrderTombstone
+from app.services import order as order_service
+from app.services import purge as purge_service
+from app.services.idempotency import utcnow
+from app.services.purge import PurgeScheduler
+from app.tests.conftest import TestingSessionLocal, create_order, create_orders
+
+def test_deleted_orders_disappear_from_reads(client, db, shipper_headers):
+    kept = create_order(client, shipper_headers)["id"]
+    deleted = create_order(client, shipper_headers)["id"]
+
+    assert order_service.delete(db, deleted) is True
+    assert order_service.delete(db, deleted) is False
+
+    page = client.get("/api/v1/orders/my-shipments", headers=shipper_headers).json()
+    assert [o["id"] for o in page["items"]] == [kept]
+    assert client.get(f"/api/v1/orders/{deleted}", headers=shipper_headers).status_code == 404
+    # Still on disk until the purge job runs
+    assert db.query(Order).filter(Order.id == deleted).count() == 1
+
+def test_purge_removes_old_deleted_orders_with_their_items(client, db, shipper_headers):
+    order_ids = [order["id"] for order in create_orders(client, shipper_headers, 5)]
+    recent = create_order(client, shipper_headers)["id"]
+    for order_id in order_ids + [recent]:
+        order_service.delete(db, order_id)
+    db.query(Order).filter(Order.id.in_(order_ids)).update(
+        {"deleted_at": utcnow() - timedelta(hours=2)}, synchronize_session=False
+    )
+    db.commit()
+
+    pauses = []
+    stats = purge_service.purge_deleted_orders(
+        db, older_than_minutes=60, batch_size=2, rows_per_second=1, sleep=pauses.append
+    )
+
+    assert stats.orders == 5
+    assert len(pauses) == 2
+    assert [row.id for row in db.query(Order.id).all()] == [recent]
+    assert db.query(OrderItem).filter(OrderItem.order_id.in_(order_ids)).count() == 0
+
+def test_scheduled_purge_expires_old_tombstones(client, db, shipper_headers):
+    old, recent = [order["id"] for order in create_orders(client, shipper_headers, 2)]
+    for order_id in (old, recent):
+        order_service.delete(db, order_id)
+    db.query(OrderTombstone).filter(OrderTombstone.order_id == old).update(
+        {"deleted_at": utcnow() - timedelta(days=settings.TOMBSTONE_RETENTION_DAYS + 1)}
+    )
+    db.commit()
+
+    PurgeScheduler(TestingSessionLocal, interval=60).tick()
+
+    assert [row.order_id for row in db.query(OrderTombstone.order_id).all()] == [recent]
+
+def test_sync_from_before_the_retained_tombstones_must_start_over(client, carrier_headers):
+    since = (utcnow() - timedelta(days=settings.TOMBSTONE_RETENTION_DAYS + 1)).isoformat()
+    response = client.get("/api/v1/orders/my-deliveries/changes", headers=carrier_headers, params={"since": since})
+    assert response.status_code == 410
@@ -0,0 +1,40 @@
+import pytest
+
+from app.core.config import settings
+from app.core.load_shedding import pool_wait
+from app.core.rate_limit import InMemoryRateLimitStore, RateLimitStore, auth_rate_limit
+
+def test_token_bucket_allows_burst_then_waits():
+    store = InMemoryRateLimitStore()
+
+    assert [store.take("k", rate=1.0, capacity=3) for _ in range(3)] == [0, 0, 0]
+    assert store.take("k", rate=1.0, capacity=3) > 0
+    assert store.take("other", rate=1.0, capacity=3) == 0
+
+def test_login_is_limited_per_client_ip(client, shipper, monkeypatch):
+    # Each attempt costs a bcrypt hash; keep refills from landing mid-test
+    monkeypatch.setattr(auth_rate_limit, "rate", 1 / 3600)
+    form = {"username": "shipper", "password": "wrong"}
+    statuses = [
+        client.post("/api/v1/auth/login", data=form).status_code
+        for _ in range(settings.AUTH_RATE_LIMIT_BURST + 1)
+    ]
+
+    assert set(statuses[:-1]) == {401}
+    assert statuses[-1] == 429
+
+def test_requests_are_shed_while_pool_wait_is_high(client, shipper_headers):
+    pool_wait.observe(10.0, weight=1.0)
+
+    response = client.get("/api/v1/orders/my-shipments", headers=shipper_headers)
+    assert response.status_code == 503
+    assert "Retry-After" in response.headers
+    assert client.get("/health").status_code == 200
+
+def test_incomplete_store_fails_when_created():
+    class TakeOnlyStore(RateLimitStore):
+        def take(self, key, rate, capacity, cost=1.0):
+            return 0.0
+
+    with pytest.raises(TypeError):
+        TakeOnlyStore()
@@ -0,0 +1,79 @@
+import json
+
+import pytest
+
+from app.core.config import settings
+from app.models.order import Order
+from app.models.order_read_model import OrderReadModel
+from app.services import archive as archive_service
+from app.services import order as order_service
+from app.services import read_model
+from app.tests.conftest import create_orders
+from app.tests.test_permissions import captured_statements
+
+pytestmark = pytest.mark.usefixtures("read_model_enabled")
+
+def _rows(db):
+    db.expire_all()
+    return {row.id: row for row in db.query(OrderReadModel).all()}
+
+@pytest.mark.parametrize("query", [
+    "", "?fields=summary", "?fields=summary,items", "?fields=status,items", "?status=ACCEPTED&sort=-weight"
+])
+def test_pages_match_the_orders_tables(client, shipper_headers, carrier_headers, monkeypatch, query):
+    orders = create_orders(client, shipper_headers, 3)
+    client.post(f"/api/v1/orders/{orders[1]['id']}/accept", headers=carrier_headers)
+
+    for path in ("/api/v1/orders/my-shipments", "/api/v1/orders/available", "/api/v1/orders/my-deliveries"):
+        headers = shipper_headers if path.endswith("my-shipments") else carrier_headers
+        from_read_model = client.get(path + query, headers=headers).json()
+        monkeypatch.setattr(settings, "READ_MODEL_ENABLED", False)
+        monkeypatch.setattr(settings, "PAGE_CACHE_ENABLED", False)
+        from_orders = client.get(path + query, headers=headers).json()
+        monkeypatch.setattr(settings, "READ_MODEL_ENABLED", True)
+        assert from_read_model == from_orders
+
+def test_list_pages_are_a_single_table_query(client, shipper_headers):
+    create_orders(client, shipper_headers, 3)
+
+    with captured_statements() as statements:
+        page = client.get("/api/v1/orders/my-shipments", headers=shipper_headers).json()
+
+    assert len(page["items"]) == 3
+    assert page["items"][0]["items"][0]["product_sku"] == "TEST-001"
+    assert not any("order_items" in statement for statement in statements)
+
+def test_writes_keep_the_read_model_in_sync(client, db, shipper_headers, carrier_headers):
+    first, second = create_orders(client, shipper_headers, 2)
+    rows = _rows(db)
+    assert rows[first["id"]].item_count == 1
+    assert rows[first["id"]].items[0]["product_sku"] == "TEST-001"
+
+    accepted = client.post(f"/api/v1/orders/{first['id']}/accept", headers=carrier_headers).json()
+    client.patch(f"/api/v1/orders/{first['id']}/status", headers=carrier_headers, json={"status": "PICKED_UP"})
+    row = _rows(db)[first["id"]]
+    assert row.is_assigned and row.status == "PICKED_UP"
+    assert json.loads(row.payload)["tracking_number"] == accepted["tracking_number"]
+
+    order_service.delete(db, second["id"])
+    assert second["id"] not in _rows(db)
+
+def test_archived_orders_leave_the_read_model(client, db, shipper_headers):
+    order = create_orders(client, shipper_headers, 1)[0]
+    db.query(Order).filter(Order.id == order["id"]).update({"status": "DELIVERED"})
+    db.commit()
+
+    assert archive_service.archive_terminal_orders(db, older_than_days=-1) == 1
+    assert _rows(db) == {}
+
+def test_rebuild_restores_missing_and_stale_rows(client, db, shipper_headers):
+    orders = create_orders(client, shipper_headers, 3)
+    db.query(OrderReadModel).filter(OrderReadModel.id == orders[0]["id"]).delete()
+    db.query(Order).filter(Order.id == orders[1]["id"]).update({"weight": 9.0})
+    db.commit()
+
+    assert read_model.rebuild(db, batch_size=2) == 3
+    rows = _rows(db)
+    assert set(rows) == {order["id"] for order in orders}
+    assert rows[orders[1]["id"]].weight == 9.0
+    assert json.loads(rows[orders[1]["id"]].payload)["weight"] == 9.0
@@ -0,0 +1,81 @@
+import pytest
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.core import database
+from app.core.database import Base, get_read_db, recent_writers
+from app.core.load_shedding import pool_wait
+from app.main import app
+from app.tests.conftest import TestingSessionLocal, engine, order_payload
+
+@pytest.fixture
+def replica(client, monkeypatch):
+    """Route reads through a second, empty SQLite database standing in for a lagging replica."""
+    replica_engine = create_engine(
+        "sqlite:///:memory:",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    Base.metadata.create_all(bind=replica_engine)
+    monkeypatch.setattr(database, "SessionLocal", TestingSessionLocal)
+    monkeypatch.setattr(database, "read_engine", replica_engine)
+    monkeypatch.setattr(
+        database, "ReadSessionLocal",
+        sessionmaker(autocommit=False, autoflush=False, bind=replica_engine)
+    )
+    app.dependency_overrides.pop(get_read_db)
+    yield
+    Base.metadata.drop_all(bind=replica_engine)
+
+def test_reads_stick_to_primary_after_own_write(client, replica, shipper, shipper_headers):
+    client.post("/api/v1/orders/", headers=shipper_headers, json=order_payload())
+
+    assert shipper.id in recent_writers
+    response = client.get("/api/v1/orders/my-shipments", headers=shipper_headers)
+    assert response.json()["total"] == 1
+
+def test_reads_use_replica_outside_sticky_window(client, replica, shipper_headers):
+    client.post("/api/v1/orders/", headers=shipper_headers, json=order_payload())
+    recent_writers.clear()
+
+    response = client.get("/api/v1/orders/my-shipments", headers=shipper_headers)
+    assert response.json()["total"] == 0
+
+def test_write_through_another_worker_sticks_reads_to_primary(client, replica, shipper, shipper_headers):
+    client.post("/api/v1/orders/", headers=shipper_headers, json=order_payload())
+    # This worker never saw the write; only the shared cache knows about it
+    recent_writers._until.clear()
+
+    assert shipper.id in recent_writers
+    response = client.get("/api/v1/orders/my-shipments", headers=shipper_headers)
+    assert response.json()["total"] == 1
+
+def test_new_account_is_found_on_the_primary(client, replica, shipper, shipper_headers):
+    # The replica has no users at all, and nobody wrote recently
+    response = client.get("/api/v1/users/me", headers=shipper_headers)
+    assert response.status_code == 200
+    assert response.json()["id"] == shipper.id
+
+def test_connections_are_checked_out_on_first_use(client, shipper_headers, monkeypatch):
+    checkouts = []
+    samples = []
+
+    def checkout(*args):
+        checkouts.append(args)
+
+    event.listen(engine, "checkout", checkout)
+    monkeypatch.setattr(pool_wait, "observe", lambda sample, weight=0.2: samples.append(sample))
+    try:
+        client.get("/api/v1/users/me", headers=shipper_headers)
+        checkouts.clear()
+        samples.clear()
+
+        # The user is cached, so nothing needs the database
+        assert client.get("/api/v1/users/me", headers=shipper_headers).status_code == 200
+        assert checkouts == [] and samples == []
+
+        assert client.get("/api/v1/orders/my-shipments", headers=shipper_headers).status_code == 200
+        assert len(checkouts) == 1 and len(samples) == 1
+    finally:
+        event.remove(engine, "checkout", checkout)
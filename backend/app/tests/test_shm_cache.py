@@ -0,0 +1,124 @@
+import multiprocessing
+import time
+
+import pytest
+
+from app.core import shm_cache
+from app.core.shm_cache import LocalCache, SharedMemoryCache, WAYS
+from app.models.user import User
+from app.schemas.user import UserUpdate
+from app.services import order_cache
+from app.services import user as user_service
+from app.tests.conftest import order_payload
+
+pytestmark = pytest.mark.skipif(shm_cache.fcntl is None, reason="needs fcntl file locks")
+
+@pytest.fixture
+def shared(tmp_path):
+    cache = SharedMemoryCache(str(tmp_path / "cache.bin"), slots=64, slot_size=512)
+    yield cache
+    cache.close()
+
+def test_set_get_and_expiry(shared):
+    shared.set("a", b"1", ttl=60)
+    shared.set("b", b"2", ttl=-1)
+    assert shared.get("a") == b"1"
+    assert shared.get("b") is None
+    assert shared.get("missing") is None
+
+    shared.set("a", b"3", ttl=60)
+    assert shared.get("a") == b"3"
+    shared.delete("a")
+    assert shared.get("a") is None
+
+def test_values_larger_than_a_slot_are_not_cached(shared):
+    assert not shared.set("big", b"x" * 600, ttl=60)
+    assert shared.get("big") is None
+
+def test_full_bucket_evicts_least_recently_used(tmp_path):
+    cache = SharedMemoryCache(str(tmp_path / "cache.bin"), slots=WAYS, slot_size=64)
+    for index in range(WAYS):
+        cache.set(f"key{index}", b"v", ttl=60)
+    cache.get("key0")
+    cache.set("newcomer", b"v", ttl=60)
+    assert cache.get("newcomer") == b"v"
+    assert cache.get("key0") == b"v"
+    assert cache.get("key1") is None
+    cache.close()
+
+def test_tombstone_blocks_add_until_it_expires(shared):
+    assert shared.add("k", b"old", ttl=60)
+    assert not shared.add("k", b"other", ttl=60)
+    shared.invalidate("k", ttl=0.05)
+    assert shared.lookup("k") is None
+    assert not shared.add("k", b"stale", ttl=60)
+    time.sleep(0.06)
+    assert shared.add("k", b"fresh", ttl=60)
+    assert shared.lookup("k") == b"fresh"
+
+def test_another_layout_never_resizes_a_mapped_file(shared):
+    shared.set("a", b"1", ttl=60)
+    with pytest.raises(RuntimeError):
+        SharedMemoryCache(shared.path, slots=128, slot_size=512)
+    assert shared.get("a") == b"1"
+
+    # Each layout gets a file of its own
+    paths = {shm_cache.layout_path(shared.path, slots, 512) for slots in (64, 128)}
+    assert len(paths) == 2 and shared.path not in paths
+
+def _write_entry(path, key, value):
+    cache = SharedMemoryCache(path, slots=64, slot_size=512)
+    cache.set(key, value, ttl=60)
+    cache.close()
+
+def test_entries_are_shared_between_processes(tmp_path, shared):
+    process = multiprocessing.get_context("fork").Process(
+        target=_write_entry, args=(shared.path, "from-child", b"hello")
+    )
+    process.start()
+    process.join()
+    assert process.exitcode == 0
+    assert shared.get("from-child") == b"hello"
+
+def test_local_cache_lru_and_tombstones():
+    cache = LocalCache(max_entries=2)
+    cache.set("a", b"1", ttl=60)
+    cache.set("b", b"2", ttl=60)
+    cache.get("a")
+    cache.set("c", b"3", ttl=60)
+    assert cache.get("a") == b"1"
+    assert cache.get("b") is None
+
+    cache.invalidate("a")
+    assert cache.lookup("a") is None
+    assert not cache.add("a", b"stale", ttl=60)
+
+def test_cached_user_is_served_until_updated(client, db, shipper, shipper_headers, shared):
+    shm_cache.set_cache(shared)
+    assert client.get("/api/v1/auth/me", headers=shipper_headers).status_code == 200
+    assert shared.lookup(f"user:{shipper.id}") is not None
+
+    # A write that bypasses the user service is only seen once the entry expires
+    db.query(User).filter(User.id == shipper.id).update({"name": "Renamed"})
+    db.commit()
+    assert client.get("/api/v1/auth/me", headers=shipper_headers).json()["name"] == "Shipper"
+
+    user_service.update(db, db.get(User, shipper.id), UserUpdate(name="Updated"))
+    assert client.get("/api/v1/auth/me", headers=shipper_headers).json()["name"] == "Updated"
+
+def test_order_access_is_invalidated_by_writes(client, shipper_headers, carrier_headers):
+    order = client.post("/api/v1/orders/", headers=shipper_headers, json=order_payload()).json()
+    order = client.post(f"/api/v1/orders/{order['id']}/accept", headers=carrier_headers).json()
+    # Drop the tombstone the accept left behind
+    shm_cache.get_cache().clear()
+    response = client.get(f"/api/v1/orders/track/{order['tracking_number']}", headers=shipper_headers)
+    assert response.status_code == 200
+    assert order_cache.get_tracked_order_id(order["tracking_number"]) == order["id"]
+    assert order_cache.get_access(order["id"])[3] == "ACCEPTED"
+
+    client.patch(f"/api/v1/orders/{order['id']}/status", headers=carrier_headers, json={"status": "PICKED_UP"})
+    assert order_cache.get_access(order["id"]) is None
+    response = client.get(f"/api/v1/orders/track/{order['tracking_number']}", headers=shipper_headers)
+    assert response.json()["status"] == "PICKED_UP"
+    # Reads right after a write may come from a lagging replica, so they aren't cached
+    assert order_cache.get_access(order["id"]) is None
@@ -0,0 +1,91 @@
+import threading
+
+from app.core.singleflight import SingleFlight
+from app.services import order as order_service
+from app.core.security import create_access_token
+from app.tests.conftest import _create_user, order_payload
+
+def _run_concurrently(flights, count, func, copy=lambda result: result):
+    started = threading.Barrier(count)
+    results = [None] * count
+
+    def call(index):
+        started.wait()
+        results[index] = flights.do("key", func, copy=copy)
+
+    threads = [threading.Thread(target=call, args=(n,)) for n in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+def test_concurrent_calls_share_one_execution_and_get_copies():
+    flights = SingleFlight("test")
+    release = threading.Event()
+    executions = []
+
+    def slow_query():
+        executions.append(1)
+        release.wait(5)
+        return ["row"]
+
+    # Let every caller join the flight before the leader finishes
+    timer = threading.Timer(0.2, release.set)
+    timer.start()
+    results = _run_concurrently(flights, 8, slow_query, copy=list)
+
+    assert len(executions) == 1
+    assert all(result == ["row"] for result in results)
+    assert len({id(result) for result in results}) == 8
+    stats = flights.stats()
+    assert (stats.calls, stats.executions, stats.coalesced) == (8, 1, 7)
+
+def test_followers_receive_the_leaders_error_and_the_next_call_runs_again():
+    flights = SingleFlight("test")
+    release = threading.Event()
+
+    def failing_query():
+        release.wait(5)
+        raise RuntimeError("database went away")
+
+    threading.Timer(0.2, release.set).start()
+    errors = []
+
+    def call():
+        try:
+            flights.do("key", failing_query)
+        except RuntimeError as exc:
+            errors.append(exc)
+
+    threads = [threading.Thread(target=call) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(errors) == 4
+
+    assert flights.do("key", lambda: "fresh") == "fresh"
+    assert flights.stats().executions == 2
+
+def test_coalesced_page_copies_are_detached_from_the_leader(client, db, shipper_headers):
+    client.post("/api/v1/orders/", headers=shipper_headers, json=order_payload())
+    page = order_service.get_available_orders(db)
+
+    copy = order_service._copy_page(page)
+    copy.items[0].items = []
+    assert copy.items[0] is not page.items[0]
+    assert copy.items[0].order_number == page.items[0].order_number
+    assert not hasattr(page.items[0], "items")
+
+def test_coalescing_stats_are_reported_to_superusers_only(client, db, shipper, shipper_headers):
+    assert client.get("/api/v1/internal/coalescing").status_code == 401
+    assert client.get("/api/v1/internal/coalescing", headers=shipper_headers).status_code == 403
+
+    admin = _create_user(db, "admin", "shipper")
+    admin.is_superuser = True
+    db.commit()
+    headers = {"Authorization": f"Bearer {create_access_token(admin.id)}"}
+    response = client.get("/api/v1/internal/coalescing", headers=headers)
+    assert response.status_code == 200
+    assert {"calls", "executions", "coalesced"} <= set(response.json()["available_orders"])
@@ -0,0 +1,117 @@
+from datetime import datetime, timedelta, timezone
+
+from app.models.order import Order, OrderStatus
+from app.services.sla import AT_RISK, OVERDUE, SlaMonitor, SlaScheduler, sla_monitor
+from app.tests.conftest import TestingSessionLocal, order_payload
+
+def create_due_order(client, headers, due_in: timedelta):
+    now = datetime.now(timezone.utc).replace(tzinfo=None)
+    deadline = now + due_in
+    payload = order_payload(
+        pickup_date=(deadline - timedelta(days=1)).isoformat(),
+        delivery_deadline=deadline.isoformat(),
+    )
+    return client.post("/api/v1/orders/", headers=headers, json=payload).json()["id"]
+
+def test_monitor_flags_orders_as_their_deadlines_approach(client, db, shipper, shipper_headers):
+    overdue = create_due_order(client, shipper_headers, timedelta(hours=-1))
+    at_risk = create_due_order(client, shipper_headers, timedelta(minutes=30))
+    later = create_due_order(client, shipper_headers, timedelta(days=3))
+    delivered = create_due_order(client, shipper_headers, timedelta(hours=-2))
+    db.query(Order).filter(Order.id == delivered).update({"status": OrderStatus.DELIVERED})
+    db.commit()
+
+    monitor = SlaMonitor(at_risk_window=timedelta(hours=2))
+    seen = []
+    monitor.subscribe(seen.append)
+    assert monitor.load(db) == 3
+
+    events = monitor.advance()
+    assert {(event.order_id, event.kind) for event in events} == {(overdue, OVERDUE), (at_risk, AT_RISK)}
+    assert seen == events
+    assert monitor.advance() == []
+    assert [event.order_id for event in monitor.at_risk(shipper_id=shipper.id)] == [overdue, at_risk]
+
+    # The at-risk order later passes its deadline and fires once more
+    events = monitor.advance(datetime.now(timezone.utc) + timedelta(hours=1))
+    assert [(event.order_id, event.kind) for event in events] == [(at_risk, OVERDUE)]
+    assert later not in {event.order_id for event in monitor.at_risk()}
+
+def test_refresh_applies_changed_orders_only(client, db, shipper, shipper_headers):
+    overdue = create_due_order(client, shipper_headers, timedelta(hours=-1))
+    monitor = SlaMonitor(at_risk_window=timedelta(hours=2), overlap=timedelta(0))
+    monitor.load(db)
+    monitor.advance()
+
+    db.query(Order).filter(Order.id == overdue).update({
+        "status": OrderStatus.DELIVERED,
+        "updated_at": datetime.now(timezone.utc) + timedelta(seconds=1),
+    })
+    db.commit()
+    new_order = create_due_order(client, shipper_headers, timedelta(minutes=10))
+    db.query(Order).filter(Order.id == new_order).update({
+        "updated_at": datetime.now(timezone.utc) + timedelta(seconds=2),
+    })
+    db.commit()
+
+    assert monitor.refresh(db) == 2
+    monitor.advance()
+    assert [event.order_id for event in monitor.at_risk(shipper_id=shipper.id)] == [new_order]
+
+def test_at_risk_endpoint_is_scoped_to_the_user(client, db, shipper, shipper_headers, carrier_headers):
+    overdue = create_due_order(client, shipper_headers, timedelta(hours=-1))
+    sla_monitor.load(db)
+    sla_monitor.advance()
+
+    response = client.get("/api/v1/orders/at-risk", headers=shipper_headers)
+    assert response.status_code == 200
+    assert [(o["order_id"], o["risk"]) for o in response.json()] == [(overdue, "overdue")]
+
+    assert client.get("/api/v1/orders/at-risk", headers=carrier_headers).json() == []
+
+class _Leader:
+    def __init__(self, leads: bool):
+        self.leads = leads
+
+    def acquire(self) -> bool:
+        return self.leads
+
+    def release(self) -> None:
+        pass
+
+def test_at_risk_endpoint_reads_the_database_without_the_monitor(client, db, shipper, shipper_headers):
+    overdue = create_due_order(client, shipper_headers, timedelta(hours=-1))
+    at_risk = create_due_order(client, shipper_headers, timedelta(minutes=30))
+    create_due_order(client, shipper_headers, timedelta(days=3))
+
+    response = client.get("/api/v1/orders/at-risk", headers=shipper_headers)
+    assert response.status_code == 200
+    assert [(o["order_id"], o["risk"]) for o in response.json()] == [(overdue, "overdue"), (at_risk, "at_risk")]
+
+def test_only_the_leader_polls_and_notifies(client, shipper, shipper_headers):
+    order_id = create_due_order(client, shipper_headers, timedelta(hours=-1))
+    monitors, notified = {}, {}
+    for leads in (True, False):
+        monitor = monitors[leads] = SlaMonitor(at_risk_window=timedelta(hours=2))
+        seen = notified[leads] = []
+        monitor.subscribe(seen.append)
+        SlaScheduler(monitor, TestingSessionLocal, interval=60, leader=_Leader(leads)).tick()
+
+    assert [event.order_id for event in notified[True]] == [order_id]
+    assert [event.order_id for event in monitors[True].at_risk(shipper_id=shipper.id)] == [order_id]
+    # Followers stay idle, and /at-risk reads the database in their workers
+    assert notified[False] == []
+    assert not monitors[False].loaded
+
+def test_a_demoted_worker_forgets_its_monitor(client, shipper, shipper_headers):
+    create_due_order(client, shipper_headers, timedelta(hours=-1))
+    monitor = SlaMonitor(at_risk_window=timedelta(hours=2))
+    leader = _Leader(True)
+    scheduler = SlaScheduler(monitor, TestingSessionLocal, interval=60, leader=leader)
+    scheduler.tick()
+    assert monitor.loaded
+
+    leader.leads = False
+    scheduler.tick()
+    assert not monitor.loaded
+    assert monitor.at_risk() == []
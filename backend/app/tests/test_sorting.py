@@ -0,0 +1,30 @@
+from app.tests.conftest import create_order, create_orders
+
+def test_available_orders_sort_by_weight_with_id_tie_break(client, shipper_headers, carrier_headers):
+    orders = [create_order(client, shipper_headers, weight=weight) for weight in [5.0, 1.0, 5.0, 3.0]]
+
+    page = client.get("/api/v1/orders/available?sort=weight&fields=weight", headers=carrier_headers).json()
+    assert [order["id"] for order in page["items"]] == [
+        orders[1]["id"], orders[3]["id"], orders[0]["id"], orders[2]["id"]
+    ]
+
+    page = client.get("/api/v1/orders/available?sort=-weight&fields=weight", headers=carrier_headers).json()
+    assert [order["id"] for order in page["items"]] == [
+        orders[2]["id"], orders[0]["id"], orders[3]["id"], orders[1]["id"]
+    ]
+
+def test_sorted_pages_do_not_overlap(client, shipper_headers):
+    create_orders(client, shipper_headers, 5, weight=2.0)
+
+    seen = []
+    for page in (1, 2, 3):
+        response = client.get(
+            f"/api/v1/orders/my-shipments?sort=weight&page_size=2&page={page}", headers=shipper_headers
+        )
+        seen.extend(order["id"] for order in response.json()["items"])
+    assert seen == sorted(seen)
+    assert len(set(seen)) == 5
+
+def test_unknown_sort_is_rejected(client, carrier_headers):
+    response = client.get("/api/v1/orders/available?sort=customer_email", headers=carrier_headers)
+    assert response.status_code == 400
@@ -0,0 +1,62 @@
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.core.static import FrontendStaticFiles, IMMUTABLE_CACHE_CONTROL
+from precompress_static import precompress_static
+
+SCRIPT = b"console.log('unlodin');\n" * 200
+
+@pytest.fixture
+def static_client(tmp_path):
+    (tmp_path / "assets").mkdir()
+    (tmp_path / "index.html").write_bytes(b"<html><body>" + b"<div></div>" * 200 + b"</body></html>")
+    (tmp_path / "assets" / "index-3f2a1b.js").write_bytes(SCRIPT)
+    precompress_static(str(tmp_path))
+
+    app = FastAPI()
+
+    @app.get("/api/ping")
+    def ping():
+        return {"pong": True}
+
+    app.mount("/", FrontendStaticFiles(
+        directory=str(tmp_path), excluded_prefixes=("/api", "/health")
+    ), name="frontend")
+    return TestClient(app)
+
+def test_serves_precompressed_variant(static_client):
+    response = static_client.get("/assets/index-3f2a1b.js", headers={"Accept-Encoding": "gzip"})
+
+    assert response.status_code == 200
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.headers["content-type"].startswith("text/javascript")
+    assert response.headers["cache-control"] == IMMUTABLE_CACHE_CONTROL
+    assert response.content == SCRIPT
+
+def test_serves_plain_file_without_accept_encoding(static_client):
+    response = static_client.get("/assets/index-3f2a1b.js", headers={"Accept-Encoding": ""})
+
+    assert "content-encoding" not in response.headers
+    assert response.content == SCRIPT
+
+def test_client_routes_fall_back_to_index(static_client):
+    response = static_client.get("/orders/42")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/html")
+    assert response.headers["cache-control"] == "no-cache"
+    assert static_client.get("/missing.js").status_code == 404
+    assert static_client.get("/api/ping").json() == {"pong": True}
+
+def test_unknown_api_paths_are_not_found(static_client):
+    assert static_client.get("/api/missing").status_code == 404
+    assert static_client.get("/health/missing").status_code == 404
+    assert static_client.get("/apiary").headers["content-type"].startswith("text/html")
+
+def test_precompressed_variant_revalidates_with_etag(static_client):
+    headers = {"Accept-Encoding": "gzip"}
+    etag = static_client.get("/", headers=headers).headers["etag"]
+
+    response = static_client.get("/", headers={**headers, "If-None-Match": etag})
+    assert response.status_code == 304
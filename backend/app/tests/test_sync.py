@@ -0,0 +1,86 @@
+from datetime import datetime, timedelta, timezone
+
+from app.models.order import Order, OrderStatus
+from app.services import archive as archive_service
+from app.services import order as order_service
+from app.tests.conftest import create_accepted_orders
+
+URL = "/api/v1/orders/my-deliveries/changes"
+
+# Recent enough for the tombstones to be kept
+START = (datetime.now(timezone.utc) - timedelta(days=1)).replace(tzinfo=None, microsecond=0)
+
+def spread_updated_at(db, order_ids, start):
+    # Further apart than the re-read overlap
+    for offset, order_id in enumerate(order_ids):
+        db.query(Order).filter(Order.id == order_id).update({"updated_at": start + timedelta(minutes=offset)})
+    db.commit()
+
+def test_sync_returns_only_changes_since_the_watermark(client, db, shipper_headers, carrier_headers):
+    order_ids = create_accepted_orders(client, shipper_headers, carrier_headers, 3)
+    spread_updated_at(db, order_ids, START)
+
+    full = client.get(URL, headers=carrier_headers).json()
+    assert [o["id"] for o in full["orders"]] == order_ids
+    assert len(full["orders"][0]["items"]) == 1
+    assert full["has_more"] is False
+
+    watermark = full["watermark"]
+    # Only the overlap before the watermark is read again
+    again = client.get(URL, headers=carrier_headers, params={"since": watermark}).json()
+    assert [o["id"] for o in again["orders"]] == [order_ids[2]]
+    assert again["watermark"] == watermark
+
+    db.query(Order).filter(Order.id == order_ids[0]).update({"updated_at": START + timedelta(hours=1)})
+    db.commit()
+    order_service.delete(db, order_ids[1])
+
+    delta = client.get(URL, headers=carrier_headers, params={"since": watermark}).json()
+    assert [o["id"] for o in delta["orders"]] == [order_ids[2], order_ids[0]]
+    assert delta["deleted"] == [order_ids[1]]
+    assert delta["watermark"] > watermark
+
+def test_sync_pages_never_split_a_timestamp(client, db, shipper_headers, carrier_headers):
+    order_ids = create_accepted_orders(client, shipper_headers, carrier_headers, 4)
+    spread_updated_at(db, order_ids, START)
+    # The second and third orders share a timestamp
+    db.query(Order).filter(Order.id == order_ids[2]).update({"updated_at": START + timedelta(minutes=1)})
+    db.commit()
+
+    first = client.get(URL, headers=carrier_headers, params={"limit": 2}).json()
+    assert [o["id"] for o in first["orders"]] == [order_ids[0]]
+    assert first["has_more"] is True
+
+    second = client.get(URL, headers=carrier_headers, params={"limit": 2, "since": first["watermark"]}).json()
+    assert [o["id"] for o in second["orders"]] == [order_ids[0]] + order_ids[1:3]
+
+    third = client.get(URL, headers=carrier_headers, params={"limit": 2, "since": second["watermark"]}).json()
+    assert [o["id"] for o in third["orders"]] == order_ids[1:4]
+    assert third["has_more"] is False
+
+def test_sync_picks_up_writes_that_commit_behind_the_watermark(client, db, shipper_headers, carrier_headers):
+    order_ids = create_accepted_orders(client, shipper_headers, carrier_headers, 2)
+    spread_updated_at(db, order_ids, START)
+    watermark = client.get(URL, headers=carrier_headers).json()["watermark"]
+
+    # A slow transaction stamped a second before the watermark commits only now
+    db.query(Order).filter(Order.id == order_ids[0]).update({"updated_at": START + timedelta(seconds=59)})
+    db.commit()
+
+    delta = client.get(URL, headers=carrier_headers, params={"since": watermark}).json()
+    assert order_ids[0] in [o["id"] for o in delta["orders"]]
+
+def test_archived_orders_are_synced_as_deleted(client, db, shipper_headers, carrier_headers):
+    order_ids = create_accepted_orders(client, shipper_headers, carrier_headers, 2)
+    spread_updated_at(db, order_ids, START)
+    watermark = client.get(URL, headers=carrier_headers).json()["watermark"]
+    db.query(Order).filter(Order.id == order_ids[0]).update({"status": OrderStatus.DELIVERED})
+    db.commit()
+
+    archive_service.archive_terminal_orders(db, older_than_days=-1)
+
+    delta = client.get(URL, headers=carrier_headers, params={"since": watermark}).json()
+    assert delta["deleted"] == [order_ids[0]]
+
+def test_sync_is_carrier_only(client, shipper_headers):
+    assert client.get(URL, headers=shipper_headers).status_code == 403
@@ -0,0 +1,114 @@
+from datetime import datetime, timedelta, timezone
+
+from app.models.order_position import OrderPosition
+from app.services import telemetry
+from app.services.telemetry import Fix, PositionRing, position_ring, position_writer
+from app.tests.conftest import order_payload
+from app.tests.test_permissions import captured_statements
+
+POSITIONS = "/api/v1/orders/positions:batch"
+# An hour ago, so the fixes fall inside the accepted window around server time
+START = (datetime.now(timezone.utc) - timedelta(hours=1)).replace(microsecond=0)
+
+def _point(order_id, minutes, latitude=52.5, longitude=13.4, **extra):
+    recorded_at = (START + timedelta(minutes=minutes)).isoformat()
+    return dict(order_id=order_id, latitude=latitude, longitude=longitude, recorded_at=recorded_at, **extra)
+
+def _order_in_transit(client, shipper_headers, carrier_headers):
+    order = client.post("/api/v1/orders/", headers=shipper_headers, json=order_payload()).json()
+    order = client.post(f"/api/v1/orders/{order['id']}/accept", headers=carrier_headers).json()
+    client.patch(f"/api/v1/orders/{order['id']}/status", headers=carrier_headers, json={"status": "PICKED_UP"})
+    return order
+
+def test_ring_keeps_each_orders_latest_fix_until_overwritten():
+    ring = PositionRing(capacity=3)
+    ring.record([Fix(1, 7, 1.0, 1.0, 100.0), Fix(2, 7, 2.0, 2.0, 100.0), Fix(1, 7, 1.5, 1.5, 110.0)])
+    # A late fix doesn't replace the newer one
+    ring.record([Fix(1, 7, 9.0, 9.0, 105.0)])
+    assert ring.latest(1) == Fix(1, 7, 1.5, 1.5, 110.0)
+
+    # Two more fixes wrap around and overwrite order 2's only fix
+    ring.record([Fix(3, 7, 3.0, 3.0, 100.0, speed_kmh=42.0), Fix(4, 7, 4.0, 4.0, 100.0)])
+    assert ring.latest(2) is None
+    assert ring.latest(3).speed_kmh == 42.0 and ring.latest(3).heading is None
+    assert len(ring) == 3
+
+def test_carrier_reports_positions_and_tracking_serves_the_latest(client, db, shipper_headers, carrier_headers):
+    order = _order_in_transit(client, shipper_headers, carrier_headers)
+    accepted = client.post("/api/v1/orders/", headers=shipper_headers, json=order_payload()).json()
+    accepted = client.post(f"/api/v1/orders/{accepted['id']}/accept", headers=carrier_headers).json()
+
+    response = client.post(POSITIONS, headers=carrier_headers, json={"points": [
+        _point(order["id"], 1), _point(order["id"], 2, latitude=52.6, heading=90.0),
+        _point(accepted["id"], 1), _point(999999, 1),
+    ]})
+    assert response.status_code == 202
+    result = response.json()
+    assert result["accepted"] == 2
+    assert [(rejection["order_id"], rejection["error"]) for rejection in result["rejected"]] == [
+        (accepted["id"], "invalid_status"), (999999, "not_found")
+    ]
+
+    with captured_statements() as statements:
+        tracked = client.get(f"/api/v1/orders/track/{order['tracking_number']}", headers=carrier_headers).json()
+    assert tracked["position"]["latitude"] == 52.6 and tracked["position"]["heading"] == 90.0
+    assert not any("order_positions" in statement for statement in statements)
+    assert client.get(f"/api/v1/orders/track/{accepted['tracking_number']}", headers=carrier_headers).json()["position"] is None
+
+def test_history_is_written_in_bulk_once_per_fix(client, db, shipper_headers, carrier_headers):
+    order = _order_in_transit(client, shipper_headers, carrier_headers)
+    batch = {"points": [_point(order["id"], minute) for minute in range(3)]}
+    client.post(POSITIONS, headers=carrier_headers, json=batch)
+    assert db.query(OrderPosition).count() == 0
+
+    # A retried batch is stored once
+    client.post(POSITIONS, headers=carrier_headers, json=batch)
+    with captured_statements() as statements:
+        assert position_writer.flush(db) == 6
+    assert sum("INSERT INTO order_positions" in statement for statement in statements) == 1
+    assert db.query(OrderPosition).count() == 3
+
+def test_position_taken_by_another_worker_comes_from_the_shared_cache(client, shipper_headers, carrier_headers):
+    order = _order_in_transit(client, shipper_headers, carrier_headers)
+    client.post(POSITIONS, headers=carrier_headers, json={"points": [_point(order["id"], 5)]})
+    position_ring.reset()
+
+    fix = telemetry.latest_position(order["id"])
+    assert fix.latitude == 52.5 and fix.recorded_at == (START + timedelta(minutes=5)).timestamp()
+
+def test_full_buffer_and_other_accounts_are_turned_away(client, shipper_headers, carrier_headers, monkeypatch):
+    order = _order_in_transit(client, shipper_headers, carrier_headers)
+    batch = {"points": [_point(order["id"], 1), _point(order["id"], 2)]}
+    assert client.post(POSITIONS, headers=shipper_headers, json=batch).status_code == 403
+
+    monkeypatch.setattr(position_writer, "max_buffered", 1)
+    response = client.post(POSITIONS, headers=carrier_headers, json=batch)
+    assert response.status_code == 503
+    assert "Retry-After" in response.headers
+
+def test_fixes_far_from_server_time_are_rejected(client, shipper_headers, carrier_headers):
+    order = _order_in_transit(client, shipper_headers, carrier_headers)
+    response = client.post(POSITIONS, headers=carrier_headers, json={"points": [
+        _point(order["id"], 1),
+        # A wrong device clock would otherwise pin the latest position for good
+        dict(_point(order["id"], 0), recorded_at="9999-12-31T23:59:59+00:00"),
+        dict(_point(order["id"], 0), recorded_at="2001-01-01T00:00:00+00:00"),
+    ]})
+
+    result = response.json()
+    assert result["accepted"] == 1
+    assert [(rejection["order_id"], rejection["error"]) for rejection in result["rejected"]] == [
+        (order["id"], "invalid_recorded_at")
+    ]
+    assert telemetry.latest_position(order["id"]).recorded_at == (START + timedelta(minutes=1)).timestamp()
+
+def test_fixes_that_fail_to_write_are_dropped(client, db, shipper_headers, carrier_headers, monkeypatch):
+    order = _order_in_transit(client, shipper_headers, carrier_headers)
+    client.post(POSITIONS, headers=carrier_headers, json={"points": [_point(order["id"], 1), _point(order["id"], 2)]})
+
+    def refuse(db):
+        raise RuntimeError("database refused the batch")
+
+    monkeypatch.setattr(telemetry, "_insert", refuse)
+    assert position_writer.flush(db) == 0
+    assert (len(position_writer), position_writer.dropped) == (0, 2)
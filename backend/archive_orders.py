@@ -0,0 +1,24 @@
+import argparse
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.services import archive as archive_service
+
+def archive_orders(older_than_days: int, batch_size: int):
+    """Move old delivered and cancelled orders into the archive tables."""
+    db = SessionLocal()
+    try:
+        archived = archive_service.archive_terminal_orders(
+            db, older_than_days=older_than_days, batch_size=batch_size
+        )
+        print(f"Archived {archived} orders older than {older_than_days} days.")
+        return archived
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=archive_orders.__doc__)
+    parser.add_argument("--days", type=int, default=settings.ARCHIVE_AFTER_DAYS)
+    parser.add_argument("--batch-size", type=int, default=settings.ARCHIVE_BATCH_SIZE)
+    args = parser.parse_args()
+    archive_orders(args.days, args.batch_size)
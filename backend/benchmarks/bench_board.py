@@ -0,0 +1,65 @@
+"""
+Available-board pages from the in-memory board against the read-model query.
+
+Seeds orders (about half unassigned), loads the board, and times pages of 20
+at several depths and sorts both ways, plus the cost of a create/assign event
+and of a full reload.
+
+    python -m benchmarks.bench_board
+"""
+import time
+
+from app.core.config import settings
+from app.services import order as order_service
+from app.services import read_model
+from app.services.board import OrderBoard, order_board
+from benchmarks.common import make_session_factory, seed, timed
+
+ORDERS = 50_000
+PAGE_SIZE = 20
+REPEAT = 200
+
+def main():
+    SessionLocal = make_session_factory()
+    db = SessionLocal()
+    seed(db, orders=ORDERS)
+    read_model.rebuild(db)
+    settings.COALESCE_READS = False
+
+    start = time.perf_counter()
+    order_board.load(db)
+    print(f"loaded {len(order_board)} unassigned orders in {(time.perf_counter() - start) * 1000:.0f} ms\n")
+
+    print(f"{'sort':<20} {'page':>6} {'database ms':>12} {'board ms':>9}")
+    for sort in ("-created_at", "weight", "-total_amount"):
+        for page in (1, 100, 1000):
+            skip = (page - 1) * PAGE_SIZE
+
+            def from_database():
+                order_board.reset()
+                return order_service.get_available_orders(db, skip, PAGE_SIZE, sort=sort, from_read_model=True)
+
+            def from_board():
+                return order_service.get_available_orders(db, skip, PAGE_SIZE, sort=sort, from_read_model=True)
+
+            database_ms = timed(from_database, REPEAT // 10)
+            order_board.load(db)
+            board_ms = timed(from_board, REPEAT)
+            print(f"{sort:<20} {page:>6} {database_ms:>12.3f} {board_ms:>9.4f}")
+
+    # Event cost: take an order off the board and put it back
+    rows = read_model.refresh(db, [order_board.page(0, 1, "created_at", False).items[0].id])
+    db.commit()
+    assigned = [dict(row, is_assigned=True) for row in rows]
+
+    def event():
+        order_board.upsert(assigned)
+        order_board.upsert(rows)
+
+    print(f"\nassign + unassign event: {timed(event, REPEAT) * 1000 / 2:.1f} us")
+    board = OrderBoard()
+    print(f"full reload: {timed(lambda: board.load(db), 5):.0f} ms")
+    db.close()
+
+if __name__ == "__main__":
+    main()
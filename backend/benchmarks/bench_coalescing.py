@@ -0,0 +1,77 @@
+"""
+Shift-start stampede on the available board, with and without read coalescing.
+
+Many carriers load `/orders/available?page=1` at the same instant. Each thread
+uses its own session and connection to a file-backed SQLite database, like
+request threads in one worker, and runs the board's count, page and item
+queries through the service layer. Reports wall time, statements executed and
+how many calls were coalesced.
+
+    python -m benchmarks.bench_coalescing
+"""
+import os
+import tempfile
+import threading
+import time
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+from app.core import singleflight
+from app.core.config import settings
+from app.services import order as order_service
+from benchmarks.common import make_session_factory, seed
+
+CONCURRENCY = (10, 50, 200)
+
+def stampede(SessionLocal, carriers: int) -> float:
+    barrier = threading.Barrier(carriers)
+
+    def load_board():
+        db = SessionLocal()
+        try:
+            barrier.wait()
+            page = order_service.get_available_orders(db, skip=0, limit=20)
+            order_service.get_items_for_orders(db, [order.id for order in page.items])
+        finally:
+            db.close()
+
+    threads = [threading.Thread(target=load_board) for _ in range(carriers)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return (time.perf_counter() - start) * 1000
+
+def main():
+    with tempfile.TemporaryDirectory() as directory:
+        url = f"sqlite:///{os.path.join(directory, 'bench.db')}"
+        seeding = make_session_factory(url)()
+        seed(seeding, orders=50_000)
+        seeding.close()
+
+        engine = create_engine(
+            url, connect_args={"check_same_thread": False}, pool_size=20, max_overflow=200
+        )
+        statements = []
+        event.listen(engine, "before_cursor_execute", lambda *args: statements.append(1))
+        SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+        print(f"{'carriers':>8} {'coalescing':<11} {'ms':>9} {'queries':>8} {'coalesced':>10}")
+        for carriers in CONCURRENCY:
+            for enabled in (False, True):
+                settings.COALESCE_READS = enabled
+                for flights in (order_service.available_flights, order_service.items_flights):
+                    flights.reset()
+                stampede(SessionLocal, carriers)  # warm the pool and page cache
+                statements.clear()
+                for flights in (order_service.available_flights, order_service.items_flights):
+                    flights.reset()
+                elapsed = stampede(SessionLocal, carriers)
+                coalesced = sum(stats.coalesced for stats in singleflight.all_stats().values())
+                print(f"{carriers:>8} {'on' if enabled else 'off':<11} {elapsed:>9.1f} "
+                      f"{len(statements):>8} {coalesced:>10}")
+
+if __name__ == "__main__":
+    main()
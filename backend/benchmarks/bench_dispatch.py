@@ -0,0 +1,90 @@
+"""
+Batch dispatch: solve time per solver at 1K orders x 100 carriers and
+50K orders x 2K carriers, and a full engine run (load, solve, assign) on a
+seeded database.
+
+The exact solver needs scipy and the greedy one runs vectorized with numpy;
+the pure-Python fallback is only timed at the small size.
+
+    python -m benchmarks.bench_dispatch
+"""
+import random
+import time
+
+from app.services import dispatch
+from app.services.dispatch import DispatchEngine, DispatchProblem
+from benchmarks.common import make_session_factory, seed
+
+SIZES = ((1_000, 100), (50_000, 2_000))
+CAPACITY = 5
+
+def make_problem(orders: int, carriers: int, seed_value: int = 42) -> DispatchProblem:
+    rng = random.Random(seed_value)
+    area = dispatch.AREA_KM
+    return DispatchProblem(
+        order_ids=list(range(orders)),
+        pickups=[(rng.uniform(0, area), rng.uniform(0, area)) for _ in range(orders)],
+        hours_left=[rng.uniform(-4, 96) for _ in range(orders)],
+        trip_km=[rng.uniform(1, 60) for _ in range(orders)],
+        carrier_ids=list(range(carriers)),
+        positions=[
+            (rng.uniform(0, area), rng.uniform(0, area)) if rng.random() < 0.9 else None
+            for _ in range(carriers)
+        ],
+        loads=[rng.randint(0, CAPACITY - 1) for _ in range(carriers)],
+        capacity=CAPACITY,
+    )
+
+def total_cost(problem: DispatchProblem, matches) -> float:
+    rows = {order_id: row for row, order_id in enumerate(problem.order_ids)}
+    columns = {carrier_id: column for column, carrier_id in enumerate(problem.carrier_ids)}
+    return sum(
+        dispatch._python_costs(problem, dispatch.Weights(), rows[order_id], [columns[carrier_id]])[0]
+        for order_id, carrier_id in matches.items()
+    )
+
+def solve_with(problem: DispatchProblem, solver: str):
+    exact_max_cells, np = dispatch.EXACT_MAX_CELLS, dispatch.np
+    if solver != "exact":
+        dispatch.EXACT_MAX_CELLS = 0
+    if solver == "python":
+        dispatch.np = None
+    try:
+        start = time.perf_counter()
+        matches = dispatch.solve(problem)
+        return matches, (time.perf_counter() - start) * 1000
+    finally:
+        dispatch.EXACT_MAX_CELLS, dispatch.np = exact_max_cells, np
+
+def main():
+    dispatch._import_numeric()
+    print(f"numpy: {'yes' if dispatch.np is not None else 'no'}, "
+          f"scipy: {'yes' if dispatch.linear_sum_assignment is not None else 'no'}\n")
+    print(f"{'orders x carriers':<20} {'solver':<8} {'assigned':>9} {'cost/order':>11} {'ms':>9}")
+    for orders, carriers in SIZES:
+        problem = make_problem(orders, carriers)
+        small = orders * carriers <= 1_000_000
+        for solver in ("exact", "greedy", "python"):
+            if solver == "exact" and (dispatch.linear_sum_assignment is None or not small):
+                continue
+            if solver != "python" and dispatch.np is None:
+                continue
+            if solver == "python" and not small:
+                continue
+            matches, ms = solve_with(problem, solver)
+            cost = total_cost(problem, matches) / max(1, len(matches))
+            print(f"{orders:>8} x {carriers:<9} {solver:<8} {len(matches):>9} {cost:>11.2f} {ms:>9.1f}")
+
+    # End to end: about half of the seeded orders are open, the rest count as carrier load
+    SessionLocal = make_session_factory()
+    db = SessionLocal()
+    seed(db, orders=2_000, carriers=100)
+    start = time.perf_counter()
+    run = DispatchEngine(batch_size=5_000, capacity=20).run(db)
+    total_ms = (time.perf_counter() - start) * 1000
+    print(f"\nengine run: {run.assigned} of {run.orders} open orders to {run.carriers} carriers "
+          f"in {total_ms:.0f} ms (solve {run.solve_ms:.0f} ms)")
+    db.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""
+Bytes on the wire and encode CPU for order list pages.
+
+Compares JSON and MessagePack bodies, raw and compressed with gzip and brotli,
+for pages of 10 and 100 orders with two items each.
+
+    python -m benchmarks.bench_encoding
+"""
+from datetime import datetime, timedelta
+import json
+import timeit
+import zlib
+
+from fastapi.encoders import jsonable_encoder
+
+from app.core.compression import brotli
+from app.core.encoding import msgpack
+from app.core.config import settings
+from app.models.order import OrderStatus
+from app.schemas.order import Order
+from app.schemas.pagination import PaginatedResult
+
+def make_page(size: int) -> PaginatedResult[Order]:
+    now = datetime(2026, 1, 5, 9, 0)
+    orders = []
+    for i in range(size):
+        orders.append(Order(
+            id=i + 1,
+            order_number=f"ORD-{i:08X}",
+            shipper_id=7,
+            carrier_id=None,
+            is_assigned=False,
+            tracking_number=None,
+            status=OrderStatus.PENDING,
+            customer_name="Jane Customer",
+            customer_email="jane.customer@example.com",
+            customer_phone="+1-555-0100",
+            pickup_location=f"Warehouse {i % 12}, 12 Industrial Way, Springfield",
+            delivery_location=f"{100 + i} Main Street, Shelbyville",
+            pickup_date=now,
+            delivery_deadline=now + timedelta(days=2),
+            package_description="Boxed household goods",
+            weight=2.5 + i,
+            dimensions="40x30x20",
+            total_amount=99.99,
+            payment_status="unpaid",
+            created_at=now,
+            updated_at=now,
+            items=[
+                {
+                    "id": i * 2 + n,
+                    "order_id": i + 1,
+                    "product_name": f"Product {n}",
+                    "product_sku": f"SKU-{n:04d}",
+                    "quantity": n + 1,
+                    "unit_price": 49.99,
+                    "created_at": now,
+                    "updated_at": now,
+                }
+                for n in range(2)
+            ],
+        ))
+    return PaginatedResult[Order].create(items=orders, total=size * 10, page=1, page_size=size)
+
+def encoders():
+    def to_json(page):
+        return json.dumps(jsonable_encoder(page), separators=(",", ":")).encode()
+
+    def gzip(body):
+        compressor = zlib.compressobj(settings.GZIP_LEVEL, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+        return compressor.compress(body) + compressor.flush()
+
+    yield "json", to_json
+    yield "json+gzip", lambda page: gzip(to_json(page))
+    if brotli is not None:
+        yield "json+br", lambda page: brotli.compress(to_json(page), quality=settings.BROTLI_QUALITY)
+    if msgpack is not None:
+        def to_msgpack(page):
+            return msgpack.packb(jsonable_encoder(page), use_bin_type=True)
+        yield "msgpack", to_msgpack
+        yield "msgpack+gzip", lambda page: gzip(to_msgpack(page))
+
+def main():
+    print(f"{'page':>5} {'encoding':<14} {'bytes':>9} {'encode ms':>10}")
+    for size in (10, 100):
+        page = make_page(size)
+        for name, encode in encoders():
+            body = encode(page)
+            runs = 200 if size == 10 else 40
+            seconds = timeit.timeit(lambda: encode(page), number=runs) / runs
+            print(f"{size:>5} {name:<14} {len(body):>9} {seconds * 1000:>10.3f}")
+
+if __name__ == "__main__":
+    main()
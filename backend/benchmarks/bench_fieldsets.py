@@ -0,0 +1,38 @@
+"""
+Per-page latency of full order pages versus sparse fieldsets.
+
+Times the service query, item loading and serialization of one page for
+`GET /orders/my-shipments` with and without `fields=summary`.
+
+    python -m benchmarks.bench_fieldsets
+"""
+from fastapi.encoders import jsonable_encoder
+
+from app.api.v1.endpoints.orders import column_fields, render_orders_page, requested_fields
+from app.services import order as order_service
+from benchmarks.common import make_session_factory, seed, timed
+
+def main():
+    SessionLocal = make_session_factory()
+    db = SessionLocal()
+    shipper, _ = seed(db, orders=20_000)
+
+    print(f"{'page':>5} {'fields':<16} {'ms/page':>9}")
+    for page_size in (10, 100):
+        for fields_param in (None, "summary", "summary,items"):
+            fields = requested_fields(fields_param)
+
+            def load_page():
+                page = order_service.get_multi(
+                    db, shipper_id=shipper.id, skip=page_size * 5, limit=page_size,
+                    fields=column_fields(fields),
+                )
+                response = render_orders_page(db, page, fields, use_msgpack=False)
+                return response.body if fields else jsonable_encoder(response)
+
+            load_page()
+            print(f"{page_size:>5} {fields_param or 'full':<16} {timed(load_page, 30):>9.2f}")
+            db.expire_all()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+"""
+List pages served from the orders tables against the denormalized read model.
+
+Renders `my-shipments` pages of 100 orders through the endpoint's render path,
+once assembled from `orders` plus `order_items` and once from pre-serialized
+`order_read_model` rows, and reports milliseconds and statements per page.
+
+    python -m benchmarks.bench_read_model
+"""
+from sqlalchemy import event
+
+from app.api.v1.endpoints.orders import render_orders_page
+from app.core.config import settings
+from app.schemas.order import SUMMARY_FIELDS
+from app.services import order as order_service
+from app.services import read_model
+from benchmarks.common import make_session_factory, seed, timed
+
+PAGE_SIZE = 100
+REPEAT = 50
+
+def main():
+    SessionLocal = make_session_factory()
+    db = SessionLocal()
+    shipper, _ = seed(db, orders=20_000, items_per_order=3)
+    shipper_id = shipper.id
+    read_model.rebuild(db)
+
+    statements = []
+    event.listen(db.get_bind(), "before_cursor_execute", lambda *args: statements.append(1))
+
+    print(f"{'fields':<9} {'source':<11} {'ms/page':>8} {'queries':>8}")
+    for fields in (None, list(SUMMARY_FIELDS)):
+        for enabled in (False, True):
+            settings.READ_MODEL_ENABLED = enabled
+
+            def render_page():
+                page = order_service.get_multi(
+                    db, shipper_id=shipper_id, skip=PAGE_SIZE * 10, limit=PAGE_SIZE,
+                    fields=fields, facets=True, from_read_model=enabled
+                )
+                response = render_orders_page(db, page, fields, use_msgpack=False)
+                if enabled or fields is not None:
+                    return response.body
+                # The legacy full-order path returns the model for FastAPI to encode
+                return response.model_dump_json()
+
+            render_page()
+            statements.clear()
+            elapsed = timed(render_page, REPEAT)
+            print(f"{'summary' if fields else 'full':<9} {'read model' if enabled else 'orders':<11} "
+                  f"{elapsed:>8.2f} {len(statements) / REPEAT:>8.0f}")
+    db.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+"""
+Throughput of the old and new ways of running the service.
+
+Starts each server configuration in turn and drives it with several client
+processes over keep-alive connections, for the liveness endpoint and for a
+~200KB frontend bundle:
+
+- before: single `uvicorn` process (asyncio + h11) for the API and
+  `python -m http.server` for the frontend, as the old start.sh did
+- after: gunicorn with one uvicorn worker per CPU (uvloop + httptools when
+  installed), serving the frontend from FastAPI with precompressed variants
+
+    python -m benchmarks.bench_server
+"""
+import http.client
+import multiprocessing
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+from precompress_static import precompress_static
+
+DURATION = 5.0
+CLIENTS = 8
+API_PORT = 8766
+STATIC_PORT = 8767
+BUNDLE = "assets/index-3f2a1b.js"
+
+def make_frontend(directory):
+    os.makedirs(os.path.join(directory, "assets"))
+    with open(os.path.join(directory, "index.html"), "w") as f:
+        f.write("<!doctype html><html><body><div id=root></div></body></html>")
+    with open(os.path.join(directory, BUNDLE), "w") as f:
+        for i in range(4000):
+            f.write(f"export function component{i}(props) {{ return props.value + {i}; }}\n")
+    precompress_static(directory)
+
+def client(port, path, headers, duration, results):
+    connection = http.client.HTTPConnection("127.0.0.1", port)
+    count = size = 0
+    deadline = time.perf_counter() + duration
+    while time.perf_counter() < deadline:
+        try:
+            connection.request("GET", path, headers=headers)
+            response = connection.getresponse()
+            body = response.read()
+        except (http.client.HTTPException, OSError):
+            # Workers being recycled drop their keep-alive connections
+            connection.close()
+            connection = http.client.HTTPConnection("127.0.0.1", port)
+            continue
+        if response.status == 200:
+            count += 1
+            size = len(body)
+        # http.server speaks HTTP/1.0 and closes the connection after each response
+        if response.will_close:
+            connection.close()
+            connection = http.client.HTTPConnection("127.0.0.1", port)
+    results.put((count, size))
+
+def throughput(port, path, headers=None):
+    results = multiprocessing.Queue()
+    workers = [
+        multiprocessing.Process(target=client, args=(port, path, headers or {}, DURATION, results))
+        for _ in range(CLIENTS)
+    ]
+    for worker in workers:
+        worker.start()
+    outcomes = [results.get() for _ in workers]
+    for worker in workers:
+        worker.join()
+    return sum(count for count, _ in outcomes) / DURATION, max(size for _, size in outcomes)
+
+def wait_until_up(port, path, timeout=30.0):
+    deadline = time.perf_counter() + timeout
+    while time.perf_counter() < deadline:
+        try:
+            connection = http.client.HTTPConnection("127.0.0.1", port, timeout=1)
+            connection.request("GET", path)
+            if connection.getresponse().status == 200:
+                return
+        except OSError:
+            time.sleep(0.05)
+    raise RuntimeError(f"Server on port {port} did not come up")
+
+def start(command, env=None, cwd=None):
+    return subprocess.Popen(
+        command, env={**os.environ, **(env or {})}, cwd=cwd,
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+
+def stop(*processes):
+    for process in processes:
+        process.terminate()
+        process.wait()
+
+def main():
+    env = {"RATE_LIMIT_ENABLED": "false", "MAX_IN_FLIGHT_REQUESTS": "0", "ACCESS_LOG": ""}
+    gzip_headers = {"Accept-Encoding": "gzip"}
+    with tempfile.TemporaryDirectory() as frontend:
+        make_frontend(frontend)
+        rows = []
+
+        api = start(
+            [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(API_PORT),
+             "--loop", "asyncio", "--http", "h11", "--log-level", "warning", "--no-access-log"],
+            env=env,
+        )
+        static = start([sys.executable, "-m", "http.server", str(STATIC_PORT)], cwd=frontend)
+        try:
+            wait_until_up(API_PORT, "/health/live")
+            wait_until_up(STATIC_PORT, "/" + BUNDLE)
+            rows.append(("before", "/health/live", *throughput(API_PORT, "/health/live")))
+            rows.append(("before", BUNDLE, *throughput(STATIC_PORT, "/" + BUNDLE, gzip_headers)))
+        finally:
+            stop(api, static)
+
+        server = start(
+            [sys.executable, "-m", "gunicorn", "-c", "gunicorn.conf.py", "app.main:app",
+             "--bind", f"127.0.0.1:{API_PORT}"],
+            env={**env, "STATIC_DIR": frontend},
+        )
+        try:
+            wait_until_up(API_PORT, "/health/live")
+            rows.append(("after", "/health/live", *throughput(API_PORT, "/health/live")))
+            rows.append(("after", BUNDLE, *throughput(API_PORT, "/" + BUNDLE, gzip_headers)))
+        finally:
+            stop(server)
+
+    print(f"{CLIENTS} keep-alive clients, {DURATION:.0f}s per run, {multiprocessing.cpu_count()} CPUs")
+    print(f"{'setup':<8} {'path':<26} {'req/sec':>10} {'bytes/response':>15}")
+    for setup, path, rate, size in rows:
+        print(f"{setup:<8} {path:<26} {rate:>10.0f} {size:>15}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""
+Shared-memory cache against the per-process cache.
+
+First measures raw get/set throughput of both caches in one process. Then runs
+several worker processes that each serve the same stream of user lookups,
+loading a user on a miss with a simulated query, and reports how many loads
+each cache needs: the per-process cache warms once per worker, the shared
+cache once per host.
+
+    python -m benchmarks.bench_shm_cache
+"""
+import multiprocessing
+import os
+import random
+import tempfile
+import time
+
+from app.core.shm_cache import LocalCache, SharedMemoryCache
+
+OPERATIONS = 200_000
+WORKERS = 4
+USERS = 2000
+REQUESTS_PER_WORKER = 10_000
+QUERY_SECONDS = 0.0005
+VALUE = b'{"id": 1234, "name": "Carrier", "email": "carrier@example.com", "account_type": "carrier"}'
+
+def throughput(cache) -> tuple:
+    keys = [f"user:{index}" for index in range(2000)]
+    start = time.perf_counter()
+    for index in range(OPERATIONS):
+        cache.set(keys[index % len(keys)], VALUE, 60)
+    set_rate = OPERATIONS / (time.perf_counter() - start)
+    start = time.perf_counter()
+    for index in range(OPERATIONS):
+        cache.get(keys[index % len(keys)])
+    get_rate = OPERATIONS / (time.perf_counter() - start)
+    return set_rate, get_rate
+
+def serve(make_cache, seed: int, loads) -> None:
+    cache = make_cache()
+    rng = random.Random(seed)
+    for _ in range(REQUESTS_PER_WORKER):
+        key = f"user:{rng.randrange(USERS)}"
+        if cache.lookup(key) is None:
+            time.sleep(QUERY_SECONDS)
+            cache.add(key, VALUE, 60)
+            with loads.get_lock():
+                loads.value += 1
+
+def workers(make_cache) -> tuple:
+    loads = multiprocessing.Value("i", 0)
+    context = multiprocessing.get_context("fork")
+    processes = [context.Process(target=serve, args=(make_cache, seed, loads)) for seed in range(WORKERS)]
+    start = time.perf_counter()
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join()
+    return loads.value, time.perf_counter() - start
+
+def main() -> None:
+    path = os.path.join(tempfile.mkdtemp(), "bench-cache.bin")
+
+    print(f"{'cache':<8} {'set/s':>12} {'get/s':>12}")
+    for name, cache in (("local", LocalCache(8192)), ("mmap", SharedMemoryCache(path, 8192, 512))):
+        set_rate, get_rate = throughput(cache)
+        print(f"{name:<8} {set_rate:>12,.0f} {get_rate:>12,.0f}")
+    os.remove(path)
+
+    print(f"\n{WORKERS} workers x {REQUESTS_PER_WORKER} lookups over {USERS} users")
+    print(f"{'cache':<8} {'loads':>8} {'hit rate':>9} {'seconds':>8}")
+    total = WORKERS * REQUESTS_PER_WORKER
+    for name, make_cache in (
+        ("local", lambda: LocalCache(8192)),
+        ("mmap", lambda: SharedMemoryCache(path, 8192, 512)),
+    ):
+        loads, elapsed = workers(make_cache)
+        print(f"{name:<8} {loads:>8} {1 - loads / total:>9.1%} {elapsed:>8.2f}")
+    os.remove(path)
+
+if __name__ == "__main__":
+    main()
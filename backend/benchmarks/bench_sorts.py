@@ -0,0 +1,60 @@
+"""
+Deep-page latency of the available-board sorts, with and without their indexes.
+
+For each whitelisted sort, prints the query plan and the time to load one
+summary page at increasing depths. With the indexes the plan walks the sort's
+partial index and never builds a temporary B-tree; the second pass drops the
+indexes (all but the default created_at one) to show what each page would
+cost as a full sort.
+
+    python -m benchmarks.bench_sorts
+"""
+from sqlalchemy import text
+
+from app.models.order import Order
+from app.schemas.order import SUMMARY_FIELDS
+from app.services import order as order_service
+from benchmarks.common import make_session_factory, seed, timed
+
+DEPTHS = (1, 100, 1000)
+PAGE_SIZE = 20
+
+def page_query(db, sort, page):
+    query = order_service._select(db, list(SUMMARY_FIELDS)).filter(Order.is_assigned == False)
+    return query.order_by(*order_service._order_by(sort)).offset((page - 1) * PAGE_SIZE).limit(PAGE_SIZE)
+
+def plan(db, sort, label) -> str:
+    statement = page_query(db, sort, DEPTHS[-1]).statement.compile(
+        dialect=db.bind.dialect, compile_kwargs={"literal_binds": True}
+    )
+    # The label keeps sqlite3's statement cache from returning a plan made before the indexes were dropped
+    rows = db.connection().exec_driver_sql(f"EXPLAIN QUERY PLAN /* {label} */ {statement}").fetchall()
+    return "; ".join(row[-1] for row in rows)
+
+def run(db, label):
+    print(f"\n{label}")
+    print(f"{'sort':<20} " + " ".join(f"{'page ' + str(depth):>10}" for depth in DEPTHS) + "  plan")
+    for name in order_service.SORT_COLUMNS:
+        for sort in (name, f"-{name}"):
+            timings = []
+            for depth in DEPTHS:
+                page = lambda: page_query(db, sort, depth).all()
+                page()
+                timings.append(timed(page, 10))
+            print(f"{sort:<20} " + " ".join(f"{ms:>8.2f}ms" for ms in timings) + f"  {plan(db, sort, label)}")
+
+def main():
+    SessionLocal = make_session_factory()
+    db = SessionLocal()
+    seed(db, orders=100_000, items_per_order=0)
+    db.execute(text("ANALYZE"))
+
+    run(db, "with sort indexes")
+    for name in order_service.SORT_COLUMNS:
+        if name != "created_at":
+            db.execute(text(f"DROP INDEX ix_orders_live_available_{name}"))
+    db.commit()
+    run(db, "without sort indexes")
+
+if __name__ == "__main__":
+    main()
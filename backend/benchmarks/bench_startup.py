@@ -0,0 +1,85 @@
+"""
+Import-time profile and cold-start time of the API process.
+
+Prints the slowest modules from `python -X importtime -c "import app.main"`,
+the wall time of importing the app, and how long a fresh uvicorn process takes
+to answer /health/live and /health/ready. Readiness needs the configured
+database; it is reported as a timeout when the database is unreachable.
+
+    python -m benchmarks.bench_startup
+"""
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+
+RUNS = 5
+TOP_MODULES = 15
+PORT = 8765
+
+def import_profile():
+    """(cumulative microseconds, module) for every module imported by app.main."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import app.main"],
+        capture_output=True, text=True, check=True,
+    )
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, module = line[len("import time:"):].split("|")
+        rows.append((int(cumulative), module.rstrip()))
+    return rows
+
+def import_wall_time():
+    start = time.perf_counter()
+    subprocess.run([sys.executable, "-c", "import app.main"], check=True, capture_output=True)
+    return time.perf_counter() - start
+
+def wait_for(url, deadline):
+    while time.perf_counter() < deadline:
+        try:
+            with urllib.request.urlopen(url, timeout=0.5) as response:
+                if response.status == 200:
+                    return True
+        except (urllib.error.URLError, ConnectionError, OSError):
+            pass
+        time.sleep(0.01)
+    return False
+
+def server_start_times(timeout=30.0):
+    """Seconds until a new uvicorn process is live and until it is ready."""
+    start = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(PORT), "--log-level", "warning"],
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        base = f"http://127.0.0.1:{PORT}"
+        live = time.perf_counter() - start if wait_for(f"{base}/health/live", start + timeout) else None
+        ready = time.perf_counter() - start if wait_for(f"{base}/health/ready", start + timeout) else None
+        return live, ready
+    finally:
+        process.terminate()
+        process.wait()
+
+def main():
+    rows = import_profile()
+    print(f"Slowest imports (cumulative, of {len(rows)} modules):")
+    for cumulative, module in sorted(rows, reverse=True)[:TOP_MODULES]:
+        print(f"  {cumulative / 1000:8.1f} ms  {module}")
+
+    for module in ("jose.jwt", "passlib.context", "bcrypt"):
+        loaded = any(name.strip() == module for _, name in rows)
+        print(f"  {module:<16} imported at startup: {'yes' if loaded else 'no (deferred)'}")
+
+    times = sorted(import_wall_time() for _ in range(RUNS))
+    print(f"\nimport app.main: median {times[len(times) // 2] * 1000:.0f} ms over {RUNS} runs")
+
+    live, ready = server_start_times()
+    print(f"uvicorn live after:  {live * 1000:.0f} ms" if live else "uvicorn live: timed out")
+    print(f"uvicorn ready after: {ready * 1000:.0f} ms" if ready else "uvicorn ready: timed out (database unreachable?)")
+
+if __name__ == "__main__":
+    main()
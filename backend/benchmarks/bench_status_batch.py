@@ -0,0 +1,79 @@
+"""
+Per-order status updates versus one batch call.
+
+Moves a truckload of ACCEPTED orders to PICKED_UP through the API, once with
+one `PATCH /orders/{id}/status` per order and once with a single
+`PATCH /orders/status:batch`, against a file-backed SQLite database so commits
+cost something.
+
+    python -m benchmarks.bench_status_batch
+"""
+import os
+import tempfile
+import time
+
+from fastapi.testclient import TestClient
+
+from app.core.config import settings
+from app.core.database import get_db, get_read_db
+from app.core.security import create_access_token
+from app.main import app
+from app.models.order import Order, OrderStatus
+from benchmarks.common import make_session_factory, seed
+
+TRUCKLOADS = (50, 200, 500)
+
+def reset_truckload(db, carrier_id, count):
+    """Put `count` of the carrier's orders back to ACCEPTED and return their ids."""
+    db.query(Order).filter(Order.carrier_id == carrier_id).update({"status": OrderStatus.ACCEPTED})
+    db.commit()
+    rows = db.query(Order.id).filter(Order.carrier_id == carrier_id).order_by(Order.id).limit(count).all()
+    return [row.id for row in rows]
+
+def main():
+    settings.RATE_LIMIT_ENABLED = False
+    with tempfile.TemporaryDirectory() as directory:
+        SessionLocal = make_session_factory(f"sqlite:///{os.path.join(directory, 'bench.db')}")
+        db = SessionLocal()
+        _, carriers = seed(db, orders=6_000, carriers=2)
+        carrier = carriers[0]
+
+        def override_get_db():
+            session = SessionLocal()
+            try:
+                yield session
+            finally:
+                session.close()
+
+        app.dependency_overrides[get_db] = override_get_db
+        app.dependency_overrides[get_read_db] = override_get_db
+        client = TestClient(app)
+        headers = {"Authorization": f"Bearer {create_access_token(carrier.id)}"}
+
+        print(f"{'orders':>7} {'per-order ms':>13} {'batch ms':>9} {'speedup':>8}")
+        for count in TRUCKLOADS:
+            order_ids = reset_truckload(db, carrier.id, count)
+            start = time.perf_counter()
+            for order_id in order_ids:
+                response = client.patch(
+                    f"/api/v1/orders/{order_id}/status", headers=headers, json={"status": "PICKED_UP"}
+                )
+                assert response.status_code == 200, response.text
+            loop_ms = (time.perf_counter() - start) * 1000
+
+            order_ids = reset_truckload(db, carrier.id, count)
+            start = time.perf_counter()
+            response = client.patch(
+                "/api/v1/orders/status:batch", headers=headers,
+                json={"order_ids": order_ids, "status": "PICKED_UP"}
+            )
+            batch_ms = (time.perf_counter() - start) * 1000
+            assert response.json()["updated"] == count, response.text
+
+            print(f"{count:>7} {loop_ms:>13.1f} {batch_ms:>9.1f} {loop_ms / batch_ms:>7.1f}x")
+
+        app.dependency_overrides.clear()
+        db.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+"""
+Carrier GPS telemetry: ingestion, bulk history writes and tracking reads.
+
+Seeds orders, then has their carriers report batches of fixes for the
+picked-up and in-transit ones. Reports ingestion rate (access checks, ring,
+shared cache and buffer), the rate of bulk flushes to the history table
+against one INSERT per fix, and a tracking read from memory against reading
+the latest row of the history table.
+
+    python -m benchmarks.bench_telemetry
+"""
+from datetime import datetime, timezone
+import random
+import time
+
+from sqlalchemy import select
+
+from app.core import shm_cache
+from app.models.order import Order
+from app.models.order_position import OrderPosition
+from app.schemas.order import PositionFix
+from app.services import telemetry
+from app.services.telemetry import position_writer
+from benchmarks.common import make_session_factory, seed, timed
+
+ORDERS = 20_000
+BATCH_SIZE = 100
+BATCHES = 500
+REPEAT = 2000
+
+def main():
+    SessionLocal = make_session_factory()
+    db = SessionLocal()
+    seed(db, orders=ORDERS)
+    shm_cache.set_cache(shm_cache.LocalCache(max_entries=50_000))
+    position_writer.max_buffered = BATCH_SIZE * BATCHES
+
+    moving = db.execute(
+        select(Order.id, Order.carrier_id)
+        .where(Order.status.in_(telemetry.TRACKED_STATUSES), Order.deleted_at.is_(None))
+    ).all()
+    by_carrier = {}
+    for row in moving:
+        by_carrier.setdefault(row.carrier_id, []).append(row.id)
+    print(f"{len(moving)} orders on the move across {len(by_carrier)} carriers\n")
+
+    rng = random.Random(7)
+    # Fixes have to be recorded within TELEMETRY_MAX_AGE_SECONDS of now
+    start = datetime.now(timezone.utc).timestamp() - BATCHES * BATCH_SIZE
+    batches = []
+    for number in range(BATCHES):
+        carrier_id = rng.choice(list(by_carrier))
+        batches.append((carrier_id, [
+            PositionFix(
+                order_id=rng.choice(by_carrier[carrier_id]),
+                latitude=rng.uniform(-60, 60), longitude=rng.uniform(-180, 180),
+                recorded_at=datetime.fromtimestamp(start + number * BATCH_SIZE + index, timezone.utc),
+            )
+            for index in range(BATCH_SIZE)
+        ]))
+
+    # First pass warms the order access cache, as a running service would be
+    for carrier_id, points in batches[:50]:
+        telemetry.ingest(db, carrier_id, points)
+    position_writer.reset()
+    start = time.perf_counter()
+    for carrier_id, points in batches:
+        telemetry.ingest(db, carrier_id, points)
+    elapsed = time.perf_counter() - start
+    print(f"ingest: {BATCHES * BATCH_SIZE / elapsed:,.0f} fixes/s ({elapsed * 1000 / BATCHES:.2f} ms per batch of {BATCH_SIZE})")
+
+    buffered = len(position_writer)
+    start = time.perf_counter()
+    position_writer.flush(db)
+    elapsed = time.perf_counter() - start
+    print(f"bulk flush: {buffered / elapsed:,.0f} fixes/s")
+
+    rows = [
+        dict(order_id=order_id, carrier_id=0, latitude=0.0, longitude=0.0,
+             recorded_at=datetime.fromtimestamp(start - 10_000 - index, timezone.utc))
+        for index, order_id in enumerate(row.id for row in moving[:5000])
+    ]
+    start = time.perf_counter()
+    for row in rows:
+        db.execute(OrderPosition.__table__.insert(), [row])
+        db.commit()
+    elapsed = time.perf_counter() - start
+    print(f"one INSERT per fix: {len(rows) / elapsed:,.0f} fixes/s\n")
+
+    order_id = batches[-1][1][-1].order_id
+    table = OrderPosition.__table__
+    latest_query = (
+        select(table.c.latitude, table.c.longitude, table.c.recorded_at)
+        .where(table.c.order_id == order_id)
+        .order_by(table.c.recorded_at.desc())
+        .limit(1)
+    )
+    memory_ms = timed(lambda: telemetry.latest_position(order_id), REPEAT)
+    database_ms = timed(lambda: db.execute(latest_query).first(), REPEAT)
+    print(f"latest position: memory {memory_ms * 1000:.1f} us, history table {database_ms * 1000:.1f} us")
+    db.close()
+
+if __name__ == "__main__":
+    main()
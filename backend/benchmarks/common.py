@@ -0,0 +1,82 @@
+"""Shared helpers for benchmarks that need a populated database."""
+from datetime import datetime, timedelta, timezone
+import random
+import time
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+import app.models  # noqa: F401 - register every table on Base.metadata
+from app.core.database import Base
+from app.models.order import Order, OrderStatus
+from app.models.order_item import OrderItem
+from app.models.user import User
+
+def make_session_factory(url: str = "sqlite:///:memory:"):
+    """Create a fresh schema on `url` and return a session factory bound to it."""
+    engine = create_engine(url, connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    # SQLite only enforces ON DELETE CASCADE with foreign keys switched on
+    event.listen(engine, "connect", lambda connection, _: connection.execute("PRAGMA foreign_keys=ON"))
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    return sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+def seed(db, orders: int, items_per_order: int = 2, carriers: int = 10, seed_value: int = 42):
+    """Insert one shipper, some carriers and `orders` orders with items. Returns (shipper, carriers)."""
+    rng = random.Random(seed_value)
+    shipper = User(name="Shipper", email="shipper@example.com", username="shipper",
+                   hashed_password="x", account_type="shipper")
+    carrier_users = [
+        User(name=f"Carrier {n}", email=f"carrier{n}@example.com", username=f"carrier{n}",
+             hashed_password="x", account_type="carrier")
+        for n in range(carriers)
+    ]
+    db.add_all([shipper, *carrier_users])
+    db.flush()
+
+    now = datetime.now(timezone.utc)
+    order_rows = []
+    for i in range(orders):
+        pickup = now + timedelta(hours=rng.randint(-240, 240))
+        assigned = rng.random() < 0.5
+        order_rows.append(dict(
+            order_number=f"ORD-BENCH-{i:08d}",
+            shipper_id=shipper.id,
+            carrier_id=rng.choice(carrier_users).id if assigned else None,
+            is_assigned=assigned,
+            pickup_location=f"Warehouse {rng.randint(1, 50)}",
+            delivery_location=f"{rng.randint(1, 999)} Main Street",
+            pickup_date=pickup,
+            delivery_deadline=pickup + timedelta(hours=rng.randint(12, 96)),
+            package_description="Boxed goods",
+            weight=round(rng.uniform(0.5, 40.0), 2),
+            dimensions="40x30x20",
+            customer_name="Jane Customer",
+            customer_email="jane@example.com",
+            customer_phone="555-0100",
+            tracking_number=f"TRK-BENCH-{i:08d}" if assigned else None,
+            status=rng.choice(list(OrderStatus)[1:5]) if assigned else OrderStatus.PENDING,
+            total_amount=round(rng.uniform(5, 500), 2),
+            payment_status="unpaid",
+            created_at=now - timedelta(minutes=i),
+            updated_at=now - timedelta(minutes=i),
+        ))
+    db.bulk_insert_mappings(Order, order_rows)
+    db.flush()
+
+    ids = [row[0] for row in db.query(Order.id).order_by(Order.id).all()]
+    db.bulk_insert_mappings(OrderItem, [
+        dict(order_id=order_id, product_name=f"Product {n}", product_sku=f"SKU-{n:04d}",
+             quantity=n + 1, unit_price=19.99)
+        for order_id in ids for n in range(items_per_order)
+    ])
+    db.commit()
+    return shipper, carrier_users
+
+def timed(func, repeat: int) -> float:
+    """Average wall time of `func` in milliseconds."""
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return (time.perf_counter() - start) * 1000 / repeat
@@ -0,0 +1,46 @@
+# Production server: gunicorn managing uvicorn workers.
+#
+#     gunicorn -c gunicorn.conf.py app.main:app
+#
+# The uvicorn worker picks uvloop and httptools automatically when they are
+# installed. Send SIGHUP to the master for a graceful restart: new workers are
+# started and old ones finish their in-flight requests before exiting.
+import multiprocessing
+import os
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '8000')}"
+
+# One worker per CPU; each worker is a single event loop plus a thread pool for sync endpoints
+workers = int(os.environ.get("WEB_CONCURRENCY", multiprocessing.cpu_count()))
+worker_class = "uvicorn.workers.UvicornWorker"
+
+# Seconds workers get to finish in-flight requests on restart or shutdown
+graceful_timeout = int(os.environ.get("GRACEFUL_TIMEOUT", "30"))
+timeout = int(os.environ.get("WORKER_TIMEOUT", "60"))
+keepalive = int(os.environ.get("KEEPALIVE", "5"))
+
+# Recycle workers now and then so slow leaks can't build up; jitter keeps them from restarting together
+max_requests = int(os.environ.get("MAX_REQUESTS", "10000"))
+max_requests_jitter = int(os.environ.get("MAX_REQUESTS_JITTER", "1000"))
+
+accesslog = os.environ.get("ACCESS_LOG", "-") or None
+errorlog = "-"
+
+# Order and tracking numbers embed a generator shard that must differ between
+# running processes. Each worker takes ID_SHARD_ID (the host's base shard,
+# default 0) plus the lowest slot no live worker holds, so a recycled worker
+# reuses its predecessor's slot. Give hosts bases at least `workers` apart.
+ID_SHARD_BASE = int(os.environ.get("ID_SHARD_ID", "0"))
+
+def pre_fork(server, worker):
+    taken = {getattr(other, "id_shard", None) for other in server.WORKERS.values()}
+    shard = next(ID_SHARD_BASE + slot for slot in range(len(taken) + 1) if ID_SHARD_BASE + slot not in taken)
+    if shard > 1023:
+        raise RuntimeError(f"Worker id shard {shard} is out of range; lower ID_SHARD_ID or WEB_CONCURRENCY")
+    worker.id_shard = shard
+
+def post_fork(server, worker):
+    from app.core import ids
+
+    ids.set_generator(ids.SnowflakeGenerator(worker.id_shard))
+    server.log.info("Worker %s generates ids on shard %s", worker.pid, worker.id_shard)
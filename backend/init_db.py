@@ -2,6 +2,9 @@ from app.core.database import Base, engine
 from app.models.user import User
 from app.models.order import Order
 from app.models.order_item import OrderItem
+from app.models.idempotency_key import IdempotencyKey
+from app.models.archive import ArchivedOrder, ArchivedOrderItem
+from app.models.order_tombstone import OrderTombstone
 import subprocess
 import os
 
@@ -0,0 +1,43 @@
+import argparse
+import gzip
+import os
+
+try:
+    import brotli
+except ImportError:  # brotli is optional, gzip is always available
+    brotli = None
+
+# Text formats worth compressing; images and fonts are already compressed
+COMPRESSIBLE_EXTENSIONS = {".html", ".js", ".mjs", ".css", ".json", ".svg", ".txt", ".xml", ".map", ".webmanifest"}
+
+def precompress_static(directory: str, minimum_size: int = 1024):
+    """Write .br and .gz siblings next to the built frontend's text assets."""
+    written = 0
+    for root, _, files in os.walk(directory):
+        for name in files:
+            if os.path.splitext(name)[1] not in COMPRESSIBLE_EXTENSIONS:
+                continue
+            path = os.path.join(root, name)
+            with open(path, "rb") as source:
+                data = source.read()
+            if len(data) < minimum_size:
+                continue
+
+            variants = [(".gz", gzip.compress(data, compresslevel=9, mtime=0))]
+            if brotli is not None:
+                variants.append((".br", brotli.compress(data, quality=11)))
+            for suffix, compressed in variants:
+                # Keep the variant only if it actually saves bytes
+                if len(compressed) < len(data):
+                    with open(path + suffix, "wb") as target:
+                        target.write(compressed)
+                    written += 1
+    print(f"Wrote {written} precompressed files under {directory}.")
+    return written
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=precompress_static.__doc__)
+    parser.add_argument("directory")
+    parser.add_argument("--minimum-size", type=int, default=1024)
+    args = parser.parse_args()
+    precompress_static(args.directory, args.minimum_size)
@@ -0,0 +1,37 @@
+import argparse
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.services import purge as purge_service
+
+def purge_deleted_orders(older_than_minutes: int, batch_size: int, rows_per_second: float):
+    """
+    Permanently remove soft-deleted orders (and their items) in rate-limited
+    batches, and tombstones older than TOMBSTONE_RETENTION_DAYS.
+    """
+    db = SessionLocal()
+    try:
+        stats = purge_service.purge_deleted_orders(
+            db,
+            older_than_minutes=older_than_minutes,
+            batch_size=batch_size,
+            rows_per_second=rows_per_second,
+        )
+        print(
+            f"Purged {stats.orders} deleted orders in {stats.seconds:.1f}s "
+            f"({stats.rows_per_second:.0f} rows/sec)."
+        )
+        tombstones = purge_service.purge_tombstones(db, batch_size=batch_size)
+        print(f"Removed {tombstones} expired tombstones.")
+        return stats
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=purge_deleted_orders.__doc__)
+    parser.add_argument("--minutes", type=int, default=settings.PURGE_AFTER_MINUTES)
+    parser.add_argument("--batch-size", type=int, default=settings.PURGE_BATCH_SIZE)
+    parser.add_argument("--rate", type=float, default=settings.PURGE_ROWS_PER_SECOND,
+                        help="Maximum orders purged per second (0 for no limit)")
+    args = parser.parse_args()
+    purge_deleted_orders(args.minutes, args.batch_size, args.rate)
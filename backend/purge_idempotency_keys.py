@@ -0,0 +1,15 @@
+from app.core.database import SessionLocal
+from app.services import idempotency as idempotency_service
+
+def purge_idempotency_keys():
+    """Delete expired idempotency keys in bulk."""
+    db = SessionLocal()
+    try:
+        removed = idempotency_service.purge_expired(db)
+        print(f"Purged {removed} expired idempotency keys.")
+        return removed
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    purge_idempotency_keys()
@@ -0,0 +1,20 @@
+import argparse
+
+from app.core.database import SessionLocal
+from app.services import read_model
+
+def rebuild_read_model(batch_size: int):
+    """Rewrite the order read model that serves the list endpoints from the orders tables."""
+    db = SessionLocal()
+    try:
+        written = read_model.rebuild(db, batch_size=batch_size)
+        print(f"Rebuilt the read model for {written} orders.")
+        return written
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=rebuild_read_model.__doc__)
+    parser.add_argument("--batch-size", type=int, default=1000)
+    args = parser.parse_args()
+    rebuild_read_model(args.batch_size)
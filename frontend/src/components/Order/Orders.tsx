@@ -53,7 +53,10 @@ const Orders: React.FC = () => {
   const [searchTerm, setSearchTerm] = useState('');
   const [filters, setFilters] = useState({
     status: '',
+    date_from: '',
+    date_to: '',
   });
+  const [statusCounts, setStatusCounts] = useState<Record<string, number>>({});
   const [isLoading, setIsLoading] = useState(true);
   const [selectedOrder, setSelectedOrder] = useState<OrderType | null>(null);
   const [activeTab, setActiveTab] = useState<'list' | 'details' | 'create' | 'update' | 'available'>('list');
@@ -70,14 +73,21 @@ const Orders: React.FC = () => {
     try {
       let response;
       
+      // Status and date filters are applied by the server, which also returns per-status counts
+      const serverFilters = {
+        status: filters.status ? filters.status.toUpperCase() : undefined,
+        date_from: filters.date_from ? new Date(filters.date_from).toISOString() : undefined,
+        date_to: filters.date_to ? new Date(`${filters.date_to}T23:59:59`).toISOString() : undefined,
+      };
+      
       // Fetch orders based on user role
       if (user?.account_type === 'shipper') {
-        response = await ordersAPI.getShipperOrders(currentPage, ordersPerPage);
+        response = await ordersAPI.getShipperOrders(currentPage, ordersPerPage, serverFilters);
       } else if (user?.account_type === 'carrier') {
-        response = await ordersAPI.getCarrierOrders(currentPage, ordersPerPage);
+        response = await ordersAPI.getCarrierOrders(currentPage, ordersPerPage, serverFilters);
       } else {
         // Fallback if user role is unknown
-        response = { items: [], total: 0, page: 1, pages: 1 };
+        response = { items: [], total: 0, page: 1, pages: 1, status_counts: {} };
       }
       
       // Map API response to the expected format
@@ -102,6 +112,7 @@ const Orders: React.FC = () => {
       setOrders(mappedOrders);
       setFilteredOrders(mappedOrders);
       setTotalPages(response.pages);
+      setStatusCounts(response.status_counts || {});
     } catch (error) {
       console.error('Failed to fetch orders:', error);
     } finally {
@@ -168,17 +179,10 @@ const Orders: React.FC = () => {
     }
   };
   
-  // Apply filters and search locally
+  // Apply search locally to the loaded page
   useEffect(() => {
     let filtered = [...orders];
     
-    // Apply status filter
-    if (filters.status) {
-      filtered = filtered.filter(order => 
-        order.status.toLowerCase() === filters.status.toLowerCase()
-      );
-    }
-    
     // Apply search term
     if (searchTerm) {
       const term = searchTerm.toLowerCase();
@@ -193,12 +197,24 @@ const Orders: React.FC = () => {
     }
     
     setFilteredOrders(filtered);
-  }, [orders, filters.status, searchTerm]);
+  }, [orders, searchTerm]);
   
-  // Initial fetch
+  // Initial fetch, and refetch when the page or server-side filters change
   useEffect(() => {
     fetchOrders();
-  }, [currentPage, user]);
+  }, [currentPage, user, filters]);
+  
+  // Changing a filter starts again from the first page
+  const updateFilters = (changes: Partial<typeof filters>) => {
+    setFilters({...filters, ...changes});
+    setCurrentPage(1);
+  };
+  
+  // Label a status option with its count from the server
+  const statusLabel = (label: string, value: string) => {
+    const count = statusCounts[value.toUpperCase()];
+    return count === undefined ? label : `${label} (${count})`;
+  };
   
   // Fetch available orders when tab changes
   useEffect(() => {
@@ -412,18 +428,32 @@ const Orders: React.FC = () => {
                       <select
                         className="pl-2 pr-8 py-2 border border-slate-700 rounded-lg bg-slate-800/50 text-white focus:ring-2 focus:ring-yellow-500 focus:border-transparent transition-colors"
                         value={filters.status}
-                        onChange={(e) => setFilters({...filters, status: e.target.value})}
+                        onChange={(e) => updateFilters({status: e.target.value})}
                       >
                         <option value="">All Statuses</option>
-                        <option value="pending">Pending</option>
-                        <option value="accepted">Accepted</option>
-                        <option value="picked_up">Picked Up</option>
-                        <option value="in_transit">In Transit</option>
-                        <option value="delivered">Delivered</option>
-                        <option value="cancelled">Cancelled</option>
+                        <option value="pending">{statusLabel('Pending', 'pending')}</option>
+                        <option value="accepted">{statusLabel('Accepted', 'accepted')}</option>
+                        <option value="picked_up">{statusLabel('Picked Up', 'picked_up')}</option>
+                        <option value="in_transit">{statusLabel('In Transit', 'in_transit')}</option>
+                        <option value="delivered">{statusLabel('Delivered', 'delivered')}</option>
+                        <option value="cancelled">{statusLabel('Cancelled', 'cancelled')}</option>
                       </select>
                     </div>
                   </div>
+                  <input
+                    type="date"
+                    aria-label="Created from"
+                    className="px-3 py-2 border border-slate-700 rounded-lg bg-slate-800/50 text-white focus:ring-2 focus:ring-yellow-500 focus:border-transparent transition-colors"
+                    value={filters.date_from}
+                    onChange={(e) => updateFilters({date_from: e.target.value})}
+                  />
+                  <input
+                    type="date"
+                    aria-label="Created to"
+                    className="px-3 py-2 border border-slate-700 rounded-lg bg-slate-800/50 text-white focus:ring-2 focus:ring-yellow-500 focus:border-transparent transition-colors"
+                    value={filters.date_to}
+                    onChange={(e) => updateFilters({date_to: e.target.value})}
+                  />
                 </div>
               </div>
               
@@ -185,4 +185,13 @@ export const ordersAPI = {
   },
 };
 
+// Batch API: several GET requests in one round trip
+export const batchAPI = {
+  // Paths are relative to the API root, e.g. '/orders/available?page=2'
+  run: async (requests: { id?: string; path: string }[]) => {
+    const response = await api.post('/batch', { requests });
+    return response.data.responses as { id: string | null; status: number; body: any }[];
+  },
+};
+
 export default api; 
\ No newline at end of file